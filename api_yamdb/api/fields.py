@@ -0,0 +1,130 @@
+from django.utils.encoding import smart_str
+from rest_framework import serializers
+
+from reviews.catalog import get_catalog
+from users.models import User
+
+
+class AuthorMap:
+    """
+    Карта id автора -> username на время одного запроса или одной порции
+    потокового ответа.
+
+    Авторы подгружаются одним узким запросом на страницу; автор,
+    встретившийся на многих строках, загружается один раз.
+    """
+
+    def __init__(self):
+        self.usernames = {}
+
+    def load(self, ids):
+        missing = set(ids) - self.usernames.keys()
+        missing.discard(None)
+        if missing:
+            self.usernames.update(
+                User.objects.filter(pk__in=missing).values_list(
+                    'id', 'username'
+                )
+            )
+
+    def get(self, user_id):
+        if user_id not in self.usernames:
+            self.load((user_id,))
+        return self.usernames.get(user_id)
+
+
+def author_map(context):
+    """
+    Карта авторов из контекста сериализатора (`author_map`), иначе общая
+    для всех сериализаторов запроса.
+    """
+    authors = context.get('author_map')
+    if authors is not None:
+        return authors
+    request = context.get('request')
+    if request is None:
+        return AuthorMap()
+    if not hasattr(request, '_author_map'):
+        request._author_map = AuthorMap()
+    return request._author_map
+
+
+def request_catalog(request):
+    """
+    Снимок справочников, общий для фильтров и сериализаторов запроса:
+    версия снимка читается один раз, а не для каждой строки.
+    """
+    if request is None:
+        return get_catalog()
+    if not hasattr(request, '_catalog'):
+        request._catalog = get_catalog()
+    return request._catalog
+
+
+def context_catalog(context):
+    """Снимок справочников для контекста сериализатора."""
+    catalog = context.get('catalog')
+    if catalog is None:
+        catalog = context['catalog'] = request_catalog(context.get('request'))
+    return catalog
+
+
+class AuthorField(serializers.Field):
+    """Username автора объекта без загрузки всей строки пользователя."""
+
+    def __init__(self, **kwargs):
+        kwargs['read_only'] = True
+        super().__init__(**kwargs)
+
+    def get_attribute(self, instance):
+        authors = author_map(self.context)
+        if type(instance).author.is_cached(instance):
+            authors.usernames[instance.author_id] = str(instance.author)
+        return instance.author_id
+
+    def to_representation(self, value):
+        return author_map(self.context).get(value)
+
+
+class AuthorListSerializer(serializers.ListSerializer):
+    """Перед выводом страницы загружает всех её авторов одним запросом."""
+
+    def to_representation(self, data):
+        data = list(data.all() if hasattr(data, 'all') else data)
+        author_map(self.context).load(
+            obj.author_id for obj in data
+        )
+        return super().to_representation(data)
+
+
+class CatalogSlugField(serializers.SlugRelatedField):
+    """Жанр или категория по slug из снимка справочников, без запроса."""
+
+    def __init__(self, index=None, **kwargs):
+        self.index = index
+        kwargs.setdefault('slug_field', 'slug')
+        super().__init__(**kwargs)
+
+    def to_internal_value(self, data):
+        try:
+            obj = getattr(context_catalog(self.context), self.index).get(data)
+        except TypeError:
+            self.fail('invalid')
+        if obj is None:
+            self.fail('does_not_exist', slug_name=self.slug_field,
+                      value=smart_str(data))
+        return obj
+
+
+class CatalogObjectField(serializers.Field):
+    """Связанный объект справочника по id из снимка."""
+
+    def __init__(self, index, serializer_class, **kwargs):
+        self.index = index
+        self.serializer_class = serializer_class
+        kwargs['read_only'] = True
+        super().__init__(**kwargs)
+
+    def to_representation(self, value):
+        obj = getattr(context_catalog(self.context), self.index).get(value)
+        return None if obj is None else self.serializer_class(obj).data
@@ -1,18 +1,169 @@
+import json
+import re
+
 import django_filters
+from django.db import connection
+from django.db.models import Q
+from rest_framework.exceptions import ValidationError
+from rest_framework.filters import BaseFilterBackend
+from rest_framework.settings import api_settings
 
+from reviews.bitmaps import bitmap_ids, get_index
 from reviews.models import Title
+from users.search import prefix_filter, search_key
+from .fields import request_catalog
 
+SEARCH_TERMS = re.compile(r'\w+')
 
-class TitleFilterSet(django_filters.FilterSet):
-    genre = django_filters.CharFilter(
-        field_name='genre__slug',
-        lookup_expr='exact'
+
+GENRE_MODES = (('all', 'Все жанры'), ('any', 'Любой из жанров'))
+
+
+def filter_ids(queryset, ids):
+    """Ограничивает queryset произведениями из списка id."""
+    if not ids:
+        return queryset.none()
+    if connection.vendor != 'sqlite':
+        return queryset.filter(id__in=ids)
+    # Один параметр вместо тысяч: у SQLite есть предел числа параметров.
+    return queryset.extra(
+        where=['reviews_title.id IN (SELECT value FROM json_each(%s))'],
+        params=[json.dumps(ids)],
     )
-    category = django_filters.CharFilter(
-        field_name='category__slug',
-        lookup_expr='exact'
+
+
+class TitleFilterSet(django_filters.FilterSet):
+    """
+    Фильтр произведений.
+
+    `genre` принимает несколько slug через запятую или повторением
+    параметра; `genre_mode=all` (по умолчанию) оставляет произведения со
+    всеми жанрами, `any` — хотя бы с одним. Вместе с `category` и `year`
+    жанры отбираются по битовым картам в памяти (reviews.bitmaps).
+    """
+    genre = django_filters.CharFilter(method='filter_indexed')
+    genre_mode = django_filters.ChoiceFilter(
+        choices=GENRE_MODES, method='filter_indexed'
     )
+    category = django_filters.CharFilter(method='filter_indexed')
+    year = django_filters.NumberFilter(method='filter_indexed')
 
     class Meta:
         model = Title
         fields = '__all__'
+        # Служебные агрегаты рейтинга не фильтруются.
+        exclude = Title.AGGREGATE_FIELDS
+
+    def filter_indexed(self, queryset, name, value):
+        # Эти параметры разбираются вместе в filter_queryset().
+        return queryset
+
+    def genre_slugs(self):
+        if hasattr(self.data, 'getlist'):
+            values = self.data.getlist('genre')
+        else:
+            values = [self.data.get('genre') or '']
+        return list(dict.fromkeys(
+            slug.strip()
+            for value in values
+            for slug in value.split(',') if slug.strip()
+        ))
+
+    def filter_queryset(self, queryset):
+        queryset = super().filter_queryset(queryset)
+        data = self.form.cleaned_data
+        catalog = request_catalog(self.request)
+        category_id = year = None
+        if data.get('category'):
+            category = catalog.categories_by_slug.get(data['category'])
+            if category is None:
+                return queryset.none()
+            category_id = category.id
+        if data.get('year') is not None:
+            year = data['year']
+            if year != int(year):
+                return queryset.none()
+            year = int(year)
+        slugs = self.genre_slugs()
+        if not slugs:
+            if category_id is not None:
+                queryset = queryset.filter(category_id=category_id)
+            if year is not None:
+                queryset = queryset.filter(year=year)
+            return queryset
+        genre_ids = [
+            catalog.genres_by_slug[slug].id
+            for slug in slugs if slug in catalog.genres_by_slug
+        ]
+        match_all = data.get('genre_mode') != 'any'
+        if match_all and len(genre_ids) < len(slugs):
+            return queryset.none()
+        bitmap = get_index().select(genre_ids, match_all, category_id, year)
+        return filter_ids(queryset, bitmap_ids(bitmap))
+
+
+def fts_query(text):
+    """
+    Запрос FTS5: все слова обязательны, последнее — как префикс.
+
+    Слова берутся в кавычки, чтобы операторы FTS5 во вводе
+    пользователя не разбирались как синтаксис запроса.
+    """
+    terms = SEARCH_TERMS.findall(text)
+    if not terms:
+        return None
+    return ' '.join(f'"{term}"' for term in terms) + '*'
+
+
+class TitleSearchFilter(BaseFilterBackend):
+    """
+    Полнотекстовый поиск `?search=` по названию и описанию.
+
+    В SQLite использует индекс FTS5 reviews_title_fts и сортирует по
+    bm25; на других СУБД ищет через icontains. Курсорная пагинация
+    сортирует по `cursor_ordering` вьюсета и потеряла бы порядок по
+    релевантности, поэтому вместе с поиском она отклоняется.
+    """
+    search_param = api_settings.SEARCH_PARAM
+
+    def filter_queryset(self, request, queryset, view):
+        text = request.query_params.get(self.search_param, '')
+        query = fts_query(text)
+        if query is None:
+            return queryset
+        paginator = getattr(view, 'paginator', None)
+        if getattr(paginator, 'use_cursor', lambda request: False)(request):
+            raise ValidationError({self.search_param: [
+                'Результаты поиска упорядочены по релевантности и не '
+                'поддерживают курсорную пагинацию.'
+            ]})
+        if connection.vendor != 'sqlite':
+            return queryset.filter(
+                Q(name__icontains=text) | Q(description__icontains=text)
+            )
+        return queryset.extra(
+            tables=['reviews_title_fts'],
+            where=[
+                'reviews_title_fts.rowid = reviews_title.id',
+                'reviews_title_fts MATCH %s',
+            ],
+            params=[query],
+            select={'search_rank': 'bm25(reviews_title_fts)'},
+            order_by=['search_rank', 'id'],
+        )
+
+
+class SearchKeyFilter(BaseFilterBackend):
+    """
+    Поиск `?search=` по началу нормализованного ключа `search_key`.
+
+    Регистр, в том числе кириллицы, и различие ё/е не учитываются;
+    поиск идёт по индексу колонки.
+    """
+    search_param = api_settings.SEARCH_PARAM
+
+    def filter_queryset(self, request, queryset, view):
+        prefix = search_key(request.query_params.get(self.search_param, ''))
+        if not prefix:
+            return queryset
+        return queryset.filter(**prefix_filter(prefix))
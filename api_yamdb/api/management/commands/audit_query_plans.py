@@ -0,0 +1,226 @@
+from contextlib import nullcontext
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.db.models import Count, Q
+from django.test.utils import override_settings
+from django.urls import URLPattern, URLResolver, reverse
+from rest_framework.test import APIClient
+
+from api import urls as api_urls
+from api.query_plans import PlanRecorder, audit
+from reviews.models import Category, Comment, Genre, Review, Title
+from users.models import ADMIN, User
+
+# Дополнительные параметры запроса для маршрутов с фильтрами.
+QUERY_VARIANTS = {
+    'titles-list': (
+        lambda s: {},
+        lambda s: {'search': s['word']},
+        lambda s: {'genre': s['genre'], 'category': s['category'],
+                   'year': s['year']},
+    ),
+    'titles-suggest': (lambda s: {'q': s['word']},),
+    'users-list': (lambda s: {}, lambda s: {'search': s['username'][:3]}),
+}
+# Тела запросов для маршрутов без GET.
+BODIES = {
+    'signup': lambda s: {'username': s['username'], 'email': s['email']},
+    'get_token': lambda s: {'username': s['username'],
+                            'confirmation_code': s['code']},
+}
+# Значение `pk` для маршрутов по имени вьюсета.
+PK_SAMPLES = {'titles': 'busiest_title_id', 'review': 'review_id',
+              'comment': 'comment_id'}
+SLUG_SAMPLES = {'genres': 'genre', 'categories': 'category'}
+
+
+def iter_routes(patterns=api_urls.urlpatterns):
+    """Именованные маршруты api/urls.py с их callback."""
+    for pattern in patterns:
+        if isinstance(pattern, URLResolver):
+            yield from iter_routes(pattern.url_patterns)
+        elif isinstance(pattern, URLPattern) and pattern.name:
+            if '(?P<format>' not in str(pattern.pattern):
+                yield pattern
+
+
+def samples():
+    """
+    Представительные объекты: произведение с наибольшим числом отзывов и
+    отзыв с наибольшим числом комментариев. Вложенные маршруты получают
+    произведение этого отзыва.
+    """
+    busiest = Comment.objects.values('review_id').annotate(
+        comment_count=Count('id')
+    ).order_by('-comment_count').values_list('review_id', flat=True)
+    review = Review.objects.select_related('author').filter(
+        pk__in=busiest[:1]
+    ).first() or Review.objects.select_related('author').first()
+    if review is None:
+        raise CommandError('No reviews: load data before auditing plans')
+    title = Title.objects.order_by('-review_count').first()
+    genre = Genre.objects.filter(genre=title).first() or Genre.objects.first()
+    category = Category.objects.first()
+    comment = review.comments.first() or Comment.objects.first()
+    user = review.author
+    return {
+        'busiest_title_id': title.pk,
+        'title_id': review.title_id,
+        'review_id': review.pk,
+        'comment_id': comment.pk if comment else 0,
+        'word': title.name.split()[0],
+        'year': title.year,
+        'genre': genre.slug if genre else '',
+        'category': category.slug if category else '',
+        'username': user.username,
+        'email': user.email,
+        'code': user.confirmation_code or '',
+    }
+
+
+def route_kwargs(pattern, sample):
+    basename = pattern.name.rsplit('-', 1)[0]
+    kwargs = {}
+    for name in pattern.pattern.regex.groupindex:
+        if name == 'pk':
+            kwargs[name] = sample[PK_SAMPLES[basename]]
+        elif name == 'slug':
+            kwargs[name] = sample[SLUG_SAMPLES[basename]]
+        else:
+            kwargs[name] = sample[name]
+    return kwargs
+
+
+def route_method(pattern):
+    """GET, если маршрут его принимает, иначе POST или DELETE."""
+    actions = getattr(pattern.callback, 'actions', None)
+    if actions is not None:
+        methods = set(actions)
+    else:
+        view_class = pattern.callback.view_class
+        methods = {
+            name for name in view_class.http_method_names
+            if hasattr(view_class, name)
+        }
+    for method in ('get', 'post', 'delete'):
+        if method in methods:
+            return method
+    return None
+
+
+def representative_requests(sample):
+    """(маршрут, метод, путь, данные) для каждого маршрута API."""
+    for pattern in iter_routes():
+        method = route_method(pattern)
+        if method is None or method == 'post' and pattern.name not in BODIES:
+            continue
+        path = reverse(pattern.name, kwargs=route_kwargs(pattern, sample))
+        if method == 'post':
+            yield pattern.name, method, path, BODIES[pattern.name](sample)
+            continue
+        for variant in QUERY_VARIANTS.get(pattern.name, (lambda s: {},)):
+            yield pattern.name, method, path, variant(sample)
+
+
+class Command(BaseCommand):
+    help = ('Run a representative request against every API route and '
+            'audit SQLite query plans of the queries it makes')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--output', type=Path,
+            help='Write plans without timings, sorted, for diffing',
+        )
+        parser.add_argument(
+            '--top', type=int, default=20,
+            help='Number of flagged steps to print (default: 20)',
+        )
+
+    def handle(self, *args, **options):
+        if connection.vendor != 'sqlite':
+            raise CommandError('EXPLAIN QUERY PLAN audit supports SQLite')
+        sample = samples()
+        admin = User.objects.filter(
+            Q(role=ADMIN) | Q(is_superuser=True)
+        ).first()
+        reports = {}
+        # Изменяющие запросы откатываются, кеш ответов и почта выключены.
+        with override_settings(
+            RESPONSE_CACHE={},
+            EMAIL_BACKEND='django.core.mail.backends.locmem.EmailBackend',
+        ):
+            for route, method, path, data in representative_requests(
+                sample
+            ):
+                report = reports.setdefault(
+                    route, {'statuses': set(), 'queries': {}}
+                )
+                status, queries = self.run_request(admin, method, path, data)
+                report['statuses'].add(status)
+                report['queries'].update(queries)
+        self.print_ranking(reports, options['top'])
+        if options['output']:
+            options['output'].write_text(self.render(reports))
+            self.stdout.write(f'Report written to {options["output"]}')
+
+    def run_request(self, admin, method, path, data):
+        client = APIClient()
+        if admin is not None and method != 'post':
+            client.force_authenticate(admin)
+        recorder = PlanRecorder()
+        # Первый запрос прогревает кеши процесса (справочники, индексы
+        # в памяти): в отчёт попадают запросы установившегося режима.
+        for record in (False, True):
+            with transaction.atomic():
+                with (connection.execute_wrapper(recorder) if record
+                      else nullcontext()):
+                    response = getattr(client, method)(path, data)
+                transaction.set_rollback(True)
+        # Ответ 4xx значит, что выполнились не те запросы, что в рабочем
+        # режиме (проверка прав, 404 вместо выборки).
+        if response.status_code >= 400:
+            raise CommandError(f'{method.upper()} {path}: '
+                               f'{response.status_code}')
+        return response.status_code, audit(recorder.queries)
+
+    def print_ranking(self, reports, top):
+        flagged = [
+            (query['duration'], route, shape, step, index, query['count'])
+            for route, report in reports.items()
+            for shape, query in report['queries'].items()
+            for step, index in query['suggestions']
+        ]
+        flagged.sort(key=lambda item: item[0], reverse=True)
+        queries = sum(len(report['queries']) for report in reports.values())
+        self.stdout.write(
+            f'{len(reports)} routes, {queries} query shapes, '
+            f'{len(flagged)} flagged steps'
+        )
+        for duration, route, shape, step, index, count in flagged[:top]:
+            self.stdout.write(
+                f'{duration * 1000:9.3f} ms  x{count:<3} {route:<16} {step}'
+            )
+            self.stdout.write(f'    {shape}')
+            if index:
+                self.stdout.write(
+                    self.style.SUCCESS(f'    suggested index: {index}')
+                )
+
+    def render(self, reports):
+        lines = []
+        for route in sorted(reports):
+            statuses = ','.join(map(str, sorted(reports[route]['statuses'])))
+            lines.append(f'== {route} {statuses}')
+            queries = reports[route]['queries']
+            for shape in sorted(queries):
+                query = queries[shape]
+                lines.append(shape)
+                lines.extend('    ' + line for line in query['plan'])
+                for step, index in query['suggestions']:
+                    lines.append(f'  ! {step}' + (
+                        f' -> index {index}' if index else ''
+                    ))
+            lines.append('')
+        return '\n'.join(lines)
@@ -0,0 +1,61 @@
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from api.slow_queries import read_entries, summarize
+
+ORDERINGS = {
+    'total': 'total_ms',
+    'count': 'count',
+    'max': 'max_ms',
+    'mean': 'mean_ms',
+}
+
+
+class Command(BaseCommand):
+    help = 'Summarize the slow query log: top query shapes per endpoint'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--path', type=Path,
+            help='Log path; files of all processes are read '
+                 '(default: settings.SLOW_QUERY_LOG["PATH"])',
+        )
+        parser.add_argument('--top', type=int, default=10)
+        parser.add_argument(
+            '--by', choices=sorted(ORDERINGS), default='total',
+            help='Rank by total, count, max or mean duration',
+        )
+        parser.add_argument('--view', help='Only this endpoint, e.g. '
+                                           'titles-list')
+
+    def handle(self, *args, **options):
+        config = getattr(settings, 'SLOW_QUERY_LOG', None) or {}
+        path = options['path'] or config.get('PATH')
+        if not path:
+            raise CommandError('Slow query log is disabled')
+        entries = read_entries(path, config.get('BACKUP_COUNT', 0))
+        if options['view']:
+            entries = (
+                entry for entry in entries
+                if entry.get('view') == options['view']
+            )
+        groups = summarize(entries)
+        key = ORDERINGS[options['by']]
+        groups.sort(key=lambda group: group[key], reverse=True)
+        self.stdout.write(
+            f'{len(groups)} query shapes, '
+            f'{sum(group["count"] for group in groups)} slow queries'
+        )
+        self.stdout.write(
+            f'{"count":>7}{"total_ms":>12}{"mean_ms":>10}{"max_ms":>10}'
+            f'{"rows":>9}  view'
+        )
+        for group in groups[:options['top']]:
+            self.stdout.write(
+                f'{group["count"]:>7}{group["total_ms"]:>12.1f}'
+                f'{group["mean_ms"]:>10.1f}{group["max_ms"]:>10.1f}'
+                f'{group["rows"]:>9}  {group["view"]}'
+            )
+            self.stdout.write(f'    {group["sql"]}')
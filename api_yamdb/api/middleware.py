@@ -0,0 +1,224 @@
+import json
+import logging
+import sqlite3
+
+from django.conf import settings
+from django.db import connection
+from django.http import HttpResponse, HttpResponseNotModified
+from django.utils.cache import parse_etags, quote_etag
+
+from . import slow_queries
+from .queries import QueryInspector
+from .response_cache import get_response_cache, group_versions, make_key
+
+logger = logging.getLogger('api.queries')
+cache_logger = logging.getLogger('api.cache')
+
+DEFAULTS = {
+    'MODE': 'log',
+    'REPEAT_THRESHOLD': 5,
+}
+
+
+class QueryBudgetExceeded(Exception):
+    """Представление выполнило больше запросов, чем указано в бюджете."""
+
+
+def view_setting(view_func, method, name):
+    """
+    Настройка, объявленная на вьюсете атрибутом `name`.
+
+    Атрибут может быть значением или словарём {действие: значение}.
+    """
+    value = getattr(getattr(view_func, 'cls', None), name, None)
+    if isinstance(value, dict):
+        actions = getattr(view_func, 'actions', None) or {}
+        return value.get(actions.get(method.lower()))
+    return value
+
+
+class QueryBudgetMiddleware:
+    """
+    Считает SQL-запросы и их время для каждого запроса к API.
+
+    Режим задаётся в `settings.QUERY_BUDGET['MODE']`: `log` пишет
+    предупреждение в лог `api.queries`, `raise` выбрасывает
+    QueryBudgetExceeded (для тестов), `header` добавляет в ответ
+    заголовки X-Query-* (для стенда). Запросы потоковых ответов,
+    выполняемые после возврата из представления, не учитываются.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.config = {**DEFAULTS, **getattr(settings, 'QUERY_BUDGET', {})}
+
+    def __call__(self, request):
+        inspector = QueryInspector()
+        with connection.execute_wrapper(inspector):
+            response = self.get_response(request)
+        budget = getattr(request, 'query_budget', None)
+        problems = self.problems(inspector, budget)
+        mode = self.config['MODE']
+        if mode == 'header':
+            response['X-Query-Count'] = str(inspector.count)
+            response['X-Query-Time-Ms'] = f'{inspector.duration * 1000:.1f}'
+            if budget is not None:
+                response['X-Query-Budget'] = str(budget)
+            if problems:
+                response['X-Query-Warning'] = '; '.join(problems)
+        elif problems:
+            message = f'{request.method} {request.path}: ' + '; '.join(
+                problems)
+            if mode == 'raise':
+                raise QueryBudgetExceeded(message)
+            logger.warning(message)
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        request.query_budget = view_setting(
+            view_func, request.method, 'query_budget')
+
+    def problems(self, inspector, budget):
+        problems = []
+        if budget is not None and inspector.count > budget:
+            problems.append(
+                f'{inspector.count} queries exceed budget of {budget}')
+        for shape, count in inspector.repeated(
+            self.config['REPEAT_THRESHOLD']
+        ).items():
+            problems.append(f'query repeated {count} times: {shape}')
+        return problems
+
+
+def cache_groups(view_func, view_kwargs):
+    """Группы данных ответа из `cache_groups` вьюсета, например `title:5`."""
+    groups = view_setting(view_func, 'GET', 'cache_groups')
+    if groups is None:
+        return None
+    kwargs = {
+        name: int(value) if str(value).isdigit() else value
+        for name, value in view_kwargs.items()
+    }
+    return [group.format(**kwargs) for group in groups]
+
+
+def request_key(request):
+    """База, нормализованный путь, параметры и запрошенный формат."""
+    return [
+        str(connection.settings_dict['NAME']),
+        request.path,
+        sorted(request.GET.lists()),
+        request.META.get('HTTP_ACCEPT', ''),
+    ]
+
+
+def etag_matches(request, etag):
+    return etag in parse_etags(request.META.get('HTTP_IF_NONE_MATCH', ''))
+
+
+def not_modified_response(etag):
+    response = HttpResponseNotModified()
+    response['ETag'] = etag
+    return response
+
+
+class ResponseCacheMiddleware:
+    """
+    ETag и общий для процессов кеш ответов представлений с `cache_groups`.
+
+    ETag — это ключ кеша: хэш запроса и версий групп его данных, поэтому
+    он известен до вызова представления и анонимному запросу с совпавшим
+    If-None-Match сразу отдаётся 304. Запросу с токеном 304 отдаёт
+    ConditionalGetMixin вьюсета после аутентификации и проверки прав:
+    просроченный токен должен дать 401. Анонимные успешные непотоковые
+    GET-ответы кешируются и тоже отдаются до входа в DRF.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        etag = getattr(request, 'response_etag', None)
+        if etag is None or response.status_code != 200:
+            return response
+        response['ETag'] = etag
+        if getattr(request, 'response_cacheable', False) and (
+            not response.streaming
+        ):
+            meta = json.dumps({'content_type': response['Content-Type']})
+            self.call_cache(
+                'set', etag, meta.encode() + b'\n' + response.content
+            )
+            response['X-Cache'] = 'MISS'
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        if request.method not in ('GET', 'HEAD'):
+            return None
+        groups = cache_groups(view_func, view_kwargs)
+        if groups is None:
+            return None
+        etag = quote_etag(
+            make_key(request_key(request), group_versions(groups))
+        )
+        request.response_etag = etag
+        if 'HTTP_AUTHORIZATION' in request.META:
+            return None
+        if etag_matches(request, etag):
+            return not_modified_response(etag)
+        if request.method != 'GET':
+            return None
+        value = self.call_cache('get', etag)
+        if not value:
+            request.response_cacheable = True
+            return None
+        meta, content = value.split(b'\n', 1)
+        response = HttpResponse(
+            content, content_type=json.loads(meta)['content_type']
+        )
+        response['X-Cache'] = 'HIT'
+        return response
+
+    @staticmethod
+    def call_cache(method, *args):
+        """Ошибка кеша не должна ломать запрос: он выполнится без кеша."""
+        cache = get_response_cache()
+        if cache is None:
+            return None
+        try:
+            return getattr(cache, method)(*args)
+        except sqlite3.Error as error:
+            cache_logger.warning('Response cache %s failed: %s', method, error)
+            return None
+
+
+def view_name(request):
+    match = getattr(request, 'resolver_match', None)
+    return match.view_name if match is not None else None
+
+
+class SlowQueryMiddleware:
+    """
+    Пишет SQL-запросы дольше `settings.SLOW_QUERY_LOG['THRESHOLD_MS']`
+    в журнал api.slow_queries с именем маршрута (например, titles-list).
+
+    Пустой PATH выключает журнал. Как и у QueryBudgetMiddleware, запросы
+    потоковых ответов после возврата из представления не учитываются.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        config = getattr(settings, 'SLOW_QUERY_LOG', None)
+        if not config or not config.get('PATH'):
+            return self.get_response(request)
+        slow_queries.configure(
+            config['PATH'], config['MAX_BYTES'], config['BACKUP_COUNT']
+        )
+        log = slow_queries.SlowQueryLog(
+            config['THRESHOLD_MS'] / 1000, lambda: view_name(request)
+        )
+        with connection.execute_wrapper(log):
+            return self.get_response(request)
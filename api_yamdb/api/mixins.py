@@ -1,13 +1,144 @@
+from itertools import islice
+
+from django.http import StreamingHttpResponse
+from django.shortcuts import get_object_or_404
 from rest_framework import mixins, viewsets
 from rest_framework.mixins import (CreateModelMixin, DestroyModelMixin,
                                    ListModelMixin)
+from rest_framework.settings import api_settings
 from rest_framework.viewsets import GenericViewSet
 
+from reviews.catalog import get_catalog
+from reviews.models import Review, Title
+from .fields import AuthorMap
+from .middleware import etag_matches, not_modified_response
+from .renderers import NDJSONRenderer
+
 
 class ModelMixinSet(CreateModelMixin, ListModelMixin,
                     DestroyModelMixin, GenericViewSet):
     pass
 
 
+class NotModified(Exception):
+    def __init__(self, etag):
+        super().__init__(etag)
+        self.etag = etag
+
+
+class ConditionalGetMixin:
+    """
+    304 на совпавший If-None-Match для запросов с токеном.
+
+    ETag считает ResponseCacheMiddleware до входа в DRF; здесь он
+    сравнивается после аутентификации и проверки прав, но до выборки
+    и сериализации.
+    """
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        etag = getattr(request, 'response_etag', None)
+        if etag is not None and etag_matches(request, etag):
+            raise NotModified(etag)
+
+    def handle_exception(self, exc):
+        if isinstance(exc, NotModified):
+            return not_modified_response(exc.etag)
+        return super().handle_exception(exc)
+
+
 class CreateViewSet(mixins.CreateModelMixin, viewsets.GenericViewSet):
     pass
+
+
+class StreamingListMixin:
+    """
+    Потоковая выгрузка списка в формате NDJSON по `?format=ndjson`.
+
+    Объекты читаются итератором порциями по `stream_chunk_size` и
+    сериализуются по одному, поэтому память не зависит от размера списка.
+    """
+    renderer_classes = (
+        *api_settings.DEFAULT_RENDERER_CLASSES, NDJSONRenderer
+    )
+    stream_chunk_size = 2000
+
+    def list(self, request, *args, **kwargs):
+        if not isinstance(request.accepted_renderer, NDJSONRenderer):
+            return super().list(request, *args, **kwargs)
+        queryset = self.filter_queryset(self.get_queryset())
+        return StreamingHttpResponse(
+            self.stream_rows(queryset),
+            content_type=NDJSONRenderer.media_type
+        )
+
+    def stream_rows(self, queryset):
+        serializer_class = self.get_serializer_class()
+        context = self.get_serializer_context()
+        rows = queryset.iterator(chunk_size=self.stream_chunk_size)
+        while True:
+            # Порция сериализуется целиком, чтобы связанные объекты
+            # подгружались одним запросом на порцию.
+            chunk = list(islice(rows, self.stream_chunk_size))
+            if not chunk:
+                return
+            # Своя карта авторов у каждой порции: общая для запроса
+            # копила бы всех авторов выгрузки.
+            chunk_context = {**context, 'author_map': AuthorMap()}
+            for row in serializer_class(
+                chunk, many=True, context=chunk_context
+            ).data:
+                yield NDJSONRenderer.render_row(row)
+
+
+class NestedParents:
+    """
+    Родители вложенного маршрута titles/{title_id}/reviews/{review_id}.
+
+    Вся цепочка проверяется одним запросом: отзыв загружается вместе
+    с произведением и только если он относится к этому произведению.
+    """
+
+    def __init__(self, title_id, review_id=None):
+        if review_id is None:
+            self.review = None
+            self.title = get_object_or_404(Title, pk=title_id)
+        else:
+            self.review = get_object_or_404(
+                Review.objects.select_related('title'),
+                pk=review_id, title_id=title_id
+            )
+            self.title = self.review.title
+
+
+class NestedParentsMixin:
+    """Родители маршрута, общие для вьюсета и сериализаторов запроса."""
+
+    def get_parents(self):
+        parents = getattr(self.request, '_nested_parents', None)
+        if parents is None:
+            parents = self.request._nested_parents = NestedParents(
+                self.kwargs.get('title_id'), self.kwargs.get('review_id')
+            )
+        return parents
+
+    def get_title(self):
+        return self.get_parents().title
+
+    def get_review(self):
+        return self.get_parents().review
+
+
+class CatalogListMixin:
+    """
+    Список справочника из снимка в памяти процесса.
+
+    Поиск и остальные действия работают с базой.
+    """
+    catalog_index = None
+
+    def filter_queryset(self, queryset):
+        if (self.action != 'list'
+                or api_settings.SEARCH_PARAM in self.request.query_params):
+            return super().filter_queryset(queryset)
+        return getattr(get_catalog(), self.catalog_index)
@@ -0,0 +1,58 @@
+from rest_framework.pagination import CursorPagination, LimitOffsetPagination
+
+
+class KeysetPagination(CursorPagination):
+    """Курсорная пагинация по индексированным полям без OFFSET и COUNT."""
+    page_size_query_param = 'limit'
+    max_page_size = 100
+
+    def __init__(self, ordering):
+        self.ordering = ordering
+
+
+class OptionalCursorPagination(LimitOffsetPagination):
+    """
+    Пагинация limit/offset с включаемым курсорным режимом.
+
+    Курсорный режим включается параметром `?pagination=cursor` или
+    наличием `?cursor=...`; порядок задаётся атрибутом `cursor_ordering`
+    вьюсета. Ответ в этом режиме содержит только `next`, `previous` и
+    `results`: непрозрачные курсоры вместо `count` и смещения.
+    """
+    mode_query_param = 'pagination'
+    cursor_mode = 'cursor'
+    default_cursor_ordering = ('id',)
+
+    keyset_paginator = None
+
+    def use_cursor(self, request):
+        return (
+            request.query_params.get(self.mode_query_param)
+            == self.cursor_mode
+            or KeysetPagination.cursor_query_param in request.query_params
+        )
+
+    def paginate_queryset(self, queryset, request, view=None):
+        if not self.use_cursor(request):
+            return super().paginate_queryset(queryset, request, view)
+        ordering = getattr(
+            view, 'cursor_ordering', self.default_cursor_ordering
+        )
+        self.keyset_paginator = KeysetPagination(ordering)
+        self.keyset_paginator.page_size = self.default_limit
+        if self.max_limit is not None:
+            self.keyset_paginator.max_page_size = self.max_limit
+        return self.keyset_paginator.paginate_queryset(
+            queryset, request, view
+        )
+
+    def get_paginated_response(self, data):
+        if self.keyset_paginator is not None:
+            return self.keyset_paginator.get_paginated_response(data)
+        return super().get_paginated_response(data)
+
+
+class BoundedPagination(OptionalCursorPagination):
+    """Пагинация с жёстким верхним пределом `limit` для длинных списков."""
+    default_limit = 10
+    max_limit = 100
@@ -0,0 +1,46 @@
+"""Учёт SQL-запросов, выполненных при обработке одного HTTP-запроса."""
+import re
+import time
+from collections import Counter
+
+from reviews import versions
+
+PLACEHOLDERS = re.compile(r'%s(?:\s*,\s*%s)+')
+
+
+def query_shape(sql):
+    """SQL без различий в числе параметров `IN (%s, %s, ...)`."""
+    return PLACEHOLDERS.sub('%s...', sql)
+
+
+class QueryInspector:
+    """
+    Обёртка для `connection.execute_wrapper`.
+
+    Считает запросы и суммарное время их выполнения и группирует их по
+    форме SQL, чтобы находить повторяющиеся запросы (N+1). Разовые
+    запросы перестройки снимков и индексов в памяти не учитываются.
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+        self.shapes = Counter()
+
+    def __call__(self, execute, sql, params, many, context):
+        if versions.is_rebuilding():
+            return execute(sql, params, many, context)
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.duration += time.perf_counter() - started
+            self.count += 1
+            self.shapes[query_shape(sql)] += 1
+
+    def repeated(self, threshold):
+        """Формы запросов, выполненные не меньше `threshold` раз."""
+        return {
+            shape: count for shape, count in self.shapes.items()
+            if count >= threshold
+        }
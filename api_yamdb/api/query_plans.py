@@ -0,0 +1,167 @@
+"""
+Планы SQLite (EXPLAIN QUERY PLAN) для запросов, выполненных ORM.
+
+Полный просмотр таблицы (SCAN) и сортировка во временном B-дереве
+(USE TEMP B-TREE) отмечаются как шаги, которые можно убрать индексом;
+для них предлагается индекс по колонкам условия и сортировки.
+"""
+import re
+import time
+
+from django.db import connection
+
+from .queries import query_shape
+
+# Шаги плана, которые обычно лечатся индексом.
+WARNINGS = ('USE TEMP B-TREE', 'SCAN ')
+# Виртуальные таблицы (FTS5, json_each) и подзапросы без таблицы.
+NOT_TABLES = ('VIRTUAL TABLE', 'CONSTANT ROW')
+
+STEP_TABLE = re.compile(r'^(?:SCAN|SEARCH) (\w+)')
+FROM_TABLE = re.compile(r'\bFROM "(\w+)"')
+COLUMN = re.compile(r'"(\w+)"\."(\w+)"')
+PREDICATE = re.compile(
+    r'"(\w+)"\."(\w+)" (=|IN|IS|<=?|>=?|LIKE)(?=\W)'
+)
+CLAUSE_END = re.compile(r' (?:GROUP BY|HAVING|ORDER BY|LIMIT) ')
+ORDER_END = re.compile(r' (?:LIMIT|OFFSET) ')
+EQUALITY = ('=', 'IN', 'IS')
+
+
+class RecordedQuery:
+    """Первый запрос формы, число её выполнений и суммарное время."""
+
+    def __init__(self, sql, params):
+        self.sql = sql
+        self.params = params
+        self.count = 0
+        self.duration = 0.0
+
+
+class PlanRecorder:
+    """
+    Обёртка `connection.execute_wrapper`: SELECT-запросы по формам SQL.
+
+    Формы — см. api.queries.query_shape.
+    """
+
+    def __init__(self):
+        self.queries = {}
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            if not many and sql.lstrip().upper().startswith('SELECT'):
+                shape = query_shape(sql)
+                query = self.queries.get(shape)
+                if query is None:
+                    query = self.queries[shape] = RecordedQuery(
+                        sql, tuple(params or ())
+                    )
+                query.count += 1
+                query.duration += time.perf_counter() - started
+
+
+def explain(sql, params):
+    """Строки плана с отступами по вложенности узлов."""
+    with connection.cursor() as cursor:
+        cursor.execute('EXPLAIN QUERY PLAN ' + sql, params)
+        rows = cursor.fetchall()
+    depth = {0: -1}
+    lines = []
+    for node, parent, _, detail in rows:
+        depth[node] = depth.get(parent, -1) + 1
+        lines.append('  ' * depth[node] + detail)
+    return lines
+
+
+def warnings(plan):
+    """Шаги плана с полным просмотром или временным B-деревом."""
+    return [
+        line.strip() for line in plan
+        if any(mark in line for mark in WARNINGS)
+        and not any(mark in line for mark in NOT_TABLES)
+    ]
+
+
+def clauses(sql):
+    """Части WHERE и ORDER BY внешнего запроса."""
+    where = order = ''
+    if ' WHERE ' in sql:
+        where = CLAUSE_END.split(sql.split(' WHERE ', 1)[1], 1)[0]
+    if ' ORDER BY ' in sql:
+        order = ORDER_END.split(sql.rsplit(' ORDER BY ', 1)[1], 1)[0]
+    return where, order
+
+
+def suggest_index(sql, step):
+    """
+    Индекс `таблица(колонки)`, убирающий шаг плана, или None.
+
+    Колонки: сначала сравнения на равенство из WHERE, затем для SCAN —
+    первое сравнение по диапазону, для TEMP B-TREE — колонки ORDER BY.
+    Просмотр без условий по таблице индексом не убрать, а уже
+    существующий индекс SQLite, видимо, счёл невыгодным.
+    """
+    match = STEP_TABLE.match(step) or FROM_TABLE.search(sql)
+    if match is None:
+        return None
+    table = match.group(1)
+    where, order = clauses(sql)
+    equal, ranges = [], []
+    for name, column, operator in PREDICATE.findall(where):
+        if name == table:
+            target = equal if operator in EQUALITY else ranges
+            if column not in equal and column not in ranges:
+                target.append(column)
+    if step.startswith('USE TEMP B-TREE'):
+        # Диапазон по другой колонке и сортировку один индекс не покроет.
+        ordered = [COLUMN.match(item) for item in order.split(', ')]
+        if ranges or not order or not all(
+            match and match.group(1) == table for match in ordered
+        ):
+            return None
+        columns = equal + [
+            match.group(2) for match in ordered
+            if match.group(2) not in equal
+        ]
+    else:
+        columns = equal + ranges[:1]
+    if not columns or has_index(table, columns):
+        return None
+    return f'{table}({", ".join(columns)})'
+
+
+def has_index(table, columns):
+    """Есть ли индекс, начинающийся с `columns`."""
+    with connection.cursor() as cursor:
+        constraints = connection.introspection.get_constraints(cursor, table)
+    return any(
+        constraint['index'] and (
+            constraint['columns'][:len(columns)] == columns
+        )
+        for constraint in constraints.values()
+    )
+
+
+def audit(queries):
+    """
+    Планы записанных запросов: {форма: {'plan', 'warnings', 'count',
+    'duration', 'suggestions'}}, где suggestions — пары (шаг, индекс).
+    """
+    report = {}
+    for shape, query in queries.items():
+        plan = explain(query.sql, query.params)
+        steps = warnings(plan)
+        report[shape] = {
+            'plan': plan,
+            'warnings': steps,
+            'count': query.count,
+            'duration': query.duration,
+            'suggestions': [
+                (step, suggest_index(shape, step)) for step in steps
+            ],
+        }
+    return report
@@ -0,0 +1,24 @@
+import json
+
+from rest_framework.renderers import BaseRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+
+class NDJSONRenderer(BaseRenderer):
+    """Рендерер JSON Lines: один объект на строку."""
+    media_type = 'application/x-ndjson'
+    format = 'ndjson'
+    charset = None
+
+    @staticmethod
+    def render_row(row):
+        return json.dumps(
+            row, cls=JSONEncoder, ensure_ascii=False
+        ).encode('utf-8') + b'\n'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        if isinstance(data, list):
+            return b''.join(self.render_row(row) for row in data)
+        return self.render_row(data)
@@ -0,0 +1,154 @@
+"""
+Кеш ответов API, общий для всех процессов на хосте.
+
+Ответы хранятся в отдельном файле SQLite. Ключ ответа включает версии
+групп данных, от которых он зависит (`titles`, `title:5`, `reviews:5`...).
+Версии групп лежат в общем хранилище `reviews.versions`, а не в файле
+кеша: тот же ключ служит ETag ответа и работает и с выключенным кешем.
+Изменение строки увеличивает версии её групп, и устаревшие ответы
+перестают находиться; место они освобождают при вытеснении по LRU,
+когда суммарный размер записей превышает бюджет.
+"""
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+
+from django.conf import settings
+
+from reviews import versions
+
+SCHEMA = (
+    'CREATE TABLE IF NOT EXISTS entries ('
+    ' key TEXT PRIMARY KEY, value BLOB NOT NULL,'
+    ' size INTEGER NOT NULL, accessed REAL NOT NULL)',
+    'CREATE INDEX IF NOT EXISTS entries_accessed ON entries (accessed)',
+)
+
+# Группа, от которой зависят все ответы: сбрасывает кеш целиком.
+ALL = 'all'
+# Имена групп в хранилище версий не пересекаются с его счётчиками.
+GROUP_PREFIX = 'group:'
+
+
+def group_versions(groups):
+    """Пары (группа, версия) для групп ответа и общей группы ALL."""
+    found = versions.current_many(
+        GROUP_PREFIX + group for group in {ALL, *groups}
+    )
+    return [(name[len(GROUP_PREFIX):], version) for name, version in found]
+
+
+def bump_groups(groups):
+    versions.bump_many(GROUP_PREFIX + group for group in groups)
+
+
+def make_key(request_key, versions):
+    """Ключ записи и ETag: запрос и версии групп его данных."""
+    payload = json.dumps([request_key, versions], ensure_ascii=False)
+    return hashlib.blake2b(payload.encode(), digest_size=20).hexdigest()
+
+
+class ResponseCache:
+    """
+    Хранилище ответов в SQLite с вытеснением по LRU.
+
+    Время доступа обновляется не чаще раза в `touch_interval` секунд,
+    чтобы чтение из кеша почти никогда не требовало записи.
+    """
+
+    def __init__(self, path, max_bytes, touch_interval=10):
+        self.path = str(path)
+        self.max_bytes = max_bytes
+        self.touch_interval = touch_interval
+        self.local = threading.local()
+
+    @property
+    def connection(self):
+        connection = getattr(self.local, 'connection', None)
+        if connection is None:
+            connection = sqlite3.connect(
+                self.path, timeout=30, isolation_level=None
+            )
+            connection.execute('PRAGMA journal_mode=WAL')
+            connection.execute('PRAGMA synchronous=NORMAL')
+            for statement in SCHEMA:
+                connection.execute(statement)
+            self.local.connection = connection
+        return connection
+
+    @contextmanager
+    def transaction(self):
+        self.connection.execute('BEGIN IMMEDIATE')
+        try:
+            yield
+        except BaseException:
+            self.connection.execute('ROLLBACK')
+            raise
+        self.connection.execute('COMMIT')
+
+    def get(self, key):
+        row = self.connection.execute(
+            'SELECT value, accessed FROM entries WHERE key = ?', (key,)
+        ).fetchone()
+        if row is None:
+            return None
+        value, accessed = row
+        now = time.time()
+        if now - accessed > self.touch_interval:
+            self.connection.execute(
+                'UPDATE entries SET accessed = ? WHERE key = ?', (now, key)
+            )
+        return value
+
+    def set(self, key, value):
+        if len(value) > self.max_bytes:
+            return
+        with self.transaction():
+            self.connection.execute(
+                'INSERT OR REPLACE INTO entries (key, value, size, accessed) '
+                'VALUES (?, ?, ?, ?)', (key, value, len(value), time.time())
+            )
+            self.evict()
+
+    def evict(self):
+        """Удаляет давно не читанные записи сверх бюджета."""
+        total, = self.connection.execute(
+            'SELECT COALESCE(SUM(size), 0) FROM entries'
+        ).fetchone()
+        excess = total - self.max_bytes
+        if excess <= 0:
+            return
+        stale = []
+        for key, size in self.connection.execute(
+            'SELECT key, size FROM entries ORDER BY accessed'
+        ):
+            stale.append((key,))
+            excess -= size
+            if excess <= 0:
+                break
+        self.connection.executemany(
+            'DELETE FROM entries WHERE key = ?', stale
+        )
+
+    def clear(self):
+        with self.transaction():
+            self.connection.execute('DELETE FROM entries')
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_response_cache():
+    """Кеш из `settings.RESPONSE_CACHE` или None, если кеш выключен."""
+    global _cache
+    config = getattr(settings, 'RESPONSE_CACHE', None)
+    if not config or not config.get('PATH'):
+        return None
+    with _cache_lock:
+        if _cache is None or _cache.path != str(config['PATH']):
+            _cache = ResponseCache(config['PATH'], config['MAX_BYTES'])
+        return _cache
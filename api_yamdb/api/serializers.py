@@ -1,16 +1,23 @@
 import datetime as dt
+from operator import attrgetter
 from typing import Any
 
 from django.contrib.auth.validators import UnicodeUsernameValidator
 from django.db.utils import IntegrityError
-from django.shortcuts import get_object_or_404
 from rest_framework import serializers
-from rest_framework.relations import StringRelatedField
-from rest_framework.serializers import SlugRelatedField
+from rest_framework.settings import api_settings
 from rest_framework.validators import UniqueValidator
 
-from reviews.models import Title, Genre, Category, Review, Comment
+from reviews.models import (GENRE_ORDERING, Category, Comment, Genre,
+                            Review, Title)
 from users.models import User
+from .fields import (
+    AuthorField,
+    AuthorListSerializer,
+    CatalogObjectField,
+    CatalogSlugField,
+    context_catalog,
+)
 
 
 class GenreSerializer(serializers.ModelSerializer):
@@ -32,7 +39,8 @@ class CategorySerializer(serializers.ModelSerializer):
 class TitleSerializer(serializers.ModelSerializer):
     """Сериализатор для обработки запросов к модели Title."""
     genre = GenreSerializer(many=True, required=True)
-    category = CategorySerializer(required=True)
+    category = CatalogObjectField(
+        'categories_by_id', CategorySerializer, source='category_id')
     rating = serializers.IntegerField(read_only=True)
 
     class Meta:
@@ -40,19 +48,15 @@ class TitleSerializer(serializers.ModelSerializer):
         fields = ('id', 'name', 'year',
                   'description', 'genre', 'category', 'rating')
 
-    def get_rating(self, obj):
-        """Получаем rating из аннотации queryset."""
-        return getattr(obj, 'rating', None)
-
 
 class TitleCreateSerializer(serializers.ModelSerializer):
     """Сериализатор для обработки POST запросов к модели Title."""
-    genre = SlugRelatedField(
-        queryset=Genre.objects.all(),
-        many=True, required=True, slug_field='slug')
-    category = SlugRelatedField(
-        queryset=Category.objects.all(),
-        required=True, slug_field='slug')
+    genre = CatalogSlugField(
+        index='genres_by_slug', queryset=Genre.objects.all(),
+        many=True, required=True)
+    category = CatalogSlugField(
+        index='categories_by_slug', queryset=Category.objects.all(),
+        required=True)
 
     class Meta:
         model = Title
@@ -69,17 +73,38 @@ class TitleCreateSerializer(serializers.ModelSerializer):
         return value
 
     def to_representation(self, instance):
+        # Жанры из запроса уже загружены при валидации, повторно
+        # в базу идём только при PATCH без поля genre.
+        genres = getattr(self, '_validated_data', {}).get('genre')
+        if genres is None:
+            genres = instance.genre.order_by(*GENRE_ORDERING)
+        else:
+            # Тот же порядок, что у GET: по имени, а не как в запросе.
+            genres = sorted(
+                dict.fromkeys(genres), key=attrgetter(*GENRE_ORDERING)
+            )
         return {
             'id': instance.id,
             'name': instance.name,
             'year': instance.year,
-            'rating': None,
+            'rating': instance.rating,
             'description': instance.description,
-            'genre': GenreSerializer(instance.genre.all(), many=True).data,
-            'category': CategorySerializer(instance.category).data,
+            'genre': GenreSerializer(genres, many=True).data,
+            'category': CategorySerializer(
+                context_catalog(self.context).categories_by_id.get(
+                    instance.category_id
+                )
+            ).data,
         }
 
 
+class TitleSuggestSerializer(serializers.Serializer):
+    """Параметры подсказок по названию произведения."""
+    q = serializers.CharField(allow_blank=True, trim_whitespace=False)
+    limit = serializers.IntegerField(
+        min_value=1, max_value=50, default=10)
+
+
 class UsersSerializer(serializers.ModelSerializer):
     """Сериализатор для обработки запросов к модели User."""
     username = serializers.CharField(
@@ -170,29 +195,39 @@ class SignUpSerializer(serializers.ModelSerializer):
 
 
 class ReviewSerializer(serializers.ModelSerializer):
-    author = StringRelatedField(read_only=True)
+    author = AuthorField()
 
     class Meta:
         model = Review
         fields = '__all__'
+        list_serializer_class = AuthorListSerializer
         read_only_fields = ('author', 'title')
 
-    def validate(self, data):
-        if self.context.get('request').method != 'POST':
-            return data
-        user = self.context.get('request').user
-        title_id = self.context.get('view').kwargs.get('title_id')
-        title = get_object_or_404(Title, id=title_id)
-        if Review.objects.filter(author=user, title=title).exists():
-            raise serializers.ValidationError(
-                'Вы уже оставляли отзыв на это произведение.')
-        return data
+    def create(self, validated_data):
+        """
+        Уникальность пары автор+произведение проверяет сама база:
+        отдельный запрос перед вставкой не защищает от гонки.
+        """
+        try:
+            return super().create(validated_data)
+        except IntegrityError:
+            if not Review.objects.filter(
+                author=validated_data['author'],
+                title=validated_data['title'],
+            ).exists():
+                raise
+            raise serializers.ValidationError({
+                api_settings.NON_FIELD_ERRORS_KEY: [
+                    'Вы уже оставляли отзыв на это произведение.'
+                ]
+            })
 
 
 class CommentSerializer(serializers.ModelSerializer):
-    author = StringRelatedField(read_only=True)
+    author = AuthorField()
 
     class Meta:
         model = Comment
         fields = '__all__'
+        list_serializer_class = AuthorListSerializer
         read_only_fields = ('author', 'review')
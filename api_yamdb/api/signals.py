@@ -0,0 +1,85 @@
+"""Сброс версий групп данных (ETag и кеш ответов) при изменении данных."""
+from django.db import transaction
+from django.db.models.signals import (m2m_changed, post_delete, post_migrate,
+                                      post_save)
+from django.dispatch import receiver
+
+from reviews.models import Category, Comment, Genre, Review, Title
+from reviews.signals import data_loaded
+from users.models import User
+from .response_cache import ALL, bump_groups
+
+
+def invalidate(*groups):
+    """Увеличивает версии групп после фиксации транзакции."""
+    transaction.on_commit(lambda: bump_groups(groups))
+
+
+@receiver(post_save, sender=Title)
+def title_changed(sender, instance, **kwargs):
+    invalidate('titles', f'title:{instance.pk}')
+
+
+@receiver(post_delete, sender=Title)
+def title_deleted(sender, instance, **kwargs):
+    # Список отзывов удалённого произведения должен отвечать 404,
+    # даже если отзывов не было.
+    invalidate('titles', f'title:{instance.pk}', f'reviews:{instance.pk}')
+
+
+@receiver(m2m_changed, sender=Title.genre.through)
+def title_genres_changed(sender, instance, action, **kwargs):
+    if action.startswith('post_'):
+        invalidate('titles', f'title:{instance.pk}')
+
+
+@receiver(post_save, sender=Review)
+def review_changed(sender, instance, raw=False, **kwargs):
+    # Отзыв меняет рейтинг произведения.
+    invalidate('titles', f'title:{instance.title_id}',
+               f'reviews:{instance.title_id}')
+
+
+@receiver(post_delete, sender=Review)
+def review_deleted(sender, instance, **kwargs):
+    invalidate('titles', f'title:{instance.title_id}',
+               f'reviews:{instance.title_id}', f'comments:{instance.pk}')
+
+
+@receiver(post_save, sender=Comment)
+@receiver(post_delete, sender=Comment)
+def comment_changed(sender, instance, **kwargs):
+    invalidate(f'comments:{instance.review_id}')
+
+
+@receiver(post_save, sender=Genre)
+@receiver(post_delete, sender=Genre)
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+def catalog_changed(sender, **kwargs):
+    invalidate('catalog')
+
+
+@receiver(post_save, sender=User)
+def user_changed(sender, instance, created, update_fields=None, **kwargs):
+    # В ответы отзывов и комментариев попадает только имя автора,
+    # а новый пользователь ещё не автор.
+    if created or (
+        update_fields is not None and 'username' not in update_fields
+    ):
+        return
+    if getattr(instance, 'loaded_username', None) == instance.username:
+        return
+    instance.loaded_username = instance.username
+    invalidate('users')
+
+
+@receiver(post_delete, sender=User)
+def user_deleted(sender, **kwargs):
+    invalidate('users')
+
+
+@receiver(post_migrate)
+@receiver(data_loaded)
+def database_changed(sender, **kwargs):
+    invalidate(ALL)
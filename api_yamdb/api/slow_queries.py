@@ -0,0 +1,257 @@
+"""
+Журнал медленных SQL-запросов.
+
+`SlowQueryLog` — обёртка `connection.execute_wrapper`. Время запроса с
+результатом складывается из execute() и чтения строк: SQLite вычисляет
+строки по мере fetch*(), поэтому запись делается при закрытии курсора,
+когда известны и полное время, и число прочитанных строк. Записи в виде
+JSON-строк уходят через QueueHandler в отдельный поток, который пишет их
+в RotatingFileHandler, — запрос не ждёт записи на диск. Ротация файла
+безопасна только в одном процессе, поэтому каждый процесс пишет в свой
+файл `slow.<pid>.log` рядом с настроенным `slow.log`.
+"""
+import atexit
+import json
+import logging
+import os
+import threading
+import time
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+from pathlib import Path
+from queue import SimpleQueue
+
+from .queries import query_shape
+
+logger = logging.getLogger('api.slow_queries')
+logger.propagate = False
+
+FETCH_METHODS = ('fetchone', 'fetchmany', 'fetchall', 'close')
+
+_lock = threading.Lock()
+_listener = None
+_config = None
+
+
+def param_shape(params, many=False):
+    """
+    Типы параметров без значений: `int, str, int*10`.
+
+    Для executemany — число наборов и форма первого.
+    """
+    if many:
+        params = list(params)
+        first = param_shape(params[0]) if params else ''
+        return f'{len(params)}x({first})'
+    shape = []
+    for value in params or ():
+        name = type(value).__name__
+        if shape and shape[-1][0] == name:
+            shape[-1][1] += 1
+        else:
+            shape.append([name, 1])
+    return ', '.join(
+        name if count == 1 else f'{name}*{count}' for name, count in shape
+    )
+
+
+def process_path(path, pid=None):
+    """Файл журнала процесса: `slow.log` -> `slow.<pid>.log`."""
+    path = Path(path)
+    return path.with_name(
+        f'{path.stem}.{pid or os.getpid()}{path.suffix}'
+    )
+
+
+def configure(path, max_bytes, backup_count):
+    """Подключает к логгеру очередь и поток записи в файл процесса."""
+    global _listener, _config
+    path = process_path(path)
+    config = str(path), max_bytes, backup_count
+    with _lock:
+        if _config == config:
+            return
+        stop()
+        handler = RotatingFileHandler(
+            path, maxBytes=max_bytes, backupCount=backup_count,
+            encoding='utf-8', delay=True,
+        )
+        handler.setFormatter(logging.Formatter('%(message)s'))
+        queue = SimpleQueue()
+        _listener = QueueListener(queue, handler)
+        _listener.start()
+        logger.handlers = [QueueHandler(queue)]
+        logger.setLevel(logging.INFO)
+        _config = config
+
+
+def stop():
+    """Дописывает очередь в файл и останавливает поток записи."""
+    global _listener, _config
+    if _listener is not None:
+        _listener.stop()
+        for handler in _listener.handlers:
+            handler.close()
+    logger.handlers = []
+    _listener = _config = None
+
+
+def flush():
+    with _lock:
+        if _listener is not None:
+            _listener.stop()
+            _listener.start()
+
+
+atexit.register(stop)
+
+
+class PendingStatement:
+    """
+    Запрос с результатом, строки которого ещё читаются.
+
+    Методы fetch*() и close() подменяются на время чтения атрибутами
+    экземпляра CursorWrapper; запись делается при закрытии курсора или
+    при следующем запросе через тот же курсор.
+    """
+
+    def __init__(self, log, cursor, sql, params, many, elapsed):
+        self.log = log
+        self.cursor = cursor
+        self.sql = sql
+        self.params = params
+        self.many = many
+        self.elapsed = elapsed
+        self.rows = 0
+        self.originals = {
+            name: getattr(cursor, name) for name in FETCH_METHODS
+        }
+        for name in FETCH_METHODS:
+            setattr(cursor, name, getattr(self, name))
+        cursor._pending_statement = self
+
+    def timed(self, name, *args):
+        started = time.perf_counter()
+        try:
+            return self.originals[name](*args)
+        finally:
+            self.elapsed += time.perf_counter() - started
+
+    def fetchone(self):
+        row = self.timed('fetchone')
+        if row is not None:
+            self.rows += 1
+        return row
+
+    def fetchmany(self, *args):
+        rows = self.timed('fetchmany', *args)
+        self.rows += len(rows)
+        return rows
+
+    def fetchall(self):
+        rows = self.timed('fetchall')
+        self.rows += len(rows)
+        return rows
+
+    def close(self):
+        close = self.originals['close']
+        self.finish()
+        return close()
+
+    def finish(self):
+        cursor = self.cursor
+        if cursor.__dict__.get('_pending_statement') is not self:
+            return
+        for name in (*FETCH_METHODS, '_pending_statement'):
+            cursor.__dict__.pop(name, None)
+        self.log.record(
+            self.sql, self.params, self.many, self.elapsed, self.rows
+        )
+
+
+class SlowQueryLog:
+    """
+    Обёртка `connection.execute_wrapper`, записывающая запросы дольше
+    `threshold` секунд с именем представления `view_name()`.
+    """
+
+    def __init__(self, threshold, view_name):
+        self.threshold = threshold
+        self.view_name = view_name
+
+    def __call__(self, execute, sql, params, many, context):
+        cursor = context['cursor']
+        pending = cursor.__dict__.get('_pending_statement')
+        if pending is not None:
+            pending.finish()
+        started = time.perf_counter()
+        result = execute(sql, params, many, context)
+        elapsed = time.perf_counter() - started
+        if cursor.description is None:
+            self.record(sql, params, many, elapsed, cursor.rowcount)
+        else:
+            PendingStatement(self, cursor, sql, params, many, elapsed)
+        return result
+
+    def record(self, sql, params, many, elapsed, rows):
+        if elapsed < self.threshold:
+            return
+        logger.info(json.dumps({
+            'time': datetime.now(timezone.utc).isoformat(
+                timespec='milliseconds'),
+            'view': self.view_name(),
+            'sql': query_shape(sql),
+            'params': param_shape(params, many),
+            'duration_ms': round(elapsed * 1000, 3),
+            'rows': rows if rows is None or rows >= 0 else None,
+        }, ensure_ascii=False))
+
+
+def log_files(path):
+    """Файлы журнала всех процессов для настроенного пути `path`."""
+    path = Path(path)
+    prefix, suffix = f'{path.stem}.', path.suffix
+    for candidate in sorted(path.parent.glob(f'{prefix}*{suffix}')):
+        pid = candidate.name[len(prefix):len(candidate.name) - len(suffix)]
+        if pid.isdigit():
+            yield candidate
+
+
+def read_entries(path, backup_count):
+    """Записи из файлов журнала всех процессов и их ротированных копий."""
+    for log_file in log_files(path):
+        for index in range(backup_count, -1, -1):
+            name = f'{log_file}.{index}' if index else str(log_file)
+            try:
+                with open(name, encoding='utf-8') as file:
+                    for line in file:
+                        try:
+                            yield json.loads(line)
+                        except ValueError:
+                            continue
+            except FileNotFoundError:
+                continue
+
+
+def summarize(entries):
+    """
+    Сводка по парам (представление, форма SQL): число, суммарное,
+    среднее и наибольшее время, строки.
+    """
+    groups = {}
+    for entry in entries:
+        key = entry.get('view'), entry.get('sql')
+        group = groups.get(key)
+        if group is None:
+            group = groups[key] = {
+                'view': key[0], 'sql': key[1], 'count': 0,
+                'total_ms': 0.0, 'max_ms': 0.0, 'rows': 0,
+            }
+        duration = entry.get('duration_ms') or 0.0
+        group['count'] += 1
+        group['total_ms'] += duration
+        group['max_ms'] = max(group['max_ms'], duration)
+        group['rows'] += entry.get('rows') or 0
+    for group in groups.values():
+        group['mean_ms'] = group['total_ms'] / group['count']
+    return list(groups.values())
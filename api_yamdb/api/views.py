@@ -1,20 +1,25 @@
 from django_filters.rest_framework import DjangoFilterBackend
 from django.core.mail import EmailMessage
-from django.shortcuts import get_object_or_404
-from rest_framework import permissions, status, viewsets, filters, mixins
+from rest_framework import permissions, status, viewsets, mixins
 from rest_framework.decorators import action
-from rest_framework.filters import SearchFilter
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from rest_framework.views import APIView
 from rest_framework_simplejwt.tokens import RefreshToken
 from rest_framework.pagination import LimitOffsetPagination
 from rest_framework.request import Request
-from django.db.models import Avg
 
-from reviews.models import Title, Genre, Category, Review
+from reviews.models import Title, Genre, Category
+from reviews.suggest import get_index as get_suggest_index
 from users.models import User
-from .filters import TitleFilterSet
+from .filters import SearchKeyFilter, TitleFilterSet, TitleSearchFilter
+from .mixins import (
+    CatalogListMixin,
+    ConditionalGetMixin,
+    NestedParentsMixin,
+    StreamingListMixin,
+)
+from .pagination import BoundedPagination, OptionalCursorPagination
 from .permissions import (
     AdminModeratorAuthorPermission,
     AdminOnly,
@@ -25,6 +30,7 @@ from .serializers import (
     GenreSerializer,
     CategorySerializer,
     TitleCreateSerializer,
+    TitleSuggestSerializer,
     SignUpSerializer,
     UsersSerializer,
     GetTokenSerializer,
@@ -33,59 +39,84 @@ from .serializers import (
 )
 
 
-class TitleViewSet(viewsets.ModelViewSet):
-    queryset = Title.objects.annotate(rating=Avg('reviews__score'))
+class TitleViewSet(ConditionalGetMixin, viewsets.ModelViewSet):
+    queryset = Title.objects.with_relations()
     http_method_names = ('get', 'post', 'patch', 'delete',)
     permission_classes = (IsAdminUserOrReadOnly,)
-    pagination_class = LimitOffsetPagination
-    filter_backends = (DjangoFilterBackend,)
+    pagination_class = OptionalCursorPagination
+    cursor_ordering = ('id',)
+    filter_backends = (DjangoFilterBackend, TitleSearchFilter)
     filterset_class = TitleFilterSet
+    query_budget = {'list': 5, 'retrieve': 4, 'suggest': 1}
+    cache_groups = {
+        'list': ('titles', 'catalog'),
+        'retrieve': ('title:{pk}', 'catalog'),
+        'suggest': ('titles',),
+    }
 
     def get_serializer_class(self):
         if self.request.method in ('POST', 'PATCH'):
             return TitleCreateSerializer
         return TitleSerializer
 
-    def get_queryset(self):
-        queryset = super().get_queryset()
-        queryset = queryset.annotate(rating=Avg('reviews__score'))
-        return queryset
+    @action(detail=False, methods=['get'])
+    def suggest(self, request: Request) -> Response:
+        """Подсказки по началу названия, лучшие по рейтингу."""
+        params = TitleSuggestSerializer(data=request.query_params)
+        params.is_valid(raise_exception=True)
+        suggestions = get_suggest_index().suggest(
+            params.validated_data['q'], params.validated_data['limit']
+        )
+        return Response([
+            {'id': title_id, 'name': name, 'rating': rating}
+            for title_id, name, rating in suggestions
+        ])
 
 
-class GenreViewSet(viewsets.GenericViewSet,
+class GenreViewSet(ConditionalGetMixin,
+                   CatalogListMixin,
+                   viewsets.GenericViewSet,
                    mixins.ListModelMixin,
                    mixins.CreateModelMixin,
                    mixins.DestroyModelMixin):
     queryset = Genre.objects.all()
+    catalog_index = 'genres'
     lookup_field = 'slug'
     serializer_class = GenreSerializer
     permission_classes = (IsAdminUserOrReadOnly,)
     pagination_class = LimitOffsetPagination
-    filter_backends = (filters.SearchFilter,)
-    search_fields = ('name',)
+    filter_backends = (SearchKeyFilter,)
+    query_budget = {'list': 3}
+    cache_groups = {'list': ('catalog',)}
 
 
-class CategoryViewSet(viewsets.GenericViewSet,
+class CategoryViewSet(ConditionalGetMixin,
+                      CatalogListMixin,
+                      viewsets.GenericViewSet,
                       mixins.ListModelMixin,
                       mixins.CreateModelMixin,
                       mixins.DestroyModelMixin):
     queryset = Category.objects.all()
+    catalog_index = 'categories'
     lookup_field = 'slug'
     serializer_class = CategorySerializer
     permission_classes = (IsAdminUserOrReadOnly,)
     pagination_class = LimitOffsetPagination
-    filter_backends = (filters.SearchFilter,)
-    search_fields = ('name',)
+    filter_backends = (SearchKeyFilter,)
+    query_budget = {'list': 3}
+    cache_groups = {'list': ('catalog',)}
 
 
 class UsersViewSet(viewsets.ModelViewSet):
     queryset = User.objects.order_by('username').all()
     serializer_class = UsersSerializer
     permission_classes = (IsAuthenticated, AdminOnly,)
+    pagination_class = OptionalCursorPagination
+    cursor_ordering = ('username',)
     lookup_field = 'username'
     http_method_names = ['get', 'post', 'patch', 'delete']
-    filter_backends = (SearchFilter, )
-    search_fields = ('username', )
+    filter_backends = (SearchKeyFilter,)
+    query_budget = {'list': 3, 'retrieve': 2, 'me': 1}
 
     @action(
         detail=False,
@@ -170,36 +201,35 @@ class APISignup(APIView):
         return Response(serializer.data, status=status.HTTP_200_OK)
 
 
-class ReviewViewSet(viewsets.ModelViewSet):
+class ReviewViewSet(ConditionalGetMixin, NestedParentsMixin,
+                    StreamingListMixin, viewsets.ModelViewSet):
     serializer_class = ReviewSerializer
-    """pagination_class = LimitOffsetPagination"""
+    pagination_class = BoundedPagination
+    cursor_ordering = ('pub_date', 'id')
     permission_classes = (AdminModeratorAuthorPermission,)
     http_method_names = ('get', 'post', 'delete', 'patch')
+    query_budget = {'list': 5, 'retrieve': 4}
+    cache_groups = ('reviews:{title_id}', 'users')
 
     def get_queryset(self):
         return self.get_title().reviews.all()
 
-    def get_title(self):
-        title_id = self.kwargs.get('title_id')
-        return get_object_or_404(Title, pk=title_id)
-
     def perform_create(self, serializer):
         serializer.save(title=self.get_title(), author=self.request.user)
 
 
-class CommentViewSet(viewsets.ModelViewSet):
+class CommentViewSet(ConditionalGetMixin, NestedParentsMixin,
+                     StreamingListMixin, viewsets.ModelViewSet):
     serializer_class = CommentSerializer
-    """pagination_class = LimitOffsetPagination"""
+    pagination_class = BoundedPagination
+    cursor_ordering = ('pub_date', 'id')
     permission_classes = (AdminModeratorAuthorPermission,)
     http_method_names = ('get', 'post', 'delete', 'patch')
+    query_budget = {'list': 5, 'retrieve': 4}
+    cache_groups = ('comments:{review_id}', 'users')
 
     def get_queryset(self):
         return self.get_review().comments.all()
 
-    def get_review(self):
-        review_id = self.kwargs.get('review_id')
-        return get_object_or_404(Review, pk=review_id,
-                                 title_id=self.kwargs.get('title_id'))
-
     def perform_create(self, serializer):
         serializer.save(review=self.get_review(), author=self.request.user)
@@ -1,6 +1,7 @@
 from pathlib import Path
 from datetime import timedelta
 import os
+import tempfile
 import dotenv
 
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -48,6 +49,9 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'api.middleware.QueryBudgetMiddleware',
+    'api.middleware.ResponseCacheMiddleware',
+    'api.middleware.SlowQueryMiddleware',
 ]
 
 REST_FRAMEWORK = {
@@ -67,6 +71,37 @@ SIMPLE_JWT = {
     'AUTH_HEADER_TYPES': ('Bearer',),
 }
 
+# MODE: log, raise (тесты) или header (стенд)
+QUERY_BUDGET = {
+    'MODE': os.getenv('QUERY_BUDGET_MODE', 'log'),
+    'REPEAT_THRESHOLD': 5,
+}
+
+# Версии снимков справочников и индексов в памяти процессов; файл
+# должен быть общим для всех процессов, обслуживающих одну базу.
+SHARED_VERSIONS = {
+    'PATH': os.getenv(
+        'SHARED_VERSIONS_PATH',
+        os.path.join(tempfile.gettempdir(), 'yamdb_versions.sqlite3'),
+    ),
+}
+
+# Кеш анонимных GET-ответов, общий для процессов на хосте;
+# включается путём RESPONSE_CACHE_PATH.
+RESPONSE_CACHE = {
+    'PATH': os.getenv('RESPONSE_CACHE_PATH', ''),
+    'MAX_BYTES': int(os.getenv('RESPONSE_CACHE_MAX_BYTES', 64 * 1024 * 1024)),
+}
+
+# Журнал SQL-запросов дольше порога (JSON-строки с ротацией файла,
+# свой файл у каждого процесса); включается путём SLOW_QUERY_LOG_PATH.
+SLOW_QUERY_LOG = {
+    'PATH': os.getenv('SLOW_QUERY_LOG_PATH', ''),
+    'THRESHOLD_MS': float(os.getenv('SLOW_QUERY_THRESHOLD_MS', 100)),
+    'MAX_BYTES': int(os.getenv('SLOW_QUERY_LOG_MAX_BYTES', 10 * 1024 * 1024)),
+    'BACKUP_COUNT': 5,
+}
+
 ROOT_URLCONF = 'api_yamdb.urls'
 
 TEMPLATES_DIR = BASE_DIR / 'templates'
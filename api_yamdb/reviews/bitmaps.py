@@ -0,0 +1,201 @@
+"""
+Битовые карты произведений по жанрам, категориям и годам в памяти процесса.
+
+Карта — целое число Python, в котором бит с номером id установлен у
+произведений из множества. Пересечение и объединение фильтров сводятся
+к `&` и `|` над картами без соединений с таблицей reviews_title_genre.
+Версионирование как у индекса подсказок: изменения этого процесса
+применяются к картам на месте, отставший процесс строит их заново.
+"""
+import threading
+from collections import defaultdict
+
+from django.db import transaction
+
+from . import versions
+
+VERSION_KEY = 'bitmaps'
+
+# Номера установленных битов для каждого значения байта.
+BYTE_BITS = tuple(
+    tuple(bit for bit in range(8) if value >> bit & 1) for value in range(256)
+)
+
+_lock = threading.RLock()
+_index = None
+
+
+def bitmap_from_ids(ids):
+    ids = list(ids)
+    if not ids:
+        return 0
+    data = bytearray(max(ids) // 8 + 1)
+    for item in ids:
+        data[item >> 3] |= 1 << (item & 7)
+    return int.from_bytes(data, 'little')
+
+
+def bitmap_ids(bitmap):
+    """Номера установленных битов по возрастанию."""
+    data = bitmap.to_bytes((bitmap.bit_length() + 7) // 8, 'little')
+    ids = []
+    for offset, value in enumerate(data):
+        if value:
+            base = offset * 8
+            ids.extend(base + bit for bit in BYTE_BITS[value])
+    return ids
+
+
+class TitleBitmaps:
+
+    def __init__(self, version, titles, links):
+        self.version = version
+        # id произведения -> (id категории, год)
+        self.titles = {}
+        categories = defaultdict(list)
+        years = defaultdict(list)
+        for title_id, category_id, year in titles:
+            self.titles[title_id] = (category_id, year)
+            categories[category_id].append(title_id)
+            years[year].append(title_id)
+        genres = defaultdict(list)
+        for title_id, genre_id in links:
+            genres[genre_id].append(title_id)
+        self.genres = self.build(genres)
+        self.categories = self.build(categories)
+        self.years = self.build(years)
+
+    @staticmethod
+    def build(groups):
+        return {key: bitmap_from_ids(ids) for key, ids in groups.items()}
+
+    def select(self, genre_ids, match_all=True, category_id=None, year=None):
+        """Карта произведений с жанрами `genre_ids` (все или любой)."""
+        bitmaps = [self.genres.get(genre_id, 0) for genre_id in genre_ids]
+        if not bitmaps:
+            return 0
+        bitmap = bitmaps[0]
+        for other in bitmaps[1:]:
+            bitmap = bitmap & other if match_all else bitmap | other
+        if category_id is not None:
+            bitmap &= self.categories.get(category_id, 0)
+        if year is not None:
+            bitmap &= self.years.get(year, 0)
+        return bitmap
+
+    @staticmethod
+    def set_bit(bitmaps, key, title_id):
+        bitmaps[key] = bitmaps.get(key, 0) | 1 << title_id
+
+    @staticmethod
+    def clear_bit(bitmaps, key, title_id):
+        bitmap = bitmaps.get(key, 0) & ~(1 << title_id)
+        if bitmap:
+            bitmaps[key] = bitmap
+        else:
+            bitmaps.pop(key, None)
+
+    def put_title(self, title_id, category_id, year):
+        old = self.titles.get(title_id)
+        if old == (category_id, year):
+            return
+        if old is not None:
+            self.clear_bit(self.categories, old[0], title_id)
+            self.clear_bit(self.years, old[1], title_id)
+        self.titles[title_id] = (category_id, year)
+        self.set_bit(self.categories, category_id, title_id)
+        self.set_bit(self.years, year, title_id)
+
+    def remove_title(self, title_id):
+        old = self.titles.pop(title_id, None)
+        if old is not None:
+            self.clear_bit(self.categories, old[0], title_id)
+            self.clear_bit(self.years, old[1], title_id)
+        self.unlink_title(title_id)
+
+    def link(self, pairs):
+        for title_id, genre_id in pairs:
+            self.set_bit(self.genres, genre_id, title_id)
+
+    def unlink(self, pairs):
+        for title_id, genre_id in pairs:
+            self.clear_bit(self.genres, genre_id, title_id)
+
+    def unlink_title(self, title_id):
+        self.unlink([(title_id, genre_id) for genre_id in list(self.genres)])
+
+    def drop_genre(self, genre_id):
+        self.genres.pop(genre_id, None)
+
+    def drop_category(self, category_id):
+        # Категория удалённой записи у произведений становится NULL.
+        bitmap = self.categories.pop(category_id, 0)
+        for title_id in bitmap_ids(bitmap):
+            self.put_title(title_id, None, self.titles[title_id][1])
+
+
+def current_version():
+    return versions.current(VERSION_KEY)
+
+
+def get_index():
+    """Актуальные карты; перестраивает их, если версия сменилась."""
+    global _index
+    version = current_version()
+    index = _index
+    if index is not None and index.version == version:
+        return index
+    # models.py импортирует этот модуль.
+    from .models import Title
+    with _lock:
+        if _index is None or _index.version != version:
+            titles = Title.objects.order_by().values_list(
+                'id', 'category_id', 'year'
+            )
+            links = Title.genre.through.objects.values_list(
+                'title_id', 'genre_id'
+            )
+            with versions.rebuilding():
+                _index = TitleBitmaps(
+                    version, titles.iterator(), links.iterator()
+                )
+        return _index
+
+
+def bump_version():
+    return versions.bump(VERSION_KEY)
+
+
+def apply(change, *args):
+    """Применяет изменение к картам процесса после фиксации транзакции."""
+    def on_commit():
+        with _lock:
+            version = bump_version()
+            index = _index
+            if index is None or index.version != version - 1:
+                return
+            getattr(index, change)(*args)
+            index.version = version
+    transaction.on_commit(on_commit)
+
+
+def title_saved(title):
+    apply('put_title', title.pk, title.category_id, title.year)
+
+
+def title_deleted(title_id):
+    apply('remove_title', title_id)
+
+
+def genres_changed(action, title_ids, genre_ids):
+    """Изменение связей произведений с жанрами (m2m_changed)."""
+    pairs = [
+        (title_id, genre_id)
+        for title_id in title_ids for genre_id in genre_ids
+    ]
+    apply('link' if action == 'post_add' else 'unlink', pairs)
+
+
+def invalidate():
+    """Перестроить карты во всех процессах (массовая загрузка)."""
+    transaction.on_commit(bump_version)
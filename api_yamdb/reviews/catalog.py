@@ -0,0 +1,67 @@
+"""
+Снимок справочников жанров и категорий в памяти процесса.
+
+Снимок помечается версией. Версия хранится в общем для процессов
+хранилище `reviews.versions` и увеличивается после фиксации транзакции,
+изменившей справочник; процесс, увидевший новую версию, перечитывает обе
+таблицы.
+"""
+import threading
+
+from django.db import transaction
+
+from . import versions
+
+VERSION_KEY = 'catalog'
+
+_lock = threading.Lock()
+_snapshot = None
+
+
+class Catalog:
+    """Неизменяемый снимок: объекты по порядку, по slug и по id."""
+
+    def __init__(self, version, genres, categories):
+        self.version = version
+        self.genres = genres
+        self.categories = categories
+        self.genres_by_slug = {genre.slug: genre for genre in genres}
+        self.genres_by_id = {genre.id: genre for genre in genres}
+        self.categories_by_slug = {
+            category.slug: category for category in categories
+        }
+        self.categories_by_id = {
+            category.id: category for category in categories
+        }
+
+
+def current_version():
+    return versions.current(VERSION_KEY)
+
+
+def get_catalog():
+    """Актуальный снимок; перечитывает таблицы, если версия сменилась."""
+    global _snapshot
+    version = current_version()
+    snapshot = _snapshot
+    if snapshot is not None and snapshot.version == version:
+        return snapshot
+    # models.py импортирует этот модуль.
+    from .models import Category, Genre
+    with _lock:
+        if _snapshot is None or _snapshot.version != version:
+            with versions.rebuilding():
+                _snapshot = Catalog(
+                    version, list(Genre.objects.all()),
+                    list(Category.objects.all()),
+                )
+        return _snapshot
+
+
+def bump_version():
+    return versions.bump(VERSION_KEY)
+
+
+def invalidate():
+    """Сбрасывает снимки после фиксации текущей транзакции."""
+    transaction.on_commit(bump_version)
@@ -0,0 +1,45 @@
+"""Проверки объектов базы, которых нет в моделях."""
+from django.core.checks import Error, Tags, register
+from django.db import connections
+from django.db.migrations.recorder import MigrationRecorder
+
+FTS_MIGRATION = ('reviews', '0010_title_search')
+# Без триггеров индекс молча отстаёт от таблицы произведений.
+FTS_OBJECTS = (
+    ('table', 'reviews_title_fts'),
+    ('trigger', 'reviews_title_fts_insert'),
+    ('trigger', 'reviews_title_fts_delete'),
+    ('trigger', 'reviews_title_fts_update'),
+)
+
+
+@register(Tags.database)
+def check_title_fts(app_configs=None, databases=None, **kwargs):
+    """Полнотекстовый индекс произведений и его триггеры на месте."""
+    errors = []
+    for alias in databases or ():
+        connection = connections[alias]
+        if connection.vendor != 'sqlite':
+            continue
+        recorder = MigrationRecorder(connection)
+        if not recorder.has_table() or (
+            FTS_MIGRATION not in recorder.applied_migrations()
+        ):
+            continue
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT type, name FROM sqlite_master "
+                "WHERE name LIKE 'reviews_title_fts%'"
+            )
+            found = set(cursor.fetchall())
+        missing = [name for kind, name in FTS_OBJECTS
+                   if (kind, name) not in found]
+        if missing:
+            errors.append(Error(
+                f'Full-text search objects are missing in database '
+                f'{alias!r}: {", ".join(missing)}',
+                hint='Migrate reviews back to 0009_title_ordering and '
+                     'forward again to recreate them.',
+                id='reviews.E001',
+            ))
+    return errors
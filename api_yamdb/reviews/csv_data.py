@@ -0,0 +1,277 @@
+"""Формат CSV-файлов static/data и их соответствие моделям."""
+import csv
+import gzip
+import hashlib
+import io
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.contrib.auth.tokens import default_token_generator
+from django.utils.dateparse import parse_datetime
+from django.utils.functional import cached_property
+
+from users.models import User
+from users.search import SearchKeyModel
+from .models import Category, Comment, Genre, Review, Title
+
+DATA_DIR = settings.BASE_DIR / 'static' / 'data'
+
+
+class CsvTable:
+    """
+    Описание одного CSV-файла.
+
+    `columns` — заголовок файла, `attnames` — соответствующие атрибуты
+    модели, `foreign_keys` — колонки, ссылающиеся на id другой таблицы.
+    """
+
+    def __init__(self, name, model, columns, attnames=None,
+                 foreign_keys=None, datetime_columns=()):
+        self.name = name
+        self.model = model
+        self.columns = columns
+        self.attnames = attnames or columns
+        self.foreign_keys = foreign_keys or {}
+        self.datetime_columns = datetime_columns
+
+    @property
+    def filename(self):
+        return f'{self.name}.csv'
+
+    def clean_row(self, row):
+        """Приводит строку CSV к значениям атрибутов модели."""
+        values = {}
+        for column, attname in zip(self.columns, self.attnames):
+            value = row.get(column, '')
+            if column in self.foreign_keys or column == 'id':
+                value = int(value) if value else None
+            elif column in self.datetime_columns:
+                value = parse_datetime(value) if value else None
+            values[attname] = value
+        return values
+
+    @cached_property
+    def fields(self):
+        by_attname = {
+            field.attname: field for field in self.model._meta.concrete_fields
+        }
+        return [by_attname[attname] for attname in self.attnames]
+
+    def attname(self, column):
+        return self.attnames[self.columns.index(column)]
+
+    @cached_property
+    def update_fields(self):
+        """Поля для bulk_update: колонки файла и вычисляемые из них."""
+        fields = list(self.attnames[1:])
+        if issubclass(self.model, SearchKeyModel):
+            fields.append('search_key')
+        return fields
+
+    def build(self, values):
+        obj = self.model(**values)
+        if isinstance(obj, SearchKeyModel):
+            # bulk_create не вызывает save(), ключ поиска задаём здесь.
+            obj.update_search_key()
+        return obj
+
+
+class UserCsvTable(CsvTable):
+    def build(self, values):
+        # bulk_create не вызывает post_save, код подтверждения задаём здесь.
+        user = super().build(values)
+        user.confirmation_code = default_token_generator.make_token(user)
+        return user
+
+
+TABLES = (
+    CsvTable('category', Category, ('id', 'name', 'slug')),
+    UserCsvTable(
+        'users', User,
+        ('id', 'username', 'email', 'role', 'bio',
+         'first_name', 'last_name'),
+    ),
+    CsvTable('genre', Genre, ('id', 'name', 'slug')),
+    CsvTable(
+        'titles', Title, ('id', 'name', 'year', 'category'),
+        attnames=('id', 'name', 'year', 'category_id'),
+        foreign_keys={'category': 'category'},
+    ),
+    CsvTable(
+        'genre_title', Title.genre.through, ('id', 'title_id', 'genre_id'),
+        foreign_keys={'title_id': 'titles', 'genre_id': 'genre'},
+    ),
+    CsvTable(
+        'review', Review,
+        ('id', 'title_id', 'text', 'author', 'score', 'pub_date'),
+        attnames=('id', 'title_id', 'text', 'author_id', 'score',
+                  'pub_date'),
+        foreign_keys={'title_id': 'titles', 'author': 'users'},
+        datetime_columns=('pub_date',),
+    ),
+    CsvTable(
+        'comments', Comment,
+        ('id', 'review_id', 'text', 'author', 'pub_date'),
+        attnames=('id', 'review_id', 'text', 'author_id', 'pub_date'),
+        foreign_keys={'review_id': 'review', 'author': 'users'},
+        datetime_columns=('pub_date',),
+    ),
+)
+
+TABLES_BY_NAME = {table.name: table for table in TABLES}
+# Таблицы, на id которых ссылаются другие: только их id нужны при
+# проверке внешних ключей.
+REFERENCED_TABLES = frozenset(
+    target for table in TABLES for target in table.foreign_keys.values()
+)
+
+
+def dependency_levels(tables=TABLES):
+    """
+    Группирует таблицы по уровням графа внешних ключей.
+
+    Таблицы одного уровня не ссылаются друг на друга и могут
+    обрабатываться одновременно; `tables` уже упорядочены по зависимостям.
+    """
+    depth = {}
+    levels = []
+    for table in tables:
+        level = max(
+            (depth[target] + 1 for target in table.foreign_keys.values()),
+            default=0
+        )
+        depth[table.name] = level
+        if level == len(levels):
+            levels.append([])
+        levels[level].append(table)
+    return levels
+
+
+def row_hash(table, values):
+    """Хэш содержимого строки, одинаковый для значений из CSV и из БД."""
+    normalized = tuple(
+        field.to_python(value)
+        for field, value in zip(table.fields, values)
+    )
+    return hashlib.blake2b(
+        repr(normalized).encode('utf-8'), digest_size=8
+    ).digest()
+
+
+def data_file(directory, table):
+    """Путь к файлу таблицы: `name.csv` или сжатый `name.csv.gz`."""
+    path = directory / table.filename
+    compressed = directory / f'{table.filename}.gz'
+    if not path.exists() and compressed.exists():
+        return compressed
+    return path
+
+
+def open_data(path, mode='rb', **kwargs):
+    opener = gzip.open if str(path).endswith('.gz') else open
+    return opener(path, mode, **kwargs)
+
+
+def read_rows(path):
+    """Читает CSV, возвращая пары (номер первой строки записи, значения)."""
+    with open_data(path, 'rt', newline='', encoding='utf-8') as file:
+        reader = csv.DictReader(file)
+        if reader.fieldnames is None:
+            return
+        line = reader.line_num + 1
+        for row in reader:
+            yield line, row
+            line = reader.line_num + 1
+
+
+def iter_records(file, offset=0, line=1):
+    """
+    Возвращает записи файла: (байты записи, смещение её конца,
+    номер следующей строки).
+
+    Запись заканчивается на строке с чётным числом кавычек с её начала,
+    поэтому переводы строк внутри кавычек не разрывают запись.
+    """
+    file.seek(offset)
+    quotes = 0
+    record = []
+    for raw in file:
+        offset += len(raw)
+        line += 1
+        quotes += raw.count(b'"')
+        record.append(raw)
+        if quotes % 2 == 0:
+            yield b''.join(record), offset, line
+            quotes = 0
+            record = []
+
+
+def read_header(path):
+    """Возвращает заголовок файла, смещение и номер первой строки данных."""
+    with open_data(path) as file:
+        record, end, line = next(iter_records(file), (b'', 0, 1))
+    text = record.decode('utf-8-sig')
+    header = next(csv.reader(io.StringIO(text, newline='')), [])
+    return header, end, line
+
+
+def split_chunks(path, offset, line, chunk_bytes):
+    """
+    Делит файл на куски по границам записей.
+
+    Возвращает (байты куска, смещение его конца, номер первой строки);
+    файл, в том числе сжатый gzip, читается последовательно один раз.
+    """
+    with open_data(path) as file:
+        parts = []
+        size = 0
+        start_line = line
+        for record, end, next_line in iter_records(file, offset, line):
+            parts.append(record)
+            size += len(record)
+            if size >= chunk_bytes:
+                yield b''.join(parts), end, start_line
+                parts = []
+                size = 0
+                start_line = next_line
+        if parts:
+            yield b''.join(parts), end, start_line
+
+
+def parse_chunk(table_name, path, header, data, end, line):
+    """
+    Разбирает кусок файла, в том числе в отдельном процессе.
+
+    Возвращает имя таблицы, смещение конца куска, номер следующей строки
+    и список пар (номер строки, значения атрибутов модели).
+    """
+    table = TABLES_BY_NAME[table_name]
+    reader = csv.reader(io.StringIO(data.decode('utf-8'), newline=''))
+    rows = []
+    row_line = line
+    for record in reader:
+        try:
+            values = table.clean_row(dict(zip(header, record)))
+        except ValueError as error:
+            raise ValueError(f'{path}:{row_line}: {error}') from error
+        rows.append((row_line, values))
+        row_line = line + reader.line_num
+    return table_name, end, row_line, rows
+
+
+@contextmanager
+def keep_auto_now_values(models):
+    """Отключает auto_now_add, чтобы сохранить pub_date из CSV."""
+    fields = [
+        field
+        for model in models
+        for field in model._meta.concrete_fields
+        if getattr(field, 'auto_now_add', False)
+    ]
+    for field in fields:
+        field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field in fields:
+            field.auto_now_add = True
@@ -0,0 +1,210 @@
+"""Проверка CSV-файлов static/data до загрузки в базу."""
+import datetime as dt
+from collections import Counter
+
+from django.core.validators import MaxValueValidator, MinValueValidator
+from django.db.backends.base.operations import BaseDatabaseOperations
+
+from .csv_data import TABLES, data_file, read_rows
+
+
+class CsvColumns:
+    """Содержимое CSV-файла по колонкам: {атрибут модели: [значения]}."""
+
+    def __init__(self, table, path):
+        self.table = table
+        self.filename = table.filename
+        self.lines = []
+        self.values = {attname: [] for attname in table.attnames}
+        self.errors = []
+        for line, row in read_rows(data_file(path, table)):
+            self.lines.append(line)
+            try:
+                cleaned = table.clean_row(row)
+            except ValueError as error:
+                self.errors.append((self.filename, line, str(error)))
+                cleaned = dict.fromkeys(table.attnames)
+            for attname, value in cleaned.items():
+                self.values[attname].append(value)
+
+    def error_at(self, index, message):
+        self.errors.append((self.filename, self.lines[index], message))
+
+
+def check_required(columns):
+    for field in columns.table.fields:
+        if field.blank or field.null:
+            continue
+        for index in [
+            i for i, value in enumerate(columns.values[field.attname])
+            if value in (None, '')
+        ]:
+            columns.error_at(index, f'{field.attname} is required')
+
+
+def to_int(value):
+    if value in (None, ''):
+        return None
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def bounded(current, limit, pick):
+    return limit if current is None else pick(current, limit)
+
+
+def value_range(field):
+    """
+    Диапазон типа поля, как его задают CHECK и переносимые границы
+    типов, суженный валидаторами поля. SQLite не добавляет границ типа
+    в validators, поэтому они берутся из общих настроек Django.
+    """
+    low, high = BaseDatabaseOperations.integer_field_ranges.get(
+        field.get_internal_type(), (None, None)
+    )
+    for validator in field.validators:
+        if isinstance(validator, MinValueValidator):
+            low = bounded(low, validator.limit_value, max)
+        elif isinstance(validator, MaxValueValidator):
+            high = bounded(high, validator.limit_value, min)
+    return low, high
+
+
+def check_ranges(columns, upper_bounds):
+    """
+    Диапазоны валидаторов поля; `upper_bounds` сужает только верхнюю
+    границу, нижняя остаётся от поля.
+    """
+    for field in columns.table.fields:
+        if not field.get_internal_type().endswith('IntegerField'):
+            continue
+        low, high = value_range(field)
+        bound = upper_bounds.get((columns.table.name, field.attname))
+        if bound is not None:
+            high = bounded(high, bound, min)
+        column = columns.values[field.attname]
+        numbers = [to_int(value) for value in column]
+        for index in [
+            i for i, (value, number) in enumerate(zip(column, numbers))
+            if number is None and value not in (None, '')
+        ]:
+            columns.error_at(
+                index, f'{field.attname}={column[index]!r} is not an integer'
+            )
+        for index in [
+            i for i, value in enumerate(numbers)
+            if value is not None and (
+                (low is not None and value < low)
+                or (high is not None and value > high)
+            )
+        ]:
+            columns.error_at(
+                index,
+                f'{field.attname}={column[index]} is out of range '
+                f'[{low}, {high}]'
+            )
+
+
+def check_choices(columns):
+    for field in columns.table.fields:
+        if not field.choices:
+            continue
+        allowed = {choice for choice, _ in field.choices}
+        if field.blank:
+            allowed.add('')
+        column = columns.values[field.attname]
+        for index in [
+            i for i, value in enumerate(column) if value not in allowed
+        ]:
+            columns.error_at(
+                index, f'{field.attname}={column[index]!r} is not '
+                f'one of {sorted(allowed)}'
+            )
+
+
+def check_lengths(columns):
+    for field in columns.table.fields:
+        if not getattr(field, 'max_length', None):
+            continue
+        column = columns.values[field.attname]
+        for index in [
+            i for i, value in enumerate(column)
+            if value and len(value) > field.max_length
+        ]:
+            columns.error_at(
+                index,
+                f'{field.attname} is longer than {field.max_length} '
+                'characters'
+            )
+
+
+def unique_groups(table):
+    """Наборы атрибутов, которые должны быть уникальны в файле."""
+    model = table.model
+    groups = [
+        (field.attname,) for field in table.fields
+        if field.unique or field.primary_key
+    ]
+    for names in model._meta.unique_together:
+        attnames = tuple(model._meta.get_field(name).attname
+                         for name in names)
+        if set(attnames) <= set(table.attnames):
+            groups.append(attnames)
+    return groups
+
+
+def check_unique(columns):
+    for attnames in unique_groups(columns.table):
+        keys = list(zip(*(columns.values[attname] for attname in attnames)))
+        counts = Counter(keys)
+        duplicates = {key for key, count in counts.items() if count > 1}
+        if not duplicates:
+            continue
+        seen = set()
+        for index, key in enumerate(keys):
+            if key not in duplicates:
+                continue
+            if key in seen:
+                columns.error_at(
+                    index, f'duplicate {"+".join(attnames)}={key}'
+                )
+            seen.add(key)
+
+
+def check_foreign_keys(columns, known_ids):
+    table = columns.table
+    for column, target in table.foreign_keys.items():
+        values = columns.values[table.attname(column)]
+        missing = set(values) - known_ids[target] - {None}
+        if not missing:
+            continue
+        for index in [i for i, value in enumerate(values) if value in missing]:
+            columns.error_at(
+                index, f'{column}={values[index]} not found in {target}.csv'
+            )
+
+
+def validate_data(path):
+    """
+    Проверяет все CSV-файлы и возвращает список ошибок.
+
+    Каждый файл читается в колонки один раз; диапазоны, уникальность и
+    внешние ключи проверяются операциями над целыми колонками.
+    Ошибка — кортеж (имя файла, номер строки, сообщение).
+    """
+    upper_bounds = {('titles', 'year'): dt.date.today().year}
+    known_ids = {}
+    errors = []
+    for table in TABLES:
+        columns = CsvColumns(table, path)
+        check_required(columns)
+        check_ranges(columns, upper_bounds)
+        check_choices(columns)
+        check_lengths(columns)
+        check_unique(columns)
+        check_foreign_keys(columns, known_ids)
+        known_ids[table.name] = set(columns.values['id']) - {None}
+        errors.extend(columns.errors)
+    return sorted(errors, key=lambda error: (error[0], error[1]))
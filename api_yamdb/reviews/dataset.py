@@ -0,0 +1,274 @@
+"""
+Детерминированная генерация данных в формате static/data.
+
+Каждая таблица делится на шарды фиксированного размера; шард получает
+собственный генератор случайных чисел, инициализированный строкой
+`seed:таблица:номер`. Поэтому результат зависит только от параметров и
+seed, но не от числа процессов, которые пишут шарды.
+"""
+import bisect
+import csv
+import datetime as dt
+import itertools
+import random
+from functools import lru_cache
+
+ROWS_PER_SHARD = 100_000
+TITLES_PER_SHARD = 1_000
+
+FIRST_DATE = dt.datetime(2010, 1, 1, tzinfo=dt.timezone.utc)
+DATE_RANGE_SECONDS = 14 * 365 * 24 * 60 * 60
+FIRST_YEAR = 1900
+LAST_YEAR = 2023
+
+CATEGORIES = (('Фильм', 'movie'), ('Книга', 'book'), ('Музыка', 'music'))
+GENRES = (
+    ('Драма', 'drama'), ('Комедия', 'comedy'), ('Вестерн', 'western'),
+    ('Фэнтези', 'fantasy'), ('Фантастика', 'sci-fi'),
+    ('Детектив', 'detective'), ('Триллер', 'thriller'), ('Сказка', 'tale'),
+    ('Гонзо', 'gonzo'), ('Роман', 'roman'), ('Баллада', 'ballad'),
+    ('Rock-n-roll', 'rock-n-roll'), ('Классика', 'classical'),
+    ('Рок', 'rock'), ('Шансон', 'chanson'),
+)
+WORDS = (
+    'ёлка', 'жизнь', 'звезда', 'история', 'книга', 'время', 'город', 'дорога',
+    'ночь', 'море', 'небо', 'огонь', 'песня', 'путь', 'свет', 'сердце',
+    'слово', 'солнце', 'тень', 'утро', 'хороший', 'странный', 'последний',
+    'тихий', 'белый', 'чёрный', 'долгий', 'новый', 'старый', 'вечный',
+    'очень', 'снова', 'всегда', 'никогда', 'просто', 'понравилось', 'сюжет',
+    'финал', 'герой', 'автор', 'актёр', 'музыка', 'смысл', 'эпизод',
+)
+ROLES = ('user',) * 97 + ('moderator',) * 2 + ('admin',)
+
+
+def shard_rng(seed, table, shard):
+    return random.Random(f'{seed}:{table}:{shard}')
+
+
+def random_text(rng, low, high):
+    return ' '.join(rng.choices(WORDS, k=rng.randint(low, high))).capitalize()
+
+
+def random_date(rng):
+    seconds = rng.randrange(DATE_RANGE_SECONDS)
+    date = FIRST_DATE + dt.timedelta(seconds=seconds)
+    return date.strftime('%Y-%m-%dT%H:%M:%SZ')
+
+
+@lru_cache(maxsize=4)
+def zipf_cum_weights(size, skew):
+    """Накопленные веса распределения Ципфа для рангов 1..size."""
+    return list(itertools.accumulate(
+        rank ** -skew for rank in range(1, size + 1)
+    ))
+
+
+def hot_users(rng, users, skew, count):
+    """`count` авторов; пользователи с меньшим id пишут чаще."""
+    if not skew:
+        return [rng.randint(1, users) for _ in range(count)]
+    cum_weights = zipf_cum_weights(users, skew)
+    total = cum_weights[-1]
+    return [
+        bisect.bisect_left(cum_weights, rng.random() * total) + 1
+        for _ in range(count)
+    ]
+
+
+def distinct_authors(rng, users, skew, count):
+    """`count` разных авторов: у отзыва пара author+title уникальна."""
+    if count * 4 > users:
+        return rng.sample(range(1, users + 1), count)
+    chosen = set()
+    while len(chosen) < count:
+        chosen.update(hot_users(rng, users, skew, count - len(chosen)))
+    return sorted(chosen)
+
+
+def reviews_per_title(titles, reviews, users, skew, seed):
+    """
+    Распределяет отзывы по произведениям по закону Ципфа.
+
+    Ранги перемешиваются, чтобы популярные произведения не шли подряд;
+    ни одно произведение не получает больше отзывов, чем пользователей.
+    """
+    if reviews > titles * users:
+        raise ValueError(
+            'Каждый пользователь может оставить только один отзыв '
+            'на произведение'
+        )
+    if not titles:
+        return []
+    weights = zipf_cum_weights(titles, skew) if skew else None
+    if weights is None:
+        counts = [reviews // titles] * titles
+    else:
+        total = weights[-1]
+        previous = 0
+        counts = []
+        for cumulative in weights:
+            counts.append(int(reviews * (cumulative - previous) / total))
+            previous = cumulative
+    counts = [min(count, users) for count in counts]
+    rest = reviews - sum(counts)
+    while rest:
+        for index in range(titles):
+            if rest and counts[index] < users:
+                counts[index] += 1
+                rest -= 1
+    random.Random(f'{seed}:titles-order').shuffle(counts)
+    return counts
+
+
+def genres_per_title(title_id):
+    return 1 + title_id * 7919 % 3
+
+
+def write_categories(writer, rng, shard, params):
+    for category_id in shard_ids(shard, params['categories']):
+        name, slug = named(CATEGORIES, category_id, 'Категория', 'category')
+        writer.writerow((category_id, name, slug))
+
+
+def write_genres(writer, rng, shard, params):
+    for genre_id in shard_ids(shard, params['genres']):
+        name, slug = named(GENRES, genre_id, 'Жанр', 'genre')
+        writer.writerow((genre_id, name, slug))
+
+
+def write_users(writer, rng, shard, params):
+    for user_id in shard_ids(shard, params['users']):
+        writer.writerow((
+            user_id, f'user{user_id}', f'user{user_id}@yamdb.fake',
+            rng.choice(ROLES), '', '', '',
+        ))
+
+
+def write_titles(writer, rng, shard, params):
+    for title_id in shard_ids(shard, params['titles']):
+        writer.writerow((
+            title_id, random_text(rng, 1, 4), rng.randint(
+                FIRST_YEAR, LAST_YEAR), rng.randint(1, params['categories']),
+        ))
+
+
+def write_genre_title(writer, rng, shard, params):
+    row_id = params['offset'] + 1
+    for title_id in title_shard(shard, params['titles']):
+        count = min(genres_per_title(title_id), params['genres'])
+        for genre_id in rng.sample(range(1, params['genres'] + 1), count):
+            writer.writerow((row_id, title_id, genre_id))
+            row_id += 1
+
+
+def write_reviews(writer, rng, shard, params):
+    first = shard * TITLES_PER_SHARD
+    review_id = params['offset'] + 1
+    for title_id, count in enumerate(params['counts'], first + 1):
+        for author in distinct_authors(
+            rng, params['users'], params['user_skew'], count
+        ):
+            writer.writerow((
+                review_id, title_id, random_text(rng, 5, 40), author,
+                rng.randint(1, 10), random_date(rng),
+            ))
+            review_id += 1
+
+
+def write_comments(writer, rng, shard, params):
+    ids = shard_ids(shard, params['comments'])
+    authors = hot_users(rng, params['users'], params['user_skew'], len(ids))
+    for comment_id, author in zip(ids, authors):
+        writer.writerow((
+            comment_id, rng.randint(1, params['reviews']),
+            random_text(rng, 3, 20), author, random_date(rng),
+        ))
+
+
+def shard_ids(shard, total):
+    return range(
+        shard * ROWS_PER_SHARD + 1,
+        min((shard + 1) * ROWS_PER_SHARD, total) + 1
+    )
+
+
+def named(names, row_id, prefix, slug_prefix):
+    if row_id <= len(names):
+        return names[row_id - 1]
+    return f'{prefix} {row_id}', f'{slug_prefix}-{row_id}'
+
+
+WRITERS = {
+    'category': write_categories,
+    'genre': write_genres,
+    'users': write_users,
+    'titles': write_titles,
+    'genre_title': write_genre_title,
+    'review': write_reviews,
+    'comments': write_comments,
+}
+
+
+# Параметр, задающий число строк таблицы; отзывы и genre_title
+# делятся на шарды по произведениям.
+SIZE_PARAMS = {
+    'category': 'categories', 'genre': 'genres', 'users': 'users',
+    'titles': 'titles', 'genre_title': 'titles', 'review': 'titles',
+    'comments': 'comments',
+}
+
+
+def shard_count(table, params):
+    per_shard = (
+        TITLES_PER_SHARD if table in ('genre_title', 'review')
+        else ROWS_PER_SHARD
+    )
+    return max(1, -(-params[SIZE_PARAMS[table]] // per_shard))
+
+
+def title_shard(shard, titles):
+    return range(
+        shard * TITLES_PER_SHARD + 1,
+        min((shard + 1) * TITLES_PER_SHARD, titles) + 1
+    )
+
+
+def plan_jobs(params):
+    """
+    Готовит задания (таблица, шард, параметры шарда).
+
+    Распределение отзывов и сквозные id строк считаются здесь, чтобы
+    шарды можно было писать независимо и в любом порядке.
+    """
+    counts = reviews_per_title(
+        params['titles'], params['reviews'], params['users'],
+        params['title_skew'], params['seed'],
+    )
+    jobs = []
+    offsets = {'review': 0, 'genre_title': 0}
+    for table in WRITERS:
+        for shard in range(shard_count(table, params)):
+            shard_params = dict(params)
+            if table == 'review':
+                titles = title_shard(shard, params['titles'])
+                shard_params['counts'] = counts[
+                    titles.start - 1:titles.stop - 1
+                ]
+                shard_params['offset'] = offsets[table]
+                offsets[table] += sum(shard_params['counts'])
+            elif table == 'genre_title':
+                shard_params['offset'] = offsets[table]
+                offsets[table] += sum(
+                    min(genres_per_title(title_id), params['genres'])
+                    for title_id in title_shard(shard, params['titles'])
+                )
+            jobs.append((table, shard, shard_params))
+    return jobs
+
+
+def write_shard(table, shard, params, path):
+    """Пишет один шард таблицы в отдельный файл без заголовка."""
+    rng = shard_rng(params['seed'], table, shard)
+    with open(path, 'w', newline='', encoding='utf-8') as file:
+        WRITERS[table](csv.writer(file), rng, shard, params)
+    return table, shard
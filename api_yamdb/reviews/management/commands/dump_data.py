@@ -0,0 +1,69 @@
+import csv
+import datetime as dt
+import time
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+
+from reviews.csv_data import TABLES, open_data
+
+
+def csv_value(value):
+    if value is None:
+        return ''
+    if isinstance(value, dt.datetime):
+        return value.isoformat().replace('+00:00', 'Z')
+    return value
+
+
+class Command(BaseCommand):
+    help = 'Dump tables to CSV files in the format of load_initial_data'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'path', type=Path,
+            help='Directory to write CSV files to',
+        )
+        parser.add_argument(
+            '--gzip', action='store_true',
+            help='Write gzip-compressed name.csv.gz files',
+        )
+        parser.add_argument(
+            '--chunk-size', type=int, default=2000,
+            help='Number of rows fetched from the database at a time',
+        )
+
+    def handle(self, *args, **options):
+        path = options['path']
+        if options['chunk_size'] < 1:
+            raise CommandError('--chunk-size must be positive')
+        path.mkdir(parents=True, exist_ok=True)
+        for table in TABLES:
+            started = time.perf_counter()
+            filename = path / table.filename
+            if options['gzip']:
+                filename = filename.with_name(f'{table.filename}.gz')
+            count = self.dump_table(table, filename, options['chunk_size'])
+            elapsed = time.perf_counter() - started
+            rate = count / elapsed if elapsed else 0
+            self.stdout.write(
+                f'{table.name}: {count} rows in {elapsed:.2f}s '
+                f'({rate:.0f} rows/s)'
+            )
+        self.stdout.write(self.style.SUCCESS(f'Data dumped to {path}'))
+
+    def dump_table(self, table, filename, chunk_size):
+        """Пишет строки в файл по мере чтения, не накапливая их в памяти."""
+        rows = table.model.objects.order_by('pk').values_list(
+            *table.attnames
+        ).iterator(chunk_size=chunk_size)
+        count = 0
+        with open_data(
+            filename, 'wt', newline='', encoding='utf-8'
+        ) as file:
+            writer = csv.writer(file)
+            writer.writerow(table.columns)
+            for row in rows:
+                writer.writerow([csv_value(value) for value in row])
+                count += 1
+        return count
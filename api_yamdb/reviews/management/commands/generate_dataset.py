@@ -0,0 +1,104 @@
+import shutil
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+
+from reviews.csv_data import TABLES
+from reviews.dataset import plan_jobs, write_shard
+
+
+class Command(BaseCommand):
+    help = 'Generate a synthetic dataset in the static/data CSV format'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'path', type=Path,
+            help='Directory to write CSV files to',
+        )
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--users', type=int, default=1000)
+        parser.add_argument('--titles', type=int, default=200)
+        parser.add_argument('--reviews', type=int, default=5000)
+        parser.add_argument('--comments', type=int, default=10000)
+        parser.add_argument('--genres', type=int, default=15)
+        parser.add_argument('--categories', type=int, default=3)
+        parser.add_argument(
+            '--title-skew', type=float, default=1.1,
+            help='Zipf exponent of reviews per title, 0 for uniform',
+        )
+        parser.add_argument(
+            '--user-skew', type=float, default=1.0,
+            help='Zipf exponent of activity per user, 0 for uniform',
+        )
+        parser.add_argument(
+            '--workers', type=int, default=1,
+            help='Number of processes writing table shards',
+        )
+
+    def handle(self, *args, **options):
+        params = {
+            name: options[name] for name in (
+                'seed', 'users', 'titles', 'reviews', 'comments', 'genres',
+                'categories', 'title_skew', 'user_skew',
+            )
+        }
+        self.check_params(params, options['workers'])
+        started = time.perf_counter()
+        try:
+            jobs = plan_jobs(params)
+        except ValueError as error:
+            raise CommandError(error) from error
+
+        path = options['path']
+        path.mkdir(parents=True, exist_ok=True)
+        with tempfile.TemporaryDirectory(dir=path) as parts_dir:
+            parts = {
+                (table, shard): Path(parts_dir) / f'{table}.{shard:06d}.csv'
+                for table, shard, _ in jobs
+            }
+            with ProcessPoolExecutor(options['workers']) as executor:
+                for future in [
+                    executor.submit(
+                        write_shard, table, shard, shard_params,
+                        parts[table, shard]
+                    )
+                    for table, shard, shard_params in jobs
+                ]:
+                    future.result()
+            for table in TABLES:
+                self.join_parts(
+                    table, path,
+                    [part for (name, _), part in sorted(parts.items())
+                     if name == table.name]
+                )
+
+        elapsed = time.perf_counter() - started
+        self.stdout.write(self.style.SUCCESS(
+            f'Dataset written to {path} in {elapsed:.2f}s'))
+
+    def check_params(self, params, workers):
+        if workers < 1 or any(
+            params[name] < 0 for name in (
+                'users', 'titles', 'reviews', 'comments', 'title_skew',
+                'user_skew',
+            )
+        ):
+            raise CommandError('Sizes, skews and --workers must be positive')
+        if params['genres'] < 1 or params['categories'] < 1:
+            raise CommandError('--genres and --categories must be positive')
+        if params['comments'] and not params['reviews']:
+            raise CommandError('Comments require at least one review')
+        if params['reviews'] and not (params['titles'] and params['users']):
+            raise CommandError('Reviews require titles and users')
+
+    def join_parts(self, table, path, parts):
+        """Склеивает шарды таблицы в один файл с заголовком."""
+        with open(path / table.filename, 'wb') as output:
+            output.write((','.join(table.columns) + '\r\n').encode('utf-8'))
+            for part in parts:
+                with open(part, 'rb') as source:
+                    shutil.copyfileobj(source, output)
+        self.stdout.write(f'{table.name}: {len(parts)} shards')
@@ -1,106 +1,383 @@
-import csv
+import json
+import os
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import nullcontext
+from pathlib import Path
 
-from django.core.management.base import BaseCommand
+import django
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.core.management.color import no_style
+from django.db import connection, transaction
 
-from reviews.models import Title, Category, Genre, Review, Comment
-from users.models import User
+from reviews.csv_data import (
+    DATA_DIR, REFERENCED_TABLES, TABLES, data_file, dependency_levels,
+    keep_auto_now_values, parse_chunk, read_header, read_rows, row_hash,
+    split_chunks
+)
+from reviews import catalog
+from reviews.models import Title
+from reviews.signals import data_loaded
+
+INSERT = 'insert'
+UPDATE = 'update'
+
+
+class Checkpoint:
+    """Смещения загруженных частей файлов: {имя файла: [байт, строка]}."""
+
+    def __init__(self, path, resume=False):
+        self.path = path
+        self.offsets = {}
+        if path and resume and path.exists():
+            self.offsets = json.loads(path.read_text())
+
+    def __bool__(self):
+        return self.path is not None
+
+    def get(self, filename, default):
+        return tuple(self.offsets.get(filename, default))
+
+    def save(self, filename, offset, line):
+        self.offsets[filename] = [offset, line]
+        tmp = self.path.with_name(self.path.name + '.tmp')
+        tmp.write_text(json.dumps(self.offsets))
+        os.replace(tmp, self.path)
+
+    def clear(self):
+        if self.path and self.path.exists():
+            self.path.unlink()
+
+
+def bounded_map(executor, jobs, prefetch):
+    """Как executor.map, но держит в работе не больше `prefetch` задач."""
+    if executor is None:
+        yield from (parse_chunk(*job) for job in jobs)
+        return
+    pending = deque()
+    for job in jobs:
+        pending.append(executor.submit(parse_chunk, *job))
+        if len(pending) >= prefetch:
+            yield pending.popleft().result()
+    while pending:
+        yield pending.popleft().result()
 
 
 class Command(BaseCommand):
     help = 'Load initial data from CSV files'
 
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--path', type=Path, default=DATA_DIR,
+            help='Directory with CSV files (default: static/data)',
+        )
+        parser.add_argument(
+            '--batch-size', type=int, default=1000,
+            help='Number of rows per INSERT statement',
+        )
+        parser.add_argument(
+            '--workers', type=int, default=1,
+            help='Number of processes parsing CSV chunks in parallel',
+        )
+        parser.add_argument(
+            '--chunk-size', type=int, default=1 << 20,
+            help='Approximate size in bytes of a parsed CSV chunk',
+        )
+        parser.add_argument(
+            '--checkpoint', type=Path,
+            help='Commit every chunk and record loaded byte offsets here',
+        )
+        parser.add_argument(
+            '--resume', action='store_true',
+            help='Continue from offsets recorded in --checkpoint',
+        )
+        parser.add_argument(
+            '--validate', action='store_true',
+            help='Run validate_initial_data before loading',
+        )
+        mode = parser.add_mutually_exclusive_group()
+        mode.add_argument(
+            '--upsert', action='store_true',
+            help='Insert new rows and update existing rows by id',
+        )
+        mode.add_argument(
+            '--diff', action='store_true',
+            help='Insert, update or delete only rows that differ from CSV',
+        )
+
     def handle(self, *args, **options):
-        # Load Categories
-        with open('static/data/category.csv', 'r') as file:
-            reader = csv.DictReader(file)
-            for row in reader:
-                Category.objects.create(
-                    id=row['id'],
-                    name=row['name'],
-                    slug=row['slug'],
-                )
-        # Load Users
-        with open('static/data/users.csv', 'r') as file:
-            reader = csv.DictReader(file)
-            for row in reader:
-                User.objects.create(
-                    id=row['id'],
-                    username=row['username'],
-                    email=row['email'],
-                    role=row['role'],
-                    bio=row['bio'],
-                    first_name=row['first_name'],
-                    last_name=row['last_name'],
-                )
+        path = options['path']
+        batch_size = options['batch_size']
+        if batch_size < 1 or options['workers'] < 1:
+            raise CommandError('--batch-size and --workers must be positive')
+        if options['resume'] and not options['checkpoint']:
+            raise CommandError('--resume requires --checkpoint')
+        if (options['upsert'] or options['diff']) and (
+            options['checkpoint'] or options['workers'] > 1
+        ):
+            raise CommandError(
+                '--checkpoint and --workers apply only to plain inserts')
+        if options['validate']:
+            call_command(
+                'validate_initial_data', path=path,
+                stdout=self.stdout, stderr=self.stderr,
+            )
+        checkpoint = Checkpoint(options['checkpoint'], options['resume'])
+        models = [table.model for table in TABLES]
 
-        # Load Genres
-        with open('static/data/genre.csv', 'r') as file:
-            reader = csv.DictReader(file)
-            for row in reader:
-                Genre.objects.create(
-                    id=row['id'],
-                    name=row['name'],
-                    slug=row['slug'],
+        # С контрольными точками каждый кусок фиксируется отдельно.
+        outer = nullcontext() if checkpoint else transaction.atomic()
+        with outer, keep_auto_now_values(models):
+            if options['diff']:
+                self.load_diff(path, batch_size)
+            elif options['upsert']:
+                self.load_upsert(path, batch_size)
+            else:
+                self.load_insert(
+                    path, batch_size, options['workers'],
+                    options['chunk_size'], checkpoint, options['resume'],
                 )
+            with transaction.atomic():
+                Title.objects.recalculate_ratings()
+                self.reset_sequences(models)
+                catalog.invalidate()
+                data_loaded.send(sender=self.__class__)
+        checkpoint.clear()
 
-        # Load Titles
-        with open('static/data/titles.csv', 'r') as file:
-            reader = csv.DictReader(file)
-            for row in reader:
-                category_id = row['category']
-                category = Category.objects.get(id=category_id)
-
-                Title.objects.create(
-                    id=row['id'],
-                    name=row['name'],
-                    year=row['year'],
-                    category=category,
-                )
+        self.stdout.write(
+            self.style.SUCCESS('Successfully loaded initial data'))
+
+    def load_insert(self, path, batch_size, workers, chunk_size,
+                    checkpoint, resume):
+        """
+        Вставляет строки пачками, уровень графа зависимостей за уровнем.
 
-        with open('static/data/genre_title.csv', 'r') as file:
-            reader = csv.DictReader(file)
-            for row in reader:
-                title_id = row['title_id']
-                title = Title.objects.get(id=title_id)
-                genre_id = row['genre_id']
-                genre = Genre.objects.get(id=genre_id)
-
-                title.genre.add(genre)
-
-        # Load Reviews
-        with open('static/data/review.csv', 'r') as file:
-            reader = csv.DictReader(file)
-            for row in reader:
-                title_id = row['title_id']
-                title = Title.objects.get(id=title_id)
-                author_id = row['author']
-                author = User.objects.get(id=author_id)
-
-                Review.objects.create(
-                    id=row['id'],
-                    title=title,
-                    text=row['text'],
-                    author=author,
-                    score=row['score'],
-                    pub_date=row['pub_date'],
+        Куски файлов одного уровня разбираются пулом процессов заранее,
+        пока предыдущие куски вставляются; запись идёт через одно
+        соединение, поэтому подходит и для SQLite с единственным писателем.
+        """
+        known_ids = {}
+        executor = ProcessPoolExecutor(
+            workers, initializer=django.setup
+        ) if workers > 1 else None
+        with executor or nullcontext():
+            for level in dependency_levels():
+                jobs = []
+                for table in level:
+                    if table.name in REFERENCED_TABLES:
+                        known_ids[table.name] = set(
+                            table.model.objects.values_list('pk', flat=True)
+                        ) if resume else set()
+                    jobs.append(self.table_chunks(
+                        table, path, chunk_size, checkpoint
+                    ))
+                self.load_level(
+                    level, bounded_map(
+                        executor, (job for chunks in jobs for job in chunks),
+                        workers * 2
+                    ),
+                    batch_size, checkpoint, known_ids, resume
                 )
 
-        # Load Comments
-        with open('static/data/comments.csv', 'r') as file:
-            reader = csv.DictReader(file)
-            for row in reader:
-                review_id = row['review_id']
-                review = Review.objects.get(id=review_id)
-                author_id = row['author']
-                author = User.objects.get(id=author_id)
-
-                Comment.objects.create(
-                    id=row['id'],
-                    review=review,
-                    text=row['text'],
-                    author=author,
-                    pub_date=row['pub_date'],
+    def table_chunks(self, table, path, chunk_size, checkpoint):
+        filename = data_file(path, table)
+        header, data_offset, data_line = read_header(filename)
+        offset, line = checkpoint.get(
+            table.filename, (data_offset, data_line)
+        )
+        for data, end, start_line in split_chunks(
+            filename, offset, line, chunk_size
+        ):
+            yield table.name, str(filename), header, data, end, start_line
+
+    def load_level(self, level, chunks, batch_size, checkpoint, known_ids,
+                   resume=False):
+        tables = {table.name: table for table in level}
+        # Кусок мог зафиксироваться без записи контрольной точки: первый
+        # кусок каждой таблицы при продолжении сверяется с базой.
+        unchecked = set(tables) if resume else set()
+        counts = dict.fromkeys(tables, 0)
+        # Время между кусками (ожидание разбора и вставка) относится к
+        # таблице полученного куска.
+        elapsed = dict.fromkeys(tables, 0.0)
+        previous = time.perf_counter()
+        try:
+            for name, end, next_line, rows in chunks:
+                table = tables[name]
+                ids = known_ids.get(name)
+                objs = []
+                for line, values in rows:
+                    self.check_foreign_keys(
+                        table, table.filename, line, values, known_ids
+                    )
+                    if ids is not None:
+                        ids.add(values['id'])
+                    objs.append(table.build(values))
+                if name in unchecked:
+                    unchecked.discard(name)
+                    objs = self.skip_loaded(table, objs, batch_size)
+                with transaction.atomic():
+                    table.model.objects.bulk_create(objs, batch_size)
+                if checkpoint:
+                    checkpoint.save(table.filename, end, next_line)
+                counts[name] += len(objs)
+                now = time.perf_counter()
+                elapsed[name] += now - previous
+                previous = now
+        except ValueError as error:
+            raise CommandError(error) from error
+        for table in level:
+            self.report(
+                table, inserted=counts[table.name],
+                elapsed=elapsed[table.name],
+            )
+
+    def skip_loaded(self, table, objs, batch_size):
+        """Убирает объекты, id которых уже есть в таблице."""
+        loaded = set()
+        for start in range(0, len(objs), batch_size):
+            loaded.update(table.model.objects.filter(pk__in=[
+                obj.pk for obj in objs[start:start + batch_size]
+            ]).values_list('pk', flat=True))
+        return [obj for obj in objs if obj.pk not in loaded]
+
+    def load_upsert(self, path, batch_size):
+        """Вставляет новые строки и перезаписывает существующие по id."""
+        known_ids = {}
+        for table in TABLES:
+            started = time.perf_counter()
+            existing = dict.fromkeys(
+                table.model.objects.order_by().values_list('pk', flat=True)
+            )
+            if table.name in REFERENCED_TABLES:
+                known_ids[table.name] = set(existing)
+            batches = {INSERT: [], UPDATE: []}
+            counts = {INSERT: 0, UPDATE: 0}
+            for action, obj in self.read_table(
+                table, path, existing, known_ids, known_ids.get(table.name)
+            ):
+                batches[action].append(obj)
+                counts[action] += 1
+                if len(batches[action]) >= batch_size:
+                    self.write(table, action, batches[action], batch_size)
+                    batches[action] = []
+            for action, batch in batches.items():
+                self.write(table, action, batch, batch_size)
+            self.report(
+                table, inserted=counts[INSERT], updated=counts[UPDATE],
+                elapsed=time.perf_counter() - started,
+            )
+
+    def load_diff(self, path, batch_size):
+        """
+        Сравнивает CSV с таблицами по id и хэшу содержимого.
+
+        В памяти держатся только изменившиеся строки. Удаления выполняются
+        первыми в обратном порядке зависимостей, чтобы освободить slug и
+        пары author+title до вставки новых строк.
+        """
+        known_ids = {}
+        changes = []
+        for table in TABLES:
+            started = time.perf_counter()
+            existing = {
+                row[0]: row_hash(table, row)
+                for row in table.model.objects.order_by().values_list(
+                    *table.attnames
+                ).iterator()
+            }
+            seen = set()
+            changed = {INSERT: [], UPDATE: []}
+            for action, obj in self.read_table(
+                table, path, existing, known_ids, seen
+            ):
+                changed[action].append(obj)
+            stale = set(existing) - seen
+            if table.name in REFERENCED_TABLES:
+                known_ids[table.name] = seen
+            changes.append(
+                (table, changed, stale, time.perf_counter() - started)
+            )
+
+        deleted = {}
+        for table, _, stale, _ in reversed(changes):
+            deleted[table.name] = len(stale)
+            ids = list(stale)
+            for start in range(0, len(ids), batch_size):
+                table.model.objects.filter(
+                    pk__in=ids[start:start + batch_size]
+                ).delete()
+
+        for table, changed, _, elapsed in changes:
+            started = time.perf_counter()
+            for action, objs in changed.items():
+                self.write(table, action, objs, batch_size)
+            self.report(
+                table,
+                inserted=len(changed[INSERT]), updated=len(changed[UPDATE]),
+                deleted=deleted[table.name],
+                elapsed=elapsed + time.perf_counter() - started,
+            )
+
+    def read_table(self, table, path, existing, known_ids, seen=None):
+        """
+        Возвращает пары (действие, объект) для строк файла.
+
+        Строки, id которых есть в `existing` с тем же хэшем, пропускаются;
+        значение `None` в `existing` означает безусловное обновление.
+        id прочитанных строк добавляются в `seen`, если он задан.
+        """
+        filename = data_file(path, table)
+        for line, row in read_rows(filename):
+            values = table.clean_row(row)
+            self.check_foreign_keys(table, filename, line, values, known_ids)
+            pk = values['id']
+            if seen is not None:
+                seen.add(pk)
+            if pk not in existing:
+                yield INSERT, table.build(values)
+                continue
+            digest = existing[pk]
+            if digest is None or digest != row_hash(
+                table, [values[attname] for attname in table.attnames]
+            ):
+                yield UPDATE, table.build(values)
+
+    def check_foreign_keys(self, table, filename, line, values, known_ids):
+        for column, target in table.foreign_keys.items():
+            value = values[table.attname(column)]
+            if value is not None and value not in known_ids[target]:
+                raise CommandError(
+                    f'{filename}:{line}: {column}={value} '
+                    f'not found in {target}.csv'
                 )
 
+    def write(self, table, action, objs, batch_size):
+        if not objs:
+            return
+        if action == INSERT:
+            table.model.objects.bulk_create(objs, batch_size)
+        else:
+            table.model.objects.bulk_update(
+                objs, table.update_fields, batch_size
+            )
+
+    def report(self, table, inserted=0, updated=0, deleted=None,
+               elapsed=0.0):
+        count = inserted + updated
+        rate = count / elapsed if elapsed else 0
+        summary = f'{inserted} inserted, {updated} updated'
+        if deleted is not None:
+            summary += f', {deleted} deleted'
         self.stdout.write(
-            self.style.SUCCESS('Successfully loaded initial data'))
+            f'{table.name}: {summary} in {elapsed:.2f}s '
+            f'({rate:.0f} rows/s)'
+        )
+
+    def reset_sequences(self, models):
+        statements = connection.ops.sequence_reset_sql(no_style(), models)
+        with connection.cursor() as cursor:
+            for sql in statements:
+                cursor.execute(sql)
@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from reviews.models import Title
+from reviews.signals import data_loaded
+
+
+class Command(BaseCommand):
+    help = 'Recalculate stored rating aggregates of titles from reviews'
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            updated = Title.objects.recalculate_ratings()
+            data_loaded.send(sender=Title)
+        self.stdout.write(
+            self.style.SUCCESS(f'Recalculated ratings for {updated} titles'))
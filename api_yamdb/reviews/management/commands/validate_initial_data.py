@@ -0,0 +1,29 @@
+import time
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+
+from reviews.csv_data import DATA_DIR
+from reviews.csv_validation import validate_data
+
+
+class Command(BaseCommand):
+    help = 'Validate CSV files before loading them with load_initial_data'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--path', type=Path, default=DATA_DIR,
+            help='Directory with CSV files (default: static/data)',
+        )
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        errors = validate_data(options['path'])
+        for filename, line, message in errors:
+            self.stderr.write(f'{filename}:{line}: {message}')
+        elapsed = time.perf_counter() - started
+        if errors:
+            raise CommandError(
+                f'{len(errors)} errors found in {elapsed:.2f}s')
+        self.stdout.write(
+            self.style.SUCCESS(f'CSV data is valid ({elapsed:.2f}s)'))
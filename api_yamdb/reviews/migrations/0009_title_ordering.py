@@ -0,0 +1,17 @@
+# Generated by Django 3.2 on 2026-10-18 05:42
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0008_title_rating_aggregate'),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name='title',
+            options={'ordering': ('id',)},
+        ),
+    ]
@@ -0,0 +1,35 @@
+# Generated by Django 3.2 on 2026-10-18 06:13
+
+from django.db import migrations, models
+
+from users.search import search_key
+
+
+def fill_search_key(apps, schema_editor):
+    for name in ('Category', 'Genre'):
+        model = apps.get_model('reviews', name)
+        objs = list(model.objects.only('id', 'name'))
+        for obj in objs:
+            obj.search_key = search_key(obj.name)
+        model.objects.bulk_update(objs, ['search_key'], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0010_title_search'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='category',
+            name='search_key',
+            field=models.CharField(db_index=True, default='', editable=False, max_length=512),
+        ),
+        migrations.AddField(
+            model_name='genre',
+            name='search_key',
+            field=models.CharField(db_index=True, default='', editable=False, max_length=512),
+        ),
+        migrations.RunPython(fill_search_key, migrations.RunPython.noop),
+    ]
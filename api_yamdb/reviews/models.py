@@ -1,16 +1,25 @@
 import datetime as dt
 
-from django.db import models
+from django.db import models, transaction
+from django.db.models import Count, F, OuterRef, Prefetch, Subquery, Sum
+from django.db.models.functions import Coalesce
+from django.db.models.signals import (
+    m2m_changed, post_delete, post_migrate, post_save
+)
+from django.dispatch import receiver
 from django.core.validators import MinValueValidator, MaxValueValidator
 from django.core.exceptions import ValidationError
 from django.contrib.auth import get_user_model
 
+from users.search import SearchKeyModel
+from . import bitmaps, catalog, suggest
 from .constants import CONST_FOR_LENGTH
+from .signals import data_loaded
 
 User = get_user_model()
 
 
-class BaseModel(models.Model):
+class BaseModel(SearchKeyModel):
     name = models.CharField(max_length=CONST_FOR_LENGTH)
     slug = models.SlugField(unique=True, max_length=50, allow_unicode=False)
 
@@ -34,6 +43,36 @@ class Genre(BaseModel):
         verbose_name_plural = 'Жанры'
 
 
+# Порядок жанров произведения в ответах API.
+GENRE_ORDERING = ('name', 'id')
+
+
+class TitleQuerySet(models.QuerySet):
+    def with_relations(self):
+        """Жанры — одним запросом на страницу, категория — из catalog."""
+        return self.prefetch_related(Prefetch(
+            'genre', queryset=Genre.objects.order_by(*GENRE_ORDERING)
+        ))
+
+    def recalculate_ratings(self):
+        """Пересчитываем сумму оценок и число отзывов по таблице отзывов."""
+        reviews = Review.objects.filter(
+            title=OuterRef('pk')
+        ).order_by().values('title')
+        return self.update(
+            score_sum=Coalesce(
+                Subquery(reviews.annotate(total=Sum('score'))
+                         .values('total')),
+                0
+            ),
+            review_count=Coalesce(
+                Subquery(reviews.annotate(total=Count('pk'))
+                         .values('total')),
+                0
+            ),
+        )
+
+
 class Title(models.Model):
     name = models.CharField(
         max_length=CONST_FOR_LENGTH,
@@ -56,10 +95,52 @@ class Title(models.Model):
         related_name='categories',
         verbose_name='Категория'
     )
+    score_sum = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        verbose_name='Сумма оценок'
+    )
+    review_count = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        verbose_name='Количество отзывов'
+    )
+
+    objects = TitleQuerySet.as_manager()
+
+    # Агрегаты меняются только через F()-выражения из сигналов отзывов.
+    AGGREGATE_FIELDS = ('score_sum', 'review_count')
+
+    class Meta:
+        ordering = ('id',)
+        indexes = (
+            # Фильтр по категории и году; rowid в конце индекса отдаёт
+            # строки уже в порядке id.
+            models.Index(fields=('category', 'year'),
+                         name='title_category_year_idx'),
+        )
 
     def __str__(self):
         return self.name
 
+    def save(self, *args, **kwargs):
+        # Устаревшие агрегаты объекта в памяти не должны затирать
+        # значения, обновлённые отзывами.
+        if not self._state.adding and kwargs.get('update_fields') is None:
+            kwargs['update_fields'] = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key
+                and field.name not in self.AGGREGATE_FIELDS
+            ]
+        super().save(*args, **kwargs)
+
+    @property
+    def rating(self):
+        """Средняя оценка по хранимым агрегатам, без запроса к отзывам."""
+        if not self.review_count:
+            return None
+        return self.score_sum // self.review_count
+
     def clean(self):
         """Проверяем на корректность ввода года выпуска."""
         current_year = dt.date.today().year
@@ -84,8 +165,26 @@ class Review(models.Model):
     pub_date = models.DateTimeField('Дата публикации', auto_now_add=True)
 
     class Meta:
-        ordering = ('pub_date',)
+        ordering = ('pub_date', 'id')
         unique_together = ('author', 'title')
+        indexes = (
+            # Отзывы произведения без сортировки во временном B-дереве.
+            models.Index(fields=('title', 'pub_date', 'id'),
+                         name='review_title_pub_date_idx'),
+            models.Index(fields=('author', 'pub_date'),
+                         name='review_author_pub_date_idx'),
+        )
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_score = instance.__dict__.get('score')
+        return instance
+
+    def save(self, *args, **kwargs):
+        # post_save обновляет агрегаты Title в той же транзакции.
+        with transaction.atomic():
+            super().save(*args, **kwargs)
 
 
 class Comment(models.Model):
@@ -101,4 +200,93 @@ class Comment(models.Model):
     pub_date = models.DateTimeField('Дата публикации', auto_now_add=True)
 
     class Meta:
-        ordering = ('pub_date',)
+        ordering = ('pub_date', 'id')
+        indexes = (
+            models.Index(fields=('review', 'pub_date', 'id'),
+                         name='comment_review_pub_date_idx'),
+        )
+
+
+def _update_title_rating(title_id, score_delta, count_delta):
+    Title.objects.filter(pk=title_id).update(
+        score_sum=F('score_sum') + score_delta,
+        review_count=F('review_count') + count_delta,
+    )
+    suggest.rating_changed(title_id, score_delta, count_delta)
+
+
+@receiver(post_save, sender=Review)
+def review_post_save(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    score = int(instance.score)
+    if created:
+        _update_title_rating(instance.title_id, score, 1)
+    else:
+        loaded_score = getattr(instance, '_loaded_score', None)
+        if loaded_score is not None and loaded_score != score:
+            _update_title_rating(instance.title_id, score - loaded_score, 0)
+    instance._loaded_score = score
+
+
+@receiver(post_delete, sender=Review)
+def review_post_delete(sender, instance, **kwargs):
+    _update_title_rating(instance.title_id, -int(instance.score), -1)
+
+
+@receiver(post_save, sender=Genre)
+@receiver(post_delete, sender=Genre)
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+@receiver(post_migrate)
+def catalog_changed(sender, **kwargs):
+    catalog.invalidate()
+
+
+@receiver(post_delete, sender=Genre)
+def genre_post_delete(sender, instance, **kwargs):
+    # Связи с произведениями удаляются каскадом без m2m_changed.
+    bitmaps.apply('drop_genre', instance.pk)
+
+
+@receiver(post_delete, sender=Category)
+def category_post_delete(sender, instance, **kwargs):
+    bitmaps.apply('drop_category', instance.pk)
+
+
+@receiver(post_save, sender=Title)
+def title_post_save(sender, instance, raw=False, **kwargs):
+    if raw:
+        suggest.invalidate()
+        bitmaps.invalidate()
+    else:
+        suggest.title_saved(instance)
+        bitmaps.title_saved(instance)
+
+
+@receiver(post_delete, sender=Title)
+def title_post_delete(sender, instance, **kwargs):
+    suggest.title_deleted(instance.pk)
+    bitmaps.title_deleted(instance.pk)
+
+
+@receiver(m2m_changed, sender=Title.genre.through)
+def title_genres_changed(sender, instance, action, reverse, pk_set,
+                         **kwargs):
+    if action in ('post_add', 'post_remove'):
+        if reverse:
+            bitmaps.genres_changed(action, pk_set, (instance.pk,))
+        else:
+            bitmaps.genres_changed(action, (instance.pk,), pk_set)
+    elif action == 'post_clear':
+        if reverse:
+            bitmaps.apply('drop_genre', instance.pk)
+        else:
+            bitmaps.apply('unlink_title', instance.pk)
+
+
+@receiver(post_migrate)
+@receiver(data_loaded)
+def titles_reloaded(sender, **kwargs):
+    suggest.invalidate()
+    bitmaps.invalidate()
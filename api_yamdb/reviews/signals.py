@@ -0,0 +1,5 @@
+from django.dispatch import Signal
+
+# Данные изменены в обход моделей (bulk_create, update): кеши,
+# зависящие от таблиц reviews, нужно сбросить целиком.
+data_loaded = Signal()
@@ -0,0 +1,176 @@
+"""
+Индекс подсказок по началу названий произведений в памяти процесса.
+
+Индекс — отсортированный список пар (ключ, id), где ключ — нормализованное
+название, начиная с каждого его слова; диапазон ключей с префиксом
+находится бинарным поиском. Изменения произведений и рейтингов этот
+процесс применяет к индексу на месте и увеличивает общий для процессов
+счётчик изменений `reviews.versions`. Процесс, чей индекс отстал от
+счётчика больше чем на собственные изменения, перестраивает индекс
+целиком.
+"""
+import bisect
+import heapq
+import threading
+
+from django.db import transaction
+
+from users.search import MAX_CHAR, search_key
+
+from . import versions
+
+VERSION_KEY = 'suggest'
+MEMO_SIZE = 1024
+
+_lock = threading.RLock()
+_index = None
+
+
+def rank(title):
+    """Сначала произведения с большим рейтингом и числом отзывов."""
+    _, score_sum, review_count = title
+    rating = score_sum // review_count if review_count else -1
+    return rating, review_count
+
+
+class SuggestIndex:
+
+    def __init__(self, version, titles):
+        self.version = version
+        # id -> [название, сумма оценок, число отзывов]
+        self.titles = {}
+        self.entries = []
+        self.memo = {}
+        for title_id, name, score_sum, review_count in titles:
+            self.titles[title_id] = [name, score_sum, review_count]
+            self.entries.extend(self.keys(title_id, name))
+        self.entries.sort()
+
+    @staticmethod
+    def keys(title_id, name):
+        words = search_key(name).split(' ')
+        return [
+            (' '.join(words[start:]), title_id)
+            for start in range(len(words)) if words[start]
+        ]
+
+    def suggest(self, prefix, limit):
+        """`limit` лучших по рейтингу произведений с префиксом `prefix`."""
+        prefix = search_key(prefix)
+        if not prefix:
+            return []
+        memo_key = (prefix, limit)
+        if memo_key in self.memo:
+            return self.memo[memo_key]
+        version = self.version
+        start = bisect.bisect_left(self.entries, (prefix,))
+        stop = bisect.bisect_left(self.entries, (prefix + MAX_CHAR,), start)
+        title_ids = {title_id for _, title_id in self.entries[start:stop]}
+        best = heapq.nlargest(
+            limit, title_ids,
+            key=lambda title_id: (rank(self.titles[title_id]), -title_id)
+        )
+        result = []
+        for title_id in best:
+            name, score_sum, review_count = self.titles[title_id]
+            result.append((
+                title_id, name,
+                score_sum // review_count if review_count else None
+            ))
+        # Результат, посчитанный во время изменения индекса, не запоминаем.
+        if version == self.version:
+            if len(self.memo) >= MEMO_SIZE:
+                self.memo.clear()
+            self.memo[memo_key] = result
+        return result
+
+    def remove(self, title_id):
+        title = self.titles.pop(title_id, None)
+        if title is None:
+            return
+        for entry in self.keys(title_id, title[0]):
+            position = bisect.bisect_left(self.entries, entry)
+            if position < len(self.entries) and (
+                self.entries[position] == entry
+            ):
+                del self.entries[position]
+
+    def put(self, title_id, name, score_sum, review_count):
+        # Рейтинг известного произведения индекс ведёт сам: агрегаты
+        # сохраняемого объекта могут быть устаревшими.
+        old = self.titles.get(title_id)
+        if old is not None:
+            score_sum, review_count = old[1], old[2]
+        self.remove(title_id)
+        self.titles[title_id] = [name, score_sum, review_count]
+        for entry in self.keys(title_id, name):
+            bisect.insort(self.entries, entry)
+
+    def add_rating(self, title_id, score_delta, count_delta):
+        title = self.titles.get(title_id)
+        if title is not None:
+            title[1] += score_delta
+            title[2] += count_delta
+
+
+def current_version():
+    return versions.current(VERSION_KEY)
+
+
+def get_index():
+    """Актуальный индекс; перестраивает его, если версия сменилась."""
+    global _index
+    version = current_version()
+    index = _index
+    if index is not None and index.version == version:
+        return index
+    # models.py импортирует этот модуль.
+    from .models import Title
+    with _lock:
+        if _index is None or _index.version != version:
+            titles = Title.objects.order_by().values_list(
+                'id', 'name', 'score_sum', 'review_count'
+            )
+            with versions.rebuilding():
+                _index = SuggestIndex(version, titles.iterator())
+        return _index
+
+
+def bump_version():
+    return versions.bump(VERSION_KEY)
+
+
+def apply(change, *args):
+    """
+    Применяет изменение к индексу процесса после фиксации транзакции.
+
+    Если до изменения индекс был актуален, он остаётся актуальным и после
+    увеличения счётчика; иначе он будет перестроен при следующем чтении.
+    """
+    def on_commit():
+        with _lock:
+            version = bump_version()
+            index = _index
+            if index is None or index.version != version - 1:
+                return
+            getattr(index, change)(*args)
+            index.version = version
+            index.memo.clear()
+    transaction.on_commit(on_commit)
+
+
+def title_saved(title):
+    apply('put', title.pk, title.name, title.score_sum, title.review_count)
+
+
+def title_deleted(title_id):
+    apply('remove', title_id)
+
+
+def rating_changed(title_id, score_delta, count_delta):
+    apply('add_rating', title_id, score_delta, count_delta)
+
+
+def invalidate():
+    """Перестроить индекс во всех процессах (массовая загрузка)."""
+    transaction.on_commit(bump_version)
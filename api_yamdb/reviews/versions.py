@@ -0,0 +1,143 @@
+"""
+Счётчики версий данных, общие для всех процессов на хосте.
+
+Снимки справочников и индексы в памяти процесса (catalog, bitmaps,
+suggest), а также ETag и кеш ответов API (группы данных `titles`,
+`title:5`...) помечаются версиями из этого хранилища. Счётчики лежат в
+отдельном файле SQLite: изменение, зафиксированное в одном процессе,
+увеличивает счётчик, и остальные процессы перестраивают свои копии при
+следующем чтении. Запросы перестройки выполняются внутри `rebuilding()`:
+они разовые, и бюджет запросов API их не учитывает.
+"""
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+
+from django.conf import settings
+
+SCHEMA = (
+    'CREATE TABLE IF NOT EXISTS versions ('
+    ' name TEXT PRIMARY KEY, version INTEGER NOT NULL)',
+)
+
+
+class VersionStore:
+    """Именованные счётчики в файле SQLite."""
+
+    def __init__(self, path):
+        self.path = str(path)
+        self.local = threading.local()
+
+    @property
+    def connection(self):
+        connection = getattr(self.local, 'connection', None)
+        if connection is None:
+            connection = sqlite3.connect(
+                self.path, timeout=30, isolation_level=None
+            )
+            connection.execute('PRAGMA journal_mode=WAL')
+            connection.execute('PRAGMA synchronous=NORMAL')
+            for statement in SCHEMA:
+                connection.execute(statement)
+            self.local.connection = connection
+        return connection
+
+    def get(self, name):
+        row = self.connection.execute(
+            'SELECT version FROM versions WHERE name = ?', (name,)
+        ).fetchone()
+        if row is not None:
+            return row[0]
+        # Начальное значение уникально: счётчик, созданный заново после
+        # удаления файла, не совпадёт с версией уже построенной копии.
+        self.connection.execute(
+            'INSERT OR IGNORE INTO versions (name, version) VALUES (?, ?)',
+            (name, time.time_ns())
+        )
+        return self.get(name)
+
+    def bump(self, name):
+        """Увеличивает счётчик и возвращает новое значение."""
+        version, = self.connection.execute(
+            'INSERT INTO versions (name, version) VALUES (?, ?) '
+            'ON CONFLICT (name) DO UPDATE SET version = version + 1 '
+            'RETURNING version', (name, time.time_ns())
+        ).fetchone()
+        return version
+
+    def get_many(self, names):
+        """Пары (имя, версия), отсортированные по имени."""
+        names = sorted(set(names))
+        found = dict(self.connection.execute(
+            'SELECT name, version FROM versions WHERE name IN ({})'.format(
+                ', '.join('?' * len(names))
+            ),
+            names
+        ))
+        missing = [name for name in names if name not in found]
+        if missing:
+            self.connection.executemany(
+                'INSERT OR IGNORE INTO versions (name, version) '
+                'VALUES (?, ?)', [(name, time.time_ns()) for name in missing]
+            )
+            return self.get_many(names)
+        return [(name, found[name]) for name in names]
+
+    def bump_many(self, names):
+        self.connection.execute('BEGIN IMMEDIATE')
+        try:
+            self.connection.executemany(
+                'INSERT INTO versions (name, version) VALUES (?, ?) '
+                'ON CONFLICT (name) DO UPDATE SET version = version + 1',
+                [(name, time.time_ns()) for name in set(names)]
+            )
+        except BaseException:
+            self.connection.execute('ROLLBACK')
+            raise
+        self.connection.execute('COMMIT')
+
+
+_store = None
+_store_lock = threading.Lock()
+_local = threading.local()
+
+
+def get_store():
+    """Хранилище из `settings.SHARED_VERSIONS['PATH']`."""
+    global _store
+    path = str(settings.SHARED_VERSIONS['PATH'])
+    with _store_lock:
+        if _store is None or _store.path != path:
+            _store = VersionStore(path)
+        return _store
+
+
+def current(name):
+    return get_store().get(name)
+
+
+def bump(name):
+    return get_store().bump(name)
+
+
+def current_many(names):
+    return get_store().get_many(names)
+
+
+def bump_many(names):
+    get_store().bump_many(names)
+
+
+@contextmanager
+def rebuilding():
+    """Помечает запросы потока как перестройку копии в памяти."""
+    _local.depth = getattr(_local, 'depth', 0) + 1
+    try:
+        yield
+    finally:
+        _local.depth -= 1
+
+
+def is_rebuilding():
+    return getattr(_local, 'depth', 0) > 0
@@ -0,0 +1,29 @@
+# Generated by Django 3.2 on 2026-10-18 06:13
+
+from django.db import migrations, models
+
+from users.search import search_key
+
+
+def fill_search_key(apps, schema_editor):
+    User = apps.get_model('users', 'User')
+    users = list(User.objects.only('id', 'username'))
+    for user in users:
+        user.search_key = search_key(user.username)
+    User.objects.bulk_update(users, ['search_key'], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0003_auto_20231204_1046'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='user',
+            name='search_key',
+            field=models.CharField(db_index=True, default='', editable=False, max_length=512),
+        ),
+        migrations.RunPython(fill_search_key, migrations.RunPython.noop),
+    ]
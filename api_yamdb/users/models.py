@@ -4,6 +4,7 @@ from django.db import models
 from django.dispatch import receiver
 from django.db.models.signals import post_save
 
+from .search import SearchKeyModel
 from .validators import validate_username
 
 
@@ -18,7 +19,9 @@ ROLE_CHOICES = [
 ]
 
 
-class User(AbstractUser):
+class User(SearchKeyModel, AbstractUser):
+    search_key_source = 'username'
+
     username = models.CharField(
         validators=(validate_username,),
         max_length=150,
@@ -81,6 +84,13 @@ class User(AbstractUser):
     def __str__(self):
         return self.username
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        user = super().from_db(db, field_names, values)
+        # Имя на момент загрузки: по нему видно, сменилось ли оно.
+        user.loaded_username = user.__dict__.get('username')
+        return user
+
 
 @receiver(post_save, sender=User)
 def post_save(sender, instance, created, **kwargs):
@@ -89,4 +99,4 @@ def post_save(sender, instance, created, **kwargs):
             instance
         )
         instance.confirmation_code = confirmation_code
-        instance.save()
+        instance.save(update_fields=['confirmation_code'])
@@ -0,0 +1,43 @@
+"""Нормализованный ключ для поиска по началу строки."""
+from django.db import models
+
+# Верхняя граница диапазона ключей с заданным префиксом.
+MAX_CHAR = '\U0010ffff'
+
+
+def search_key(value):
+    """Без регистра, с ё как е и с одиночными пробелами между словами."""
+    return ' '.join(value.casefold().replace('ё', 'е').split())
+
+
+def prefix_filter(prefix):
+    """
+    Условие «ключ начинается с prefix» в виде диапазона.
+
+    В отличие от LIKE диапазон использует обычный индекс по колонке.
+    """
+    return {'search_key__gte': prefix, 'search_key__lt': prefix + MAX_CHAR}
+
+
+class SearchKeyModel(models.Model):
+    """Модель с ключом поиска, вычисляемым из поля `search_key_source`."""
+    search_key_source = 'name'
+
+    search_key = models.CharField(
+        max_length=512, editable=False, db_index=True, default=''
+    )
+
+    class Meta:
+        abstract = True
+
+    def update_search_key(self):
+        self.search_key = search_key(getattr(self, self.search_key_source))
+
+    def save(self, *args, **kwargs):
+        self.update_search_key()
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and (
+            self.search_key_source in update_fields
+        ):
+            kwargs['update_fields'] = {*update_fields, 'search_key'}
+        super().save(*args, **kwargs)
@@ -0,0 +1,13 @@
+"""
+Нагрузочные замеры API YaMDb.
+
+Запуск из корня репозитория: `python -m benchmarks --help`.
+"""
+import os
+import sys
+
+PROJECT_DIR = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'api_yamdb'
+)
+if PROJECT_DIR not in sys.path:
+    sys.path.insert(0, PROJECT_DIR)
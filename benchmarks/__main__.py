@@ -0,0 +1,190 @@
+"""
+Замер задержек, пропускной способности и числа SQL-запросов API.
+
+    python -m benchmarks --titles 2000 --reviews 100000 \
+        --output bench.json --compare previous.json
+
+Планы запросов до и после миграции с индексами:
+
+    python -m benchmarks --plans --plans-baseline reviews:0011_search_key
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+from . import PROJECT_DIR
+
+DATASET_OPTIONS = ('users', 'titles', 'reviews', 'comments')
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m benchmarks')
+    parser.add_argument(
+        '--db', type=Path, default=Path(tempfile.gettempdir()) / 'yamdb-bench'
+        '.sqlite3', help='SQLite database used for the run',
+    )
+    parser.add_argument(
+        '--reuse-db', action='store_true',
+        help='Skip migration and data loading if --db already exists',
+    )
+    parser.add_argument('--users', type=int, default=2000)
+    parser.add_argument('--titles', type=int, default=1000)
+    parser.add_argument('--reviews', type=int, default=20000)
+    parser.add_argument('--comments', type=int, default=20000)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1)
+    parser.add_argument(
+        '--requests', type=int, default=200,
+        help='Measured requests per endpoint',
+    )
+    parser.add_argument('--warmup', type=int, default=20)
+    parser.add_argument('--concurrency', type=int, default=4)
+    parser.add_argument(
+        '--only', nargs='+', metavar='NAME',
+        help='Run only these endpoints, e.g. titles-list review-list',
+    )
+    parser.add_argument('--output', type=Path, help='Write results as JSON')
+    parser.add_argument(
+        '--compare', type=Path, help='Previous JSON results to compare with',
+    )
+    parser.add_argument(
+        '--plans', action='store_true',
+        help='Print EXPLAIN QUERY PLAN of every endpoint query',
+    )
+    parser.add_argument(
+        '--plans-baseline', metavar='APP:MIGRATION',
+        help='Also collect plans with the schema migrated back to '
+             'this migration and print the ones that changed',
+    )
+    args = parser.parse_args(argv)
+    if args.plans_baseline and ':' not in args.plans_baseline:
+        parser.error('--plans-baseline must look like app:migration')
+    if args.requests < 1 or args.concurrency < 1 or args.warmup < 0:
+        parser.error('--requests and --concurrency must be positive')
+    return args
+
+
+def setup_django(db):
+    os.environ['YAMDB_BENCH_DB'] = str(db)
+    os.environ['DJANGO_SETTINGS_MODULE'] = 'benchmarks.settings'
+    import django
+    django.setup()
+
+
+def prepare_database(args):
+    from django.core.management import call_command
+    if args.reuse_db and args.db.exists():
+        return
+    if args.db.exists():
+        args.db.unlink()
+    call_command('migrate', verbosity=0)
+    with tempfile.TemporaryDirectory() as data_dir:
+        call_command(
+            'generate_dataset', data_dir, seed=args.seed,
+            workers=args.workers,
+            **{name: getattr(args, name) for name in DATASET_OPTIONS},
+        )
+        call_command(
+            'load_initial_data', path=Path(data_dir), workers=args.workers,
+            batch_size=5000,
+        )
+
+
+def revision():
+    try:
+        return subprocess.run(
+            ('git', 'rev-parse', '--short', 'HEAD'), cwd=PROJECT_DIR,
+            capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def print_results(results, previous=None):
+    columns = ('p50_ms', 'p95_ms', 'p99_ms', 'rps', 'queries_mean')
+    print(f'{"endpoint":<18}' + ''.join(f'{name:>14}' for name in columns)
+          + f'{"errors":>8}')
+    for name, stats in results.items():
+        line = f'{name:<18}'
+        for column in columns:
+            value = stats[column]
+            old = (previous or {}).get(name, {}).get(column)
+            if old:
+                line += f'{value:>8} {(value - old) / old:>+5.0%}'
+            else:
+                line += f'{value:>14}'
+        print(line + f'{stats["errors"]:>8}')
+
+
+def collect_plans(args, scenarios, credentials):
+    """Планы текущей схемы и, с --plans-baseline, схемы до миграции."""
+    from django.core.management import call_command
+
+    from .plans import PLAN_REQUESTS, collect
+    baseline = None
+    # Запросы для планов не пересекаются с замеренными.
+    start = args.requests + args.warmup
+    if args.plans_baseline:
+        call_command('migrate', *args.plans_baseline.split(':'),
+                     verbosity=0)
+        try:
+            baseline = collect(scenarios, credentials, start)
+        finally:
+            call_command('migrate', verbosity=0)
+        start += PLAN_REQUESTS
+    return baseline, collect(scenarios, credentials, start)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    setup_django(args.db)
+    import django
+
+    from .plans import print_plans
+    from .runner import run
+    from .scenarios import build_scenarios, credentials
+
+    prepare_database(args)
+    scenarios = build_scenarios(args.seed)
+    if args.only:
+        scenarios = [s for s in scenarios if s.name in args.only]
+    tokens = credentials()
+    baseline, plans = collect_plans(args, scenarios, tokens)
+    results = run(
+        scenarios, tokens, args.requests, args.concurrency, args.warmup,
+    )
+    report = {
+        'meta': {
+            'revision': revision(),
+            'python': platform.python_version(),
+            'django': django.get_version(),
+            'dataset': {
+                name: getattr(args, name)
+                for name in (*DATASET_OPTIONS, 'seed')
+            },
+            'requests': args.requests,
+            'concurrency': args.concurrency,
+        },
+        'endpoints': results,
+        'plans': plans,
+    }
+    previous = None
+    if args.compare:
+        previous = json.loads(args.compare.read_text())
+        baseline = baseline or previous.get('plans')
+        previous = previous['endpoints']
+    print_results(results, previous)
+    if args.plans or args.plans_baseline:
+        print_plans(plans, baseline)
+    if args.output:
+        args.output.write_text(json.dumps(report, indent=2))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
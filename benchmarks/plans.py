@@ -0,0 +1,66 @@
+"""Планы SQLite (EXPLAIN QUERY PLAN) для запросов каждого сценария."""
+from django.db import connection
+from django.test.utils import override_settings
+from rest_framework.test import APIClient
+
+from api.query_plans import PlanRecorder, explain, warnings
+
+PLAN_REQUESTS = 5
+
+
+def collect(scenarios, credentials, start=0, requests=PLAN_REQUESTS):
+    """
+    Выполняет `requests` запросов каждого сценария и строит планы.
+
+    Несколько запросов нужны, чтобы застать разные ветки (например,
+    отзыв с комментариями и без). Возвращает {сценарий: [{'sql', 'plan',
+    'warnings'}]}, где sql — форма запроса; кеш ответов выключен, чтобы
+    запросы дошли до базы.
+    """
+    plans = {}
+    with override_settings(RESPONSE_CACHE={}):
+        for scenario in scenarios:
+            client = APIClient()
+            if scenario.auth:
+                client.credentials(
+                    HTTP_AUTHORIZATION=credentials[scenario.auth]
+                )
+            recorder = PlanRecorder()
+            with connection.execute_wrapper(recorder):
+                for index in range(start, start + requests):
+                    method, path, data = scenario.make_request(index)
+                    getattr(client, method)(path, data, format='json')
+            plans[scenario.name] = []
+            for shape, query in recorder.queries.items():
+                plan = explain(query.sql, query.params)
+                plans[scenario.name].append({
+                    'sql': shape, 'plan': plan, 'warnings': warnings(plan),
+                })
+    return plans
+
+
+def print_plans(plans, previous=None):
+    """Планы по эндпоинтам; с `previous` — только изменившиеся."""
+    for name, queries in plans.items():
+        before = {
+            query['sql']: query['plan']
+            for query in (previous or {}).get(name, [])
+        }
+        changed = [
+            query for query in queries
+            if previous is None or before.get(query['sql']) != query['plan']
+        ]
+        if not changed:
+            continue
+        print(f'== {name}')
+        for query in changed:
+            print(query['sql'])
+            if query['sql'] in before:
+                print('  before:')
+                for line in before[query['sql']]:
+                    print('    ' + line)
+                print('  after:')
+            for line in query['plan']:
+                print('    ' + line)
+            for warning in query['warnings']:
+                print(f'  ! {warning}')
@@ -0,0 +1,96 @@
+"""Выполнение сценариев и подсчёт задержек, пропускной способности и SQL."""
+import math
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.db import connection
+from rest_framework.test import APIClient
+
+
+class QueryCounter:
+    """Обёртка `connection.execute_wrapper`, считающая запросы к БД."""
+
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        self.count += 1
+        return execute(sql, params, many, context)
+
+
+class Scenario:
+    """
+    Один эндпоинт под нагрузкой.
+
+    `make_request(index)` возвращает (метод, путь, данные); `auth` — ключ
+    словаря заголовков авторизации или None для анонимных запросов.
+    """
+
+    def __init__(self, name, make_request, auth=None):
+        self.name = name
+        self.make_request = make_request
+        self.auth = auth
+
+
+def percentile(values, fraction):
+    """Перцентиль по ближайшему рангу для отсортированного списка."""
+    if not values:
+        return None
+    rank = max(1, math.ceil(fraction * len(values)))
+    return values[min(rank, len(values)) - 1]
+
+
+def run_scenario(scenario, credentials, requests, concurrency, warmup=0):
+    local = threading.local()
+
+    def execute(index):
+        client = getattr(local, 'client', None)
+        if client is None:
+            client = local.client = APIClient()
+            if scenario.auth:
+                client.credentials(
+                    HTTP_AUTHORIZATION=credentials[scenario.auth]
+                )
+        method, path, data = scenario.make_request(index)
+        counter = QueryCounter()
+        started = time.perf_counter()
+        with connection.execute_wrapper(counter):
+            response = getattr(client, method)(path, data, format='json')
+        return (
+            time.perf_counter() - started, counter.count,
+            response.status_code,
+        )
+
+    with ThreadPoolExecutor(concurrency) as executor:
+        list(executor.map(execute, range(requests, requests + warmup)))
+        started = time.perf_counter()
+        results = list(executor.map(execute, range(requests)))
+        wall = time.perf_counter() - started
+
+    latencies = sorted(latency for latency, _, _ in results)
+    queries = [count for _, count, _ in results]
+    statuses = {}
+    for _, _, status in results:
+        statuses[str(status)] = statuses.get(str(status), 0) + 1
+    return {
+        'requests': requests,
+        'concurrency': concurrency,
+        'errors': sum(1 for _, _, status in results if status >= 400),
+        'statuses': statuses,
+        'p50_ms': round(percentile(latencies, 0.50) * 1000, 3),
+        'p95_ms': round(percentile(latencies, 0.95) * 1000, 3),
+        'p99_ms': round(percentile(latencies, 0.99) * 1000, 3),
+        'rps': round(requests / wall, 1) if wall else None,
+        'queries_mean': round(sum(queries) / len(queries), 2),
+        'queries_max': max(queries),
+    }
+
+
+def run(scenarios, credentials, requests, concurrency, warmup=0):
+    return {
+        scenario.name: run_scenario(
+            scenario, credentials, requests, concurrency, warmup
+        )
+        for scenario in scenarios
+    }
@@ -0,0 +1,109 @@
+"""Сценарии для каждого маршрута из api/urls.py."""
+import random
+import uuid
+
+from rest_framework_simplejwt.tokens import AccessToken
+
+from reviews.models import Category, Genre, Review, Title
+from users.models import ADMIN, User
+from .runner import Scenario
+
+SAMPLE_SIZE = 1000
+BENCH_ADMIN = 'bench-admin'
+
+
+def sample(model, rng, fields, size=SAMPLE_SIZE):
+    """
+    Случайная выборка строк по id без ORDER BY RANDOM().
+
+    id в сгенерированных данных идут подряд, поэтому выборка случайных id
+    из диапазона почти всегда попадает в существующие строки.
+    """
+    last = model.objects.order_by('-pk').values_list('pk', flat=True).first()
+    if last is None:
+        return []
+    ids = rng.sample(range(1, last + 1), min(size, last))
+    rows = list(model.objects.filter(pk__in=ids).values_list(*fields))
+    return rows or list(model.objects.values_list(*fields)[:size])
+
+
+def credentials():
+    admin, _ = User.objects.get_or_create(
+        username=BENCH_ADMIN,
+        defaults={'email': f'{BENCH_ADMIN}@yamdb.fake', 'role': ADMIN},
+    )
+    return {'admin': f'Bearer {AccessToken.for_user(admin)}'}
+
+
+def build_scenarios(seed=0):
+    rng = random.Random(seed)
+    titles = [pk for pk, in sample(Title, rng, ('pk',))]
+    reviews = sample(Review, rng, ('title_id', 'pk'))
+    users = sample(User, rng, ('username', 'confirmation_code'))
+    genres = list(Genre.objects.values_list('slug', flat=True))
+    categories = list(Category.objects.values_list('slug', flat=True))
+    pages = max(1, Title.objects.count() // 10)
+    run_id = uuid.uuid4().hex[:8]
+
+    def pick(items, index):
+        return items[index % len(items)]
+
+    def title_filter(index):
+        params = [f'genre={pick(genres, index)}'] if genres else []
+        if categories:
+            params.append(f'category={pick(categories, index * 7)}')
+        return 'get', f'/api/v1/titles/?{"&".join(params)}', None
+
+    def token(index):
+        username, code = pick(users, index)
+        return 'post', '/api/v1/auth/token/', {
+            'username': username, 'confirmation_code': code,
+        }
+
+    scenarios = [
+        Scenario('signup', lambda index: ('post', '/api/v1/auth/signup/', {
+            'username': f'bench-{run_id}-{index}',
+            'email': f'bench-{run_id}-{index}@yamdb.fake',
+        })),
+        Scenario('titles-list', lambda index: (
+            'get', f'/api/v1/titles/?offset={index % pages * 10}', None
+        )),
+        Scenario('genres-list', lambda index: (
+            'get', '/api/v1/genres/', None
+        )),
+        Scenario('categories-list', lambda index: (
+            'get', '/api/v1/categories/', None
+        )),
+        Scenario('users-list', lambda index: (
+            'get', '/api/v1/users/', None
+        ), auth='admin'),
+        Scenario('users-me', lambda index: (
+            'get', '/api/v1/users/me/', None
+        ), auth='admin'),
+    ]
+    if users:
+        scenarios.append(Scenario('token', token))
+    if titles:
+        scenarios += [
+            Scenario('titles-detail', lambda index: (
+                'get', f'/api/v1/titles/{pick(titles, index)}/', None
+            )),
+            Scenario('titles-filter', title_filter),
+            Scenario('review-list', lambda index: (
+                'get', f'/api/v1/titles/{pick(titles, index)}/reviews/', None
+            )),
+        ]
+    if reviews:
+        scenarios += [
+            Scenario('review-detail', lambda index: (
+                'get', '/api/v1/titles/{}/reviews/{}/'.format(
+                    *pick(reviews, index)
+                ), None
+            )),
+            Scenario('comment-list', lambda index: (
+                'get', '/api/v1/titles/{}/reviews/{}/comments/'.format(
+                    *pick(reviews, index)
+                ), None
+            )),
+        ]
+    return scenarios
@@ -0,0 +1,21 @@
+"""
+Настройки проекта для замеров: отдельная база, без DEBUG, почты и кеша
+ответов — замеряется код, а не ответы, сохранённые прошлым прогоном.
+"""
+import os
+
+from api_yamdb.settings import *  # noqa: F401,F403
+
+DEBUG = False
+
+DATABASES = {
+    'default': {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': os.environ.get('YAMDB_BENCH_DB', 'bench.sqlite3'),
+        'OPTIONS': {'timeout': 30},
+    }
+}
+
+EMAIL_BACKEND = 'django.core.mail.backends.locmem.EmailBackend'
+
+RESPONSE_CACHE = {}
@@ -1,6 +1,7 @@
 import os
 import sys
 
+import pytest
 from django.utils.version import get_version
 
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
@@ -33,3 +34,29 @@ assert get_version() < '4.0.0', 'Пожалуйста, используйте в
 pytest_plugins = [
     'tests.fixtures.fixture_user',
 ]
+
+
+@pytest.fixture(autouse=True)
+def isolated_caches(settings, tmp_path):
+    """
+    Кеш ответов выключен, версии снимков в памяти — свои у каждого теста:
+    данные прошлого теста, откатанные без on_commit, не должны
+    отдаваться из общих файлов во временном каталоге.
+    """
+    settings.RESPONSE_CACHE = {}
+    settings.SHARED_VERSIONS = {'PATH': tmp_path / 'versions.sqlite3'}
+
+
+@pytest.fixture
+def response_cache(settings, tmp_path):
+    """Кеш ответов в файле теста."""
+    settings.RESPONSE_CACHE = {
+        'PATH': tmp_path / 'responses.sqlite3',
+        'MAX_BYTES': 1024 * 1024,
+    }
+
+
+@pytest.fixture(autouse=True)
+def query_budget_raise(settings):
+    """Превышение бюджета SQL-запросов в тестах — ошибка."""
+    settings.QUERY_BUDGET = {**settings.QUERY_BUDGET, 'MODE': 'raise'}
@@ -0,0 +1,106 @@
+from http import HTTPStatus
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+
+from tests.utils import create_reviews
+
+
+@pytest.mark.django_db(transaction=True)
+class Test08RatingAggregate:
+
+    TITLE_DETAIL_URL_TEMPLATE = '/api/v1/titles/{title_id}/'
+    REVIEW_DETAIL_URL_TEMPLATE = (
+        '/api/v1/titles/{title_id}/reviews/{review_id}/'
+    )
+
+    def test_01_rating_follows_reviews(self, admin_client, admin,
+                                       user_client, user):
+        reviews, titles = create_reviews(
+            admin_client, {admin: admin_client, user: user_client}
+        )
+        from reviews.models import Title
+        title = Title.objects.get(pk=titles[0]['id'])
+        assert (title.score_sum, title.review_count) == (10, 2), (
+            'Проверьте, что при создании отзыва обновляются сумма оценок и '
+            'количество отзывов произведения.'
+        )
+
+        response = user_client.patch(
+            self.REVIEW_DETAIL_URL_TEMPLATE.format(
+                title_id=titles[0]['id'], review_id=reviews[1]['id']
+            ),
+            data={'score': 9}
+        )
+        assert response.status_code == HTTPStatus.OK
+        title.refresh_from_db()
+        assert (title.score_sum, title.review_count) == (14, 2), (
+            'Проверьте, что при изменении оценки отзыва обновляется сумма '
+            'оценок произведения.'
+        )
+
+        response = admin_client.delete(
+            self.REVIEW_DETAIL_URL_TEMPLATE.format(
+                title_id=titles[0]['id'], review_id=reviews[0]['id']
+            )
+        )
+        assert response.status_code == HTTPStatus.NO_CONTENT
+        response = admin_client.get(
+            self.TITLE_DETAIL_URL_TEMPLATE.format(title_id=titles[0]['id'])
+        )
+        assert response.json().get('rating') == 9, (
+            'Проверьте, что после удаления отзыва рейтинг произведения '
+            'пересчитывается.'
+        )
+
+    def test_02_recalculate_ratings_command(self, admin_client, admin,
+                                            user_client, user):
+        _, titles = create_reviews(
+            admin_client, {admin: admin_client, user: user_client}
+        )
+        from reviews.models import Title
+        Title.objects.update(score_sum=0, review_count=0)
+
+        call_command('recalculate_ratings', stdout=StringIO())
+
+        title = Title.objects.get(pk=titles[0]['id'])
+        assert (title.score_sum, title.review_count) == (10, 2), (
+            'Проверьте, что команда `recalculate_ratings` восстанавливает '
+            'агрегаты рейтинга по таблице отзывов.'
+        )
+        assert title.rating == 5
+
+    def test_03_stale_title_save_keeps_rating(self, admin_client, admin):
+        from reviews.models import Review, Title
+
+        title = Title.objects.create(name='Сталкер', year=1979,
+                                     description='')
+        stale = Title.objects.get(pk=title.pk)
+        Review.objects.create(title=title, author=admin, text='Отзыв',
+                              score=8)
+
+        stale.name = 'Сталкер. Пикник'
+        stale.save()
+        title.refresh_from_db()
+        assert (title.name, title.rating) == ('Сталкер. Пикник', 8), (
+            'Проверьте, что сохранение произведения с устаревшими '
+            'агрегатами не затирает рейтинг, обновлённый отзывами.'
+        )
+
+        response = admin_client.patch(
+            self.TITLE_DETAIL_URL_TEMPLATE.format(title_id=title.pk),
+            data={'year': 1980}
+        )
+        assert response.status_code == HTTPStatus.OK
+        assert response.json()['rating'] == 8
+
+    def test_04_aggregates_are_not_filters(self):
+        from api.filters import TitleFilterSet
+
+        assert not {'score_sum', 'review_count'} & set(
+            TitleFilterSet.base_filters
+        ), (
+            'Проверьте, что служебные агрегаты рейтинга не доступны как '
+            'фильтры произведений.'
+        )
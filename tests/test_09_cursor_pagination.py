@@ -0,0 +1,73 @@
+from http import HTTPStatus
+
+import pytest
+
+from tests.utils import create_comments, create_titles
+
+
+def collect_pages(client, url):
+    results = []
+    while url:
+        response = client.get(url)
+        assert response.status_code == HTTPStatus.OK
+        data = response.json()
+        assert 'count' not in data, (
+            'Проверьте, что в курсорном режиме пагинации ответ не содержит '
+            'ключ `count`.'
+        )
+        results.extend(data['results'])
+        url = data['next']
+    return results
+
+
+@pytest.mark.django_db(transaction=True)
+class Test09CursorPagination:
+
+    def test_01_titles_cursor(self, client, admin_client):
+        titles, _, _ = create_titles(admin_client)
+
+        results = collect_pages(
+            client, '/api/v1/titles/?pagination=cursor&limit=1'
+        )
+
+        assert [title['id'] for title in results] == sorted(
+            title['id'] for title in titles
+        ), (
+            'Проверьте, что курсорная пагинация `/api/v1/titles/` обходит '
+            'все произведения по возрастанию `id`.'
+        )
+
+    def test_02_comments_cursor(self, client, admin_client, admin,
+                                user_client, user, moderator_client,
+                                moderator):
+        comments, reviews, titles = create_comments(admin_client, {
+            admin: admin_client,
+            user: user_client,
+            moderator: moderator_client,
+        })
+
+        results = collect_pages(
+            client,
+            f'/api/v1/titles/{titles[0]["id"]}/reviews/{reviews[0]["id"]}/'
+            'comments/?pagination=cursor&limit=2'
+        )
+
+        assert [comment['id'] for comment in results] == [
+            comment['id'] for comment in comments
+        ], (
+            'Проверьте, что курсорная пагинация комментариев возвращает их '
+            'в порядке публикации без пропусков и повторов.'
+        )
+
+    def test_03_users_cursor(self, admin_client, admin, user, moderator):
+        results = collect_pages(
+            admin_client, '/api/v1/users/?pagination=cursor&limit=2'
+        )
+
+        usernames = [item['username'] for item in results]
+        assert usernames == sorted(
+            [admin.username, user.username, moderator.username]
+        ), (
+            'Проверьте, что курсорная пагинация `/api/v1/users/` упорядочена '
+            'по `username`.'
+        )
@@ -0,0 +1,111 @@
+import json
+from http import HTTPStatus
+
+import pytest
+
+from tests.utils import create_comments, create_reviews
+
+
+@pytest.mark.django_db(transaction=True)
+class Test10ReviewStream:
+
+    REVIEWS_URL_TEMPLATE = '/api/v1/titles/{title_id}/reviews/'
+    COMMENTS_URL_TEMPLATE = (
+        '/api/v1/titles/{title_id}/reviews/{review_id}/comments/'
+    )
+
+    def test_01_reviews_limit_is_bounded(self):
+        from rest_framework.request import Request
+        from rest_framework.test import APIRequestFactory
+
+        from api.pagination import BoundedPagination
+        request = Request(
+            APIRequestFactory().get('/', {'limit': 100000})
+        )
+
+        assert BoundedPagination().get_limit(request) == (
+            BoundedPagination.max_limit
+        ), 'Проверьте, что размер страницы отзывов ограничен `max_limit`.'
+
+    def test_02_reviews_ndjson_stream(self, client, admin_client, admin,
+                                      user_client, user):
+        reviews, titles = create_reviews(
+            admin_client, {admin: admin_client, user: user_client}
+        )
+        url = self.REVIEWS_URL_TEMPLATE.format(title_id=titles[0]['id'])
+
+        response = client.get(f'{url}?format=ndjson')
+
+        assert response.status_code == HTTPStatus.OK
+        assert response.streaming, (
+            f'Проверьте, что `{url}?format=ndjson` отдаётся потоком.'
+        )
+        assert response['Content-Type'] == 'application/x-ndjson'
+        rows = [
+            json.loads(line)
+            for line in b''.join(response.streaming_content).splitlines()
+        ]
+        assert [row['id'] for row in rows] == [
+            review['id'] for review in reviews
+        ]
+        assert rows[0]['author'] == admin.username
+
+    def test_03_comments_ndjson_stream(self, client, admin_client, admin,
+                                       user_client, user):
+        comments, reviews, titles = create_comments(
+            admin_client, {admin: admin_client, user: user_client}
+        )
+        url = self.COMMENTS_URL_TEMPLATE.format(
+            title_id=titles[0]['id'], review_id=reviews[0]['id']
+        )
+
+        response = client.get(f'{url}?format=ndjson')
+
+        rows = b''.join(response.streaming_content).splitlines()
+        assert len(rows) == len(comments), (
+            f'Проверьте, что `{url}?format=ndjson` возвращает все '
+            'комментарии к отзыву, по одному в строке.'
+        )
+
+    def test_04_ndjson_missing_title(self, client):
+        response = client.get(
+            self.REVIEWS_URL_TEMPLATE.format(title_id=999) + '?format=ndjson'
+        )
+
+        assert response.status_code == HTTPStatus.NOT_FOUND
+
+    def test_05_ndjson_author_map_per_chunk(self, client, admin_client,
+                                           admin, user_client, user,
+                                           monkeypatch):
+        from api import fields
+        from api.mixins import StreamingListMixin
+
+        maps = []
+
+        class RecordedAuthorMap(fields.AuthorMap):
+            def __init__(self):
+                super().__init__()
+                maps.append(self)
+
+        monkeypatch.setattr('api.mixins.AuthorMap', RecordedAuthorMap)
+        monkeypatch.setattr(StreamingListMixin, 'stream_chunk_size', 1)
+        reviews, titles = create_reviews(
+            admin_client, {admin: admin_client, user: user_client}
+        )
+        url = self.REVIEWS_URL_TEMPLATE.format(title_id=titles[0]['id'])
+
+        rows = [
+            json.loads(line) for line in b''.join(
+                client.get(f'{url}?format=ndjson').streaming_content
+            ).splitlines()
+        ]
+
+        assert {row['author'] for row in rows} == {
+            admin.username, user.username
+        }
+        assert len(maps) == len(rows) and all(
+            len(authors.usernames) == 1 for authors in maps
+        ), (
+            'Проверьте, что потоковый ответ держит в памяти авторов только '
+            'текущей порции.'
+        )
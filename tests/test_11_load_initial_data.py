@@ -0,0 +1,220 @@
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.core.management.base import CommandError
+
+
+@pytest.mark.django_db(transaction=True)
+class Test11LoadInitialData:
+
+    def test_01_load_bundled_csv(self):
+        from reviews.models import Review, Title
+        from users.models import User
+        out = StringIO()
+
+        call_command('load_initial_data', batch_size=10, stdout=out)
+
+        assert Title.objects.count() == 32
+        assert Title.objects.get(pk=1).genre.count() == 1
+        assert Review.objects.count() > 0
+        title = Title.objects.get(pk=1)
+        assert title.review_count == title.reviews.count(), (
+            'Проверьте, что после загрузки CSV пересчитываются агрегаты '
+            'рейтинга произведений.'
+        )
+        assert Review.objects.get(pk=1).pub_date.year == 2019, (
+            'Проверьте, что загрузчик сохраняет `pub_date` из CSV.'
+        )
+        assert User.objects.exclude(confirmation_code='XXXX').count() == (
+            User.objects.count()
+        )
+        assert 'rows/s' in out.getvalue()
+
+    def test_02_missing_foreign_key(self, tmp_path):
+        from reviews.csv_data import TABLES
+        for table in TABLES:
+            (tmp_path / table.filename).write_text(
+                ','.join(table.columns) + '\n', encoding='utf-8'
+            )
+        (tmp_path / 'titles.csv').write_text(
+            'id,name,year,category\n1,Фильм,1994,7\n', encoding='utf-8'
+        )
+
+        with pytest.raises(CommandError, match='titles.csv:2'):
+            call_command('load_initial_data', path=tmp_path, stdout=StringIO())
+
+    def test_03_upsert_is_idempotent(self):
+        from reviews.models import Review
+        call_command('load_initial_data', stdout=StringIO())
+        Review.objects.filter(pk=1).update(text='изменено')
+
+        call_command('load_initial_data', upsert=True, stdout=StringIO())
+
+        assert Review.objects.get(pk=1).text != 'изменено', (
+            'Проверьте, что `load_initial_data --upsert` перезаписывает '
+            'существующие строки по id.'
+        )
+
+    def test_04_diff_applies_only_changes(self):
+        from reviews.models import Genre, Review, Title
+        call_command('load_initial_data', stdout=StringIO())
+        Review.objects.filter(pk=1).update(score=1)
+        Genre.objects.create(name='Лишний', slug='extra')
+        out = StringIO()
+
+        call_command('load_initial_data', diff=True, stdout=out)
+
+        report = out.getvalue()
+        assert 'genre: 0 inserted, 0 updated, 1 deleted' in report
+        assert 'review: 0 inserted, 1 updated, 0 deleted' in report
+        assert 'titles: 0 inserted, 0 updated, 0 deleted' in report
+        assert not Genre.objects.filter(slug='extra').exists()
+        assert Review.objects.get(pk=1).score == 10
+        title = Title.objects.get(pk=1)
+        assert title.score_sum == sum(
+            title.reviews.values_list('score', flat=True)
+        )
+
+    def test_05_resume_from_checkpoint(self, tmp_path):
+        import shutil
+
+        from reviews.csv_data import DATA_DIR
+        from reviews.models import Comment, Review
+        data_dir = tmp_path / 'data'
+        shutil.copytree(DATA_DIR, data_dir)
+        comments = (data_dir / 'comments.csv').read_text(encoding='utf-8')
+        (data_dir / 'comments.csv').write_text(
+            comments.replace(',102,', ',999,'), encoding='utf-8'
+        )
+        checkpoint = tmp_path / 'checkpoint.json'
+
+        with pytest.raises(CommandError, match='comments.csv'):
+            call_command(
+                'load_initial_data', path=data_dir, checkpoint=checkpoint,
+                chunk_size=512, workers=2, stdout=StringIO()
+            )
+        assert checkpoint.exists(), (
+            'Проверьте, что при ошибке загрузки сохраняется контрольная '
+            'точка с уже загруженными частями файлов.'
+        )
+        reviews_count = Review.objects.count()
+        assert reviews_count > 0
+
+        (data_dir / 'comments.csv').write_text(comments, encoding='utf-8')
+        call_command(
+            'load_initial_data', path=data_dir, checkpoint=checkpoint,
+            resume=True, stdout=StringIO()
+        )
+
+        assert Review.objects.count() == reviews_count
+        assert Comment.objects.count() == 3
+        assert not checkpoint.exists()
+
+    def test_06_dependency_levels(self):
+        from reviews.csv_data import dependency_levels
+        levels = [
+            [table.name for table in level] for level in dependency_levels()
+        ]
+        assert levels == [
+            ['category', 'users', 'genre'],
+            ['titles'],
+            ['genre_title', 'review'],
+            ['comments'],
+        ]
+
+    @pytest.mark.parametrize('compress', (False, True))
+    def test_07_dump_data_round_trip(self, tmp_path, compress):
+        from reviews.csv_data import TABLES
+        from reviews.models import Review, Title
+        call_command('load_initial_data', stdout=StringIO())
+        expected = {
+            table.name: list(
+                table.model.objects.order_by('pk').values_list(
+                    *table.attnames
+                )
+            )
+            for table in TABLES
+        }
+
+        call_command(
+            'dump_data', tmp_path, gzip=compress, chunk_size=7,
+            stdout=StringIO()
+        )
+        for table in TABLES:
+            table.model.objects.all().delete()
+        call_command('load_initial_data', path=tmp_path, stdout=StringIO())
+
+        for table in TABLES:
+            assert list(
+                table.model.objects.order_by('pk').values_list(
+                    *table.attnames
+                )
+            ) == expected[table.name], (
+                f'Проверьте, что таблица `{table.name}` без потерь проходит '
+                'через `dump_data` и `load_initial_data`.'
+            )
+        title = Title.objects.get(pk=1)
+        assert title.review_count == Review.objects.filter(title=title).count()
+
+    def test_08_per_table_timing(self, monkeypatch):
+        import re
+        import time
+
+        from reviews.csv_data import REFERENCED_TABLES, UserCsvTable
+        assert REFERENCED_TABLES == {
+            'category', 'users', 'genre', 'titles', 'review'
+        }, 'Проверьте, что id листовых таблиц не держатся в памяти.'
+
+        build = UserCsvTable.build
+
+        def slow_build(self, values):
+            time.sleep(0.05)
+            return build(self, values)
+
+        monkeypatch.setattr(UserCsvTable, 'build', slow_build)
+        out = StringIO()
+        call_command('load_initial_data', stdout=out)
+
+        timings = dict(re.findall(r'^(\w+): .* in ([\d.]+)s', out.getvalue(),
+                                  re.MULTILINE))
+        assert float(timings['users']) >= 0.2
+        assert float(timings['genre']) < float(timings['users']) / 2, (
+            'Проверьте, что время загрузки считается для каждой таблицы '
+            'отдельно.'
+        )
+
+    def test_09_resume_after_uncheckpointed_chunk(self, tmp_path,
+                                                  monkeypatch):
+        from reviews.csv_data import (DATA_DIR, TABLES_BY_NAME, data_file,
+                                      read_rows)
+        from reviews.management.commands.load_initial_data import Checkpoint
+        from reviews.models import Review
+        checkpoint = tmp_path / 'checkpoint.json'
+        save = Checkpoint.save
+
+        def crash(self, filename, offset, line):
+            if filename == 'review.csv':
+                raise RuntimeError('crash')
+            save(self, filename, offset, line)
+
+        monkeypatch.setattr(Checkpoint, 'save', crash)
+        with pytest.raises(RuntimeError):
+            call_command(
+                'load_initial_data', checkpoint=checkpoint, chunk_size=512,
+                stdout=StringIO()
+            )
+        assert Review.objects.exists()
+        monkeypatch.setattr(Checkpoint, 'save', save)
+
+        call_command(
+            'load_initial_data', checkpoint=checkpoint, resume=True,
+            stdout=StringIO()
+        )
+        reviews = list(
+            read_rows(data_file(DATA_DIR, TABLES_BY_NAME['review']))
+        )
+        assert Review.objects.count() == len(reviews), (
+            'Проверьте, что `--resume` пропускает строки куска, '
+            'зафиксированного до записи контрольной точки.'
+        )
@@ -0,0 +1,92 @@
+import shutil
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.core.management.base import CommandError
+
+
+@pytest.fixture
+def data_dir(tmp_path):
+    from reviews.csv_data import DATA_DIR
+    path = tmp_path / 'data'
+    shutil.copytree(DATA_DIR, path)
+    return path
+
+
+def append_rows(path, filename, *rows):
+    content = (path / filename).read_text(encoding='utf-8').rstrip('\n')
+    (path / filename).write_text(
+        '\n'.join((content, *rows)) + '\n', encoding='utf-8'
+    )
+
+
+@pytest.mark.django_db(transaction=True)
+class Test12ValidateInitialData:
+
+    def test_01_bundled_data_is_valid(self):
+        out = StringIO()
+
+        call_command('validate_initial_data', stdout=out)
+
+        assert 'valid' in out.getvalue()
+
+    def test_02_reports_every_error_with_line(self, data_dir):
+        from reviews.csv_validation import validate_data
+        append_rows(
+            data_dir, 'review.csv',
+            '900,1,Слишком хорошо,103,11,2020-01-01T00:00:00Z',
+            '901,1,Повтор,100,5,2020-01-01T00:00:00Z',
+        )
+        append_rows(data_dir, 'genre_title.csv', '900,999,1')
+        append_rows(data_dir, 'titles.csv', '900,До нашей эры,-5,1')
+        append_rows(
+            data_dir, 'users.csv',
+            '900,bingobongo,other@yamdb.fake,superhero,,,',
+        )
+
+        errors = validate_data(data_dir)
+
+        messages = {(filename, message) for filename, _, message in errors}
+        assert ('review.csv', 'score=11 is out of range [1, 10]') in messages
+        assert ('review.csv', 'duplicate author_id+title_id=(100, 1)') in (
+            messages
+        )
+        assert ('genre_title.csv', 'title_id=999 not found in titles.csv') in (
+            messages
+        )
+        assert ('users.csv', "duplicate username=('bingobongo',)") in messages
+        assert any(
+            filename == 'titles.csv' and message.startswith(
+                'year=-5 is out of range [0, '
+            )
+            for filename, message in messages
+        ), (
+            'Проверьте, что год произведения проверяется и по нижней '
+            'границе поля.'
+        )
+        assert any(
+            filename == 'users.csv' and message.startswith("role='superhero'")
+            for filename, message in messages
+        )
+        lines = {
+            (filename, line) for filename, line, _ in errors
+        }
+        assert ('genre_title.csv', 44) in lines, (
+            'Проверьте, что ошибки проверки CSV содержат номер строки файла.'
+        )
+
+    def test_03_loader_validate_flag(self, data_dir):
+        from reviews.models import Category
+        append_rows(data_dir, 'titles.csv', '900,Будущее,3000,1')
+
+        with pytest.raises(CommandError):
+            call_command(
+                'load_initial_data', path=data_dir, validate=True,
+                stdout=StringIO(), stderr=StringIO()
+            )
+
+        assert not Category.objects.exists(), (
+            'Проверьте, что `load_initial_data --validate` не загружает '
+            'данные, если проверка нашла ошибки.'
+        )
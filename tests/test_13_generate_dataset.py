@@ -0,0 +1,59 @@
+import csv
+from collections import Counter
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+
+GENERATE_OPTIONS = {
+    'users': 50, 'titles': 30, 'reviews': 400, 'comments': 200, 'seed': 7,
+}
+
+
+def generate(path, **options):
+    call_command(
+        'generate_dataset', path, stdout=StringIO(),
+        **dict(GENERATE_OPTIONS, **options)
+    )
+
+
+class Test13GenerateDataset:
+
+    def test_01_deterministic(self, tmp_path):
+        generate(tmp_path / 'one', workers=1)
+        generate(tmp_path / 'two', workers=2)
+        generate(tmp_path / 'other', workers=1, seed=8)
+
+        for filename in ('users.csv', 'titles.csv', 'review.csv'):
+            first = (tmp_path / 'one' / filename).read_bytes()
+            assert first == (tmp_path / 'two' / filename).read_bytes(), (
+                'Проверьте, что `generate_dataset` с тем же seed даёт те же '
+                'файлы при любом числе процессов.'
+            )
+        assert (tmp_path / 'one' / 'review.csv').read_bytes() != (
+            tmp_path / 'other' / 'review.csv'
+        ).read_bytes()
+
+    def test_02_valid_and_skewed(self, tmp_path):
+        from reviews.csv_validation import validate_data
+        generate(tmp_path, title_skew=1.5)
+
+        assert validate_data(tmp_path) == []
+        with open(tmp_path / 'review.csv', encoding='utf-8') as file:
+            per_title = Counter(row['title_id'] for row in csv.DictReader(file))
+        assert sum(per_title.values()) == GENERATE_OPTIONS['reviews']
+        (_, most), *_ = per_title.most_common()
+        assert most > 3 * GENERATE_OPTIONS['reviews'] / len(per_title), (
+            'Проверьте, что число отзывов на произведение распределено '
+            'неравномерно при `--title-skew`.'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_03_loads(self, tmp_path):
+        from reviews.models import Comment, Review
+        generate(tmp_path)
+
+        call_command('load_initial_data', path=tmp_path, stdout=StringIO())
+
+        assert Review.objects.count() == GENERATE_OPTIONS['reviews']
+        assert Comment.objects.count() == GENERATE_OPTIONS['comments']
@@ -0,0 +1,46 @@
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+
+
+@pytest.mark.django_db(transaction=True)
+class Test14Benchmarks:
+
+    def test_01_every_route_measured(self):
+        from benchmarks.runner import percentile, run
+        from benchmarks.scenarios import build_scenarios, credentials
+        call_command('load_initial_data', stdout=StringIO())
+
+        scenarios = build_scenarios()
+        results = run(scenarios, credentials(), requests=3, concurrency=1)
+
+        assert set(results) == {
+            'signup', 'token', 'titles-list', 'titles-detail',
+            'titles-filter', 'genres-list', 'categories-list',
+            'review-list', 'review-detail', 'comment-list', 'users-list',
+            'users-me',
+        }
+        for name, stats in results.items():
+            assert stats['errors'] == 0, (name, stats['statuses'])
+            # Справочники отдаются из снимка в памяти без запросов.
+            if name not in ('genres-list', 'categories-list'):
+                assert stats['queries_mean'] > 0, name
+            assert stats['p50_ms'] <= stats['p99_ms']
+        assert percentile([1, 2, 3, 4], 0.5) == 2
+        assert percentile([1, 2, 3, 4], 0.99) == 4
+
+    def test_02_percentile_nearest_rank(self):
+        from benchmarks.runner import percentile
+
+        values = list(range(1, 101))
+        assert percentile(values, 0.95) == 95, (
+            'Проверьте, что p95 из 100 значений — 95-е значение.'
+        )
+        assert percentile(values, 0.99) == 99
+        assert percentile(values, 0.50) == 50
+        assert percentile([1, 2], 0.5) == 1, (
+            'Проверьте, что медиана двух значений — меньшее из них.'
+        )
+        assert percentile([7], 0.99) == 7
+        assert percentile([], 0.5) is None
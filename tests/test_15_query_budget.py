@@ -0,0 +1,107 @@
+from http import HTTPStatus
+
+import pytest
+from django.db import connection
+from django.test import override_settings
+from rest_framework.test import APIClient
+
+
+def budget_client(token, **config):
+    """Новый клиент: middleware читает настройки при первом запросе."""
+    client = APIClient()
+    client.credentials(HTTP_AUTHORIZATION=f'Bearer {token["access"]}')
+    return override_settings(QUERY_BUDGET=config), client
+
+
+@pytest.mark.django_db(transaction=True)
+class Test15QueryBudget:
+
+    def test_01_repeated_shapes(self):
+        from api.queries import QueryInspector, query_shape
+
+        assert query_shape('SELECT 1 WHERE id IN (%s, %s, %s)') == (
+            query_shape('SELECT 1 WHERE id IN (%s, %s)')
+        ), (
+            'Проверьте, что запросы, отличающиеся только числом параметров '
+            '`IN`, считаются одной формой.'
+        )
+        inspector = QueryInspector()
+        with connection.execute_wrapper(inspector):
+            with connection.cursor() as cursor:
+                for value in range(3):
+                    cursor.execute('SELECT %s', [value])
+                cursor.execute('SELECT 1')
+        assert inspector.count == 4
+        assert inspector.repeated(3) == {'SELECT %s': 3}, (
+            'Проверьте, что QueryInspector находит запрос, повторённый '
+            'с разными параметрами.'
+        )
+        assert inspector.repeated(4) == {}
+
+    def test_02_header_mode(self, token_admin):
+        settings, client = budget_client(token_admin, MODE='header')
+        with settings:
+            response = client.get('/api/v1/genres/')
+
+        assert response.status_code == HTTPStatus.OK
+        assert int(response['X-Query-Count']) > 0, (
+            'Проверьте, что в режиме `header` ответ содержит число '
+            'SQL-запросов в заголовке `X-Query-Count`.'
+        )
+        assert 'X-Query-Time-Ms' in response
+        assert response['X-Query-Budget'] == '3', (
+            'Проверьте, что в заголовке `X-Query-Budget` передаётся бюджет '
+            'действия, объявленный на вьюсете.'
+        )
+        assert 'X-Query-Warning' not in response
+
+    def test_03_raise_mode(self, token_admin, monkeypatch):
+        from api.middleware import QueryBudgetExceeded
+        from api.views import GenreViewSet
+
+        monkeypatch.setattr(GenreViewSet, 'query_budget', {'list': 0})
+        settings, client = budget_client(token_admin, MODE='raise')
+        with settings:
+            with pytest.raises(QueryBudgetExceeded, match='budget of 0'):
+                client.get('/api/v1/genres/')
+            response = client.get('/api/v1/categories/')
+
+        assert response.status_code == HTTPStatus.OK, (
+            'Проверьте, что запрос, уложившийся в бюджет, выполняется '
+            'в режиме `raise` без ошибок.'
+        )
+
+    def test_04_log_mode(self, token_admin, monkeypatch, caplog):
+        from api.views import GenreViewSet
+
+        monkeypatch.setattr(GenreViewSet, 'query_budget', 0)
+        settings, client = budget_client(token_admin, MODE='log')
+        with settings, caplog.at_level('WARNING', logger='api.queries'):
+            response = client.get('/api/v1/genres/')
+
+        assert response.status_code == HTTPStatus.OK
+        assert 'X-Query-Count' not in response
+        assert any(
+            'GET /api/v1/genres/' in record.getMessage()
+            for record in caplog.records
+        ), (
+            'Проверьте, что в режиме `log` превышение бюджета пишется '
+            'в лог `api.queries`.'
+        )
+
+    def test_05_rebuild_not_counted(self, token_admin, admin_client):
+        from reviews import catalog
+
+        admin_client.post('/api/v1/genres/',
+                          data={'name': 'Драма', 'slug': 'drama'})
+        settings, client = budget_client(token_admin, MODE='header')
+        with settings:
+            catalog.invalidate()
+            cold = client.get('/api/v1/genres/')
+            warm = client.get('/api/v1/genres/')
+
+        assert cold.json() == warm.json()
+        assert cold['X-Query-Count'] == warm['X-Query-Count'], (
+            'Проверьте, что разовые запросы перестройки снимка справочника '
+            'не учитываются в бюджете.'
+        )
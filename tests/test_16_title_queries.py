@@ -0,0 +1,86 @@
+from http import HTTPStatus
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from tests.utils import create_titles
+
+
+def count_queries(client, url):
+    with CaptureQueriesContext(connection) as context:
+        response = client.get(url)
+    assert response.status_code == HTTPStatus.OK
+    return len(context)
+
+
+@pytest.mark.django_db(transaction=True)
+class Test16TitleQueries:
+
+    def test_01_list_constant_queries(self, client, admin_client):
+        create_titles(admin_client)
+
+        one = count_queries(client, '/api/v1/titles/?limit=1')
+        many = count_queries(client, '/api/v1/titles/?limit=100')
+        cursor = count_queries(
+            client, '/api/v1/titles/?pagination=cursor&limit=100'
+        )
+
+        assert one == many, (
+            'Проверьте, что число SQL-запросов для `/api/v1/titles/` '
+            'не зависит от размера страницы.'
+        )
+        assert many <= 3, (
+            'Проверьте, что категории загружаются через JOIN, а жанры — '
+            'одним запросом на страницу.'
+        )
+        assert cursor <= 2
+
+    def test_02_detail_and_write_queries(self, admin_client):
+        titles, _, _ = create_titles(admin_client)
+        url = f'/api/v1/titles/{titles[0]["id"]}/'
+
+        assert count_queries(admin_client, url) <= 3, (
+            'Проверьте, что `/api/v1/titles/{title_id}/` загружает '
+            'категорию и жанры без дополнительных запросов.'
+        )
+        response = admin_client.patch(
+            url, data={'genre': ['horror', 'horror']}, format='json'
+        )
+        assert response.status_code == HTTPStatus.OK
+        assert response.json()['genre'] == [
+            {'name': 'Ужасы', 'slug': 'horror'}
+        ], (
+            'Проверьте, что ответ на изменение произведения содержит '
+            'переданные жанры без повторов.'
+        )
+
+    def test_03_genre_order_matches_get(self, admin_client):
+        from reviews.models import Category, Genre
+
+        for name, slug in (('Фэнтези', 'fantasy'), ('Драма', 'drama'),
+                           ('Комедия', 'comedy')):
+            Genre.objects.create(name=name, slug=slug)
+        Category.objects.create(name='Фильм', slug='movie')
+
+        response = admin_client.post('/api/v1/titles/', data={
+            'name': 'Сказка', 'year': 2000, 'description': 'Описание',
+            'genre': ['fantasy', 'comedy', 'drama'], 'category': 'movie',
+        })
+        assert response.status_code == HTTPStatus.CREATED
+        created = [genre['slug'] for genre in response.json()['genre']]
+        title_id = response.json()['id']
+        detail = admin_client.get(f'/api/v1/titles/{title_id}/').json()
+        assert created == [genre['slug'] for genre in detail['genre']] == [
+            'drama', 'comedy', 'fantasy'
+        ], (
+            'Проверьте, что ответ на создание произведения и GET '
+            'возвращают жанры в одном порядке — по названию.'
+        )
+
+        response = admin_client.patch(f'/api/v1/titles/{title_id}/', data={
+            'genre': ['fantasy', 'drama'],
+        })
+        assert [genre['slug'] for genre in response.json()['genre']] == [
+            'drama', 'fantasy'
+        ]
@@ -0,0 +1,76 @@
+from http import HTTPStatus
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from tests.utils import create_comments
+
+
+def user_queries(client, url):
+    with CaptureQueriesContext(connection) as context:
+        response = client.get(url)
+        if response.streaming:
+            content = b''.join(response.streaming_content)
+        else:
+            content = response.content
+    assert response.status_code == HTTPStatus.OK
+    queries = [
+        query['sql'] for query in context.captured_queries
+        if 'FROM "users_user"' in query['sql']
+    ]
+    return queries, content.decode()
+
+
+@pytest.mark.django_db(transaction=True)
+class Test17AuthorQueries:
+
+    def test_01_comment_authors_batched(self, client, admin_client, admin,
+                                        user_client, user, moderator_client,
+                                        moderator):
+        from reviews.models import Comment
+
+        comments, reviews, titles = create_comments(admin_client, {
+            admin: admin_client,
+            user: user_client,
+            moderator: moderator_client,
+        })
+        Comment.objects.bulk_create(
+            Comment(review_id=reviews[0]['id'], author=author, text='Ещё')
+            for author in (admin, user, moderator) * 10
+        )
+        url = (
+            f'/api/v1/titles/{titles[0]["id"]}/reviews/{reviews[0]["id"]}/'
+            'comments/'
+        )
+
+        for query_string in ('?limit=100', '?format=ndjson'):
+            queries, content = user_queries(client, url + query_string)
+            assert len(queries) == 1, (
+                'Проверьте, что авторы комментариев загружаются одним '
+                'запросом на страницу.'
+            )
+            assert 'confirmation_code' not in queries[0]
+            assert '"bio"' not in queries[0], (
+                'Проверьте, что для авторов выбираются только `id` и '
+                '`username`.'
+            )
+            for username in (admin.username, user.username):
+                assert username in content
+
+    def test_02_review_authors(self, client, admin_client, admin,
+                               user_client, user):
+        titles = create_comments(admin_client, {
+            admin: admin_client,
+            user: user_client,
+        })[2]
+
+        queries, content = user_queries(
+            client, f'/api/v1/titles/{titles[0]["id"]}/reviews/'
+        )
+
+        assert len(queries) == 1, (
+            'Проверьте, что авторы отзывов загружаются одним запросом на '
+            'страницу.'
+        )
+        assert admin.username in content and user.username in content
@@ -0,0 +1,70 @@
+from http import HTTPStatus
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from tests.utils import create_reviews
+
+
+def parent_selects(client, method, url, **kwargs):
+    with CaptureQueriesContext(connection) as context:
+        response = getattr(client, method)(url, **kwargs)
+    selects = [
+        query['sql'] for query in context.captured_queries
+        if query['sql'].startswith('SELECT')
+        and ('FROM "reviews_title"' in query['sql']
+             or 'FROM "reviews_review"' in query['sql'])
+    ]
+    return response, selects
+
+
+@pytest.mark.django_db(transaction=True)
+class Test18NestedParents:
+
+    def test_01_review_create(self, admin_client, user_client):
+        from reviews.models import Title
+
+        title = Title.objects.create(name='Произведение', year=2000,
+                                     description='Описание')
+        response, selects = parent_selects(
+            user_client, 'post', f'/api/v1/titles/{title.id}/reviews/',
+            data={'text': 'Отзыв', 'score': 7}
+        )
+
+        assert response.status_code == HTTPStatus.CREATED
+        assert sum('FROM "reviews_title"' in sql for sql in selects) == 1, (
+            'Проверьте, что при создании отзыва произведение загружается '
+            'один раз за запрос.'
+        )
+
+    def test_02_comment_chain(self, admin_client, admin, user_client, user):
+        reviews, titles = create_reviews(admin_client, {
+            admin: admin_client,
+        })
+        url = (
+            f'/api/v1/titles/{titles[0]["id"]}/reviews/{reviews[0]["id"]}/'
+            'comments/'
+        )
+
+        response, selects = parent_selects(
+            user_client, 'post', url, data={'text': 'Комментарий'}
+        )
+        assert response.status_code == HTTPStatus.CREATED
+        assert len(selects) == 1, (
+            'Проверьте, что цепочка `title_id` → `review_id` проверяется '
+            'одним запросом за запрос к API.'
+        )
+
+        response, selects = parent_selects(user_client, 'get', url)
+        assert response.status_code == HTTPStatus.OK
+        assert len(selects) == 1
+
+        other_title = titles[1]['id']
+        response = user_client.get(
+            f'/api/v1/titles/{other_title}/reviews/{reviews[0]["id"]}/'
+            'comments/'
+        )
+        assert response.status_code == HTTPStatus.NOT_FOUND, (
+            'Проверьте, что отзыв к другому произведению не найден.'
+        )
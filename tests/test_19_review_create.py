@@ -0,0 +1,55 @@
+from http import HTTPStatus
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+
+@pytest.mark.django_db(transaction=True)
+class Test19ReviewCreate:
+
+    def test_01_single_insert(self, user_client, user):
+        from reviews.models import Review, Title
+
+        title = Title.objects.create(name='Произведение', year=2000,
+                                     description='Описание')
+        url = f'/api/v1/titles/{title.id}/reviews/'
+        with CaptureQueriesContext(connection) as context:
+            response = user_client.post(url, data={'text': 'Отзыв',
+                                                   'score': 7})
+
+        assert response.status_code == HTTPStatus.CREATED
+        assert not any(
+            query['sql'].startswith('SELECT')
+            and 'FROM "reviews_review"' in query['sql']
+            for query in context.captured_queries
+        ), (
+            'Проверьте, что перед созданием отзыва не выполняется отдельная '
+            'проверка на повторный отзыв.'
+        )
+        assert Review.objects.filter(author=user, title=title).count() == 1
+
+    def test_02_duplicate_after_race(self, user_client, user):
+        from reviews.models import Review, Title
+
+        title = Title.objects.create(name='Произведение', year=2000,
+                                     description='Описание')
+        # Отзыв, сохранённый параллельным запросом.
+        Review.objects.create(author=user, title=title, text='Отзыв',
+                              score=5)
+
+        response = user_client.post(
+            f'/api/v1/titles/{title.id}/reviews/',
+            data={'text': 'Повтор', 'score': 9}
+        )
+
+        assert response.status_code == HTTPStatus.BAD_REQUEST, (
+            'Проверьте, что нарушение уникальности отзыва возвращает 400.'
+        )
+        assert response.json() == {
+            'non_field_errors': ['Вы уже оставляли отзыв на это произведение.']
+        }
+        title.refresh_from_db()
+        assert (title.score_sum, title.review_count) == (5, 1), (
+            'Проверьте, что неудачная вставка не меняет рейтинг.'
+        )
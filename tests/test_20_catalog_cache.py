@@ -0,0 +1,136 @@
+from http import HTTPStatus
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from tests.utils import (bump_version_elsewhere, create_categories,
+                         create_genre, create_titles)
+
+
+def slug_lookups(context):
+    return [
+        query['sql'] for query in context.captured_queries
+        if query['sql'].startswith('SELECT')
+        and ('"reviews_genre"."slug" =' in query['sql']
+             or '"reviews_category"."slug" =' in query['sql'])
+    ]
+
+
+@pytest.mark.django_db(transaction=True)
+class Test20CatalogCache:
+
+    def test_01_list_from_snapshot(self, client, admin_client):
+        create_genre(admin_client)
+        client.get('/api/v1/genres/')
+
+        with CaptureQueriesContext(connection) as context:
+            response = client.get('/api/v1/genres/')
+        assert response.status_code == HTTPStatus.OK
+        assert response.json()['count'] == 3
+        assert len(context) == 0, (
+            'Проверьте, что список `/api/v1/genres/` отдаётся из снимка '
+            'справочника без запросов к базе.'
+        )
+
+        admin_client.post('/api/v1/genres/',
+                          data={'name': 'Вестерн', 'slug': 'western'})
+        admin_client.delete('/api/v1/genres/horror/')
+        slugs = {
+            genre['slug']
+            for genre in client.get('/api/v1/genres/').json()['results']
+        }
+        assert slugs == {'comedy', 'drama', 'western'}, (
+            'Проверьте, что снимок справочника обновляется после '
+            'добавления и удаления жанра.'
+        )
+
+        response = client.get('/api/v1/genres/?search=Вест')
+        assert [genre['slug'] for genre in response.json()['results']] == [
+            'western'
+        ]
+
+    def test_02_title_write_resolves_slugs(self, admin_client):
+        genres = create_genre(admin_client)
+        categories = create_categories(admin_client)
+        data = {
+            'name': 'Поворот туда',
+            'year': 2000,
+            'genre': [genre['slug'] for genre in genres],
+            'category': categories[0]['slug'],
+            'description': 'Описание',
+        }
+        admin_client.get('/api/v1/categories/')
+
+        with CaptureQueriesContext(connection) as context:
+            response = admin_client.post('/api/v1/titles/', data=data)
+        assert response.status_code == HTTPStatus.CREATED
+        assert slug_lookups(context) == [], (
+            'Проверьте, что slug жанров и категории при создании '
+            'произведения берутся из снимка справочника.'
+        )
+        assert response.json()['category'] == categories[0]
+
+        with CaptureQueriesContext(connection) as context:
+            response = admin_client.get('/api/v1/titles/')
+        assert response.json()['results'][0]['category'] == categories[0]
+        assert not any(
+            '"reviews_category"' in query['sql']
+            for query in context.captured_queries
+        ), (
+            'Проверьте, что категория произведения в списке берётся из '
+            'снимка справочника.'
+        )
+
+        response = admin_client.post(
+            '/api/v1/titles/', data={**data, 'genre': ['unknown']}
+        )
+        assert response.status_code == HTTPStatus.BAD_REQUEST, (
+            'Проверьте, что несуществующий slug жанра возвращает 400.'
+        )
+
+    def test_03_version_shared_between_processes(self, admin_client,
+                                                 settings):
+        from reviews.models import Genre
+
+        create_genre(admin_client)
+        categories = create_categories(admin_client)
+        admin_client.get('/api/v1/genres/')
+        # Запись другого процесса: строка в базе без сигналов этого.
+        Genre.objects.bulk_create([Genre(name='Вестерн', slug='western')])
+        response = admin_client.get('/api/v1/genres/')
+        assert response.json()['count'] == 3
+
+        bump_version_elsewhere(settings, 'catalog')
+        slugs = {
+            genre['slug']
+            for genre in admin_client.get('/api/v1/genres/').json()['results']
+        }
+        assert 'western' in slugs, (
+            'Проверьте, что версия снимка справочника общая для процессов: '
+            'увеличение её в другом процессе перечитывает справочник.'
+        )
+        response = admin_client.post('/api/v1/titles/', data={
+            'name': 'Поворот туда', 'year': 2000, 'genre': ['western'],
+            'category': categories[0]['slug'], 'description': 'Описание',
+        })
+        assert response.status_code == HTTPStatus.CREATED, response.json()
+
+    def test_04_snapshot_once_per_request(self, admin_client, monkeypatch):
+        import reviews.catalog
+
+        titles, _, _ = create_titles(admin_client)
+        calls = []
+        current_version = reviews.catalog.current_version
+
+        def counted():
+            calls.append(1)
+            return current_version()
+
+        monkeypatch.setattr(reviews.catalog, 'current_version', counted)
+        response = admin_client.get('/api/v1/titles/')
+        assert response.json()['count'] == len(titles)
+        assert len(calls) == 1, (
+            'Проверьте, что версия снимка справочника читается один раз '
+            'на запрос, а не для каждого произведения в списке.'
+        )
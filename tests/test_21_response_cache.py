@@ -0,0 +1,149 @@
+from http import HTTPStatus
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from tests.utils import create_comments, create_reviews
+
+
+def cached_get(client, url):
+    with CaptureQueriesContext(connection) as context:
+        response = client.get(url)
+    assert response.status_code == HTTPStatus.OK
+    return response, len(context)
+
+
+@pytest.mark.django_db(transaction=True)
+class Test21ResponseCache:
+
+    def test_01_anonymous_hit(self, response_cache, client, admin_client,
+                              admin, user_client, user):
+        titles = create_comments(admin_client, {admin: admin_client})[2]
+        url = f'/api/v1/titles/{titles[0]["id"]}/'
+
+        response, _ = cached_get(client, url)
+        assert response['X-Cache'] == 'MISS'
+        cached, queries = cached_get(client, url)
+        assert cached['X-Cache'] == 'HIT', (
+            'Проверьте, что повторный анонимный GET-запрос отдаётся '
+            'из кеша ответов.'
+        )
+        assert queries == 0
+        assert cached.json() == response.json()
+
+        response, _ = cached_get(user_client, url)
+        assert 'X-Cache' not in response, (
+            'Проверьте, что запросы с токеном не кешируются.'
+        )
+
+    def test_02_precise_invalidation(self, response_cache, client,
+                                     admin_client, admin, user_client, user):
+        comments, reviews, titles = create_comments(admin_client, {
+            admin: admin_client,
+        })
+        title_url = f'/api/v1/titles/{titles[0]["id"]}/'
+        reviews_url = f'{title_url}reviews/'
+        comments_url = f'{reviews_url}{reviews[0]["id"]}/comments/'
+        other_url = f'/api/v1/titles/{titles[1]["id"]}/reviews/'
+        for url in (title_url, comments_url, other_url, '/api/v1/genres/'):
+            cached_get(client, url)
+
+        user_client.post(reviews_url, data={'text': 'Отзыв', 'score': 1})
+        response, _ = cached_get(client, title_url)
+        assert response['X-Cache'] == 'MISS'
+        assert response.json()['rating'] == 3, (
+            'Проверьте, что новый отзыв сбрасывает кеш произведения.'
+        )
+        assert cached_get(client, other_url)[0]['X-Cache'] == 'HIT', (
+            'Проверьте, что отзыв не сбрасывает кеш отзывов других '
+            'произведений.'
+        )
+        assert cached_get(client, '/api/v1/genres/')[0]['X-Cache'] == 'HIT'
+        assert cached_get(client, comments_url)[0]['X-Cache'] == 'HIT'
+
+        user_client.post(comments_url, data={'text': 'Комментарий'})
+        response, _ = cached_get(client, comments_url)
+        assert response.json()['count'] == len(comments) + 1, (
+            'Проверьте, что новый комментарий сбрасывает кеш списка '
+            'комментариев.'
+        )
+
+    def test_03_lru_budget(self, tmp_path):
+        from api.response_cache import ResponseCache
+
+        cache = ResponseCache(tmp_path / 'lru.sqlite3', max_bytes=100,
+                              touch_interval=0)
+        cache.set('first', b'1' * 40)
+        cache.set('second', b'2' * 40)
+        assert cache.get('first') == b'1' * 40
+        cache.set('third', b'3' * 40)
+
+        assert cache.get('second') is None, (
+            'Проверьте, что при превышении бюджета вытесняется давно '
+            'не читанная запись.'
+        )
+        assert cache.get('first') and cache.get('third')
+        cache.set('huge', b'4' * 101)
+        assert cache.get('huge') is None
+
+    def test_04_parent_deleted(self, response_cache, client, admin_client,
+                               admin):
+        reviews, titles = create_reviews(admin_client, {admin: admin_client})
+        title_id = titles[1]['id']
+        reviews_url = f'/api/v1/titles/{title_id}/reviews/'
+        review_url = f'/api/v1/titles/{titles[0]["id"]}/reviews/'
+        comments_url = f'{review_url}{reviews[0]["id"]}/comments/'
+        for url in (reviews_url, comments_url):
+            cached_get(client, url)
+            assert cached_get(client, url)[0]['X-Cache'] == 'HIT'
+
+        admin_client.delete(f'/api/v1/titles/{title_id}/')
+        assert client.get(reviews_url).status_code == HTTPStatus.NOT_FOUND, (
+            'Проверьте, что удаление произведения сбрасывает кеш списка '
+            'его отзывов.'
+        )
+        admin_client.delete(f'{review_url}{reviews[0]["id"]}/')
+        assert client.get(comments_url).status_code == (
+            HTTPStatus.NOT_FOUND
+        ), (
+            'Проверьте, что удаление отзыва сбрасывает кеш списка его '
+            'комментариев.'
+        )
+
+    def test_05_users_group(self, response_cache, client, admin_client,
+                            admin):
+        from api.response_cache import group_versions
+        from users.models import User
+
+        def users_version():
+            return dict(group_versions(['users']))['users']
+
+        version = users_version()
+        response = client.post('/api/v1/auth/signup/', data={
+            'username': 'reader', 'email': 'reader@yamdb.fake'
+        })
+        assert response.status_code == HTTPStatus.OK
+        admin_client.patch('/api/v1/users/reader/', data={'bio': 'Читатель'})
+        assert users_version() == version, (
+            'Проверьте, что регистрация и изменение полей, кроме username, '
+            'не сбрасывают кеш ответов с авторами.'
+        )
+        admin_client.patch('/api/v1/users/reader/',
+                           data={'username': 'writer'})
+        assert User.objects.filter(username='writer').exists()
+        assert users_version() == version + 1, (
+            'Проверьте, что смена username сбрасывает кеш ответов '
+            'с авторами.'
+        )
+
+    def test_06_off_by_default(self, monkeypatch):
+        import importlib
+
+        monkeypatch.delenv('RESPONSE_CACHE_PATH', raising=False)
+        project_settings = importlib.reload(
+            importlib.import_module('api_yamdb.settings')
+        )
+        assert not project_settings.RESPONSE_CACHE['PATH'], (
+            'Проверьте, что общий кеш ответов по умолчанию выключен.'
+        )
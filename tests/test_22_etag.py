@@ -0,0 +1,83 @@
+from http import HTTPStatus
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from tests.utils import create_reviews
+
+
+@pytest.mark.django_db(transaction=True)
+class Test22ETag:
+
+    def test_01_not_modified(self, response_cache, client, admin_client,
+                             admin, user_client, user):
+        reviews, titles = create_reviews(admin_client, {admin: admin_client})
+        title_url = f'/api/v1/titles/{titles[0]["id"]}/'
+        reviews_url = f'{title_url}reviews/'
+        etags = {}
+        for url in (title_url, reviews_url, f'{reviews_url}?limit=1'):
+            response = user_client.get(url)
+            assert response.status_code == HTTPStatus.OK
+            assert response.has_header('ETag'), (
+                f'Проверьте, что ответ `{url}` содержит заголовок `ETag`.'
+            )
+            etags[url] = response['ETag']
+        assert etags[reviews_url] != etags[f'{reviews_url}?limit=1']
+
+        with CaptureQueriesContext(connection) as context:
+            response = client.get(
+                title_url, HTTP_IF_NONE_MATCH=etags[title_url]
+            )
+        assert response.status_code == HTTPStatus.NOT_MODIFIED, (
+            'Проверьте, что на совпавший `If-None-Match` возвращается 304.'
+        )
+        assert response['ETag'] == etags[title_url]
+        assert len(context) == 0, (
+            'Проверьте, что анонимному запросу 304 отдаётся без обращения '
+            'к базе и сериализации.'
+        )
+        response = user_client.get(
+            title_url, HTTP_IF_NONE_MATCH=etags[title_url]
+        )
+        assert response.status_code == HTTPStatus.NOT_MODIFIED
+        response = client.get(
+            title_url, HTTP_IF_NONE_MATCH=etags[title_url],
+            HTTP_AUTHORIZATION='Bearer invalid'
+        )
+        assert response.status_code == HTTPStatus.UNAUTHORIZED, (
+            'Проверьте, что запрос с недействительным токеном получает 401, '
+            'а не 304.'
+        )
+
+        user_client.post(reviews_url, data={'text': 'Отзыв', 'score': 1})
+        for url in (title_url, reviews_url):
+            response = user_client.get(url, HTTP_IF_NONE_MATCH=etags[url])
+            assert response.status_code == HTTPStatus.OK, (
+                f'Проверьте, что после нового отзыва ETag `{url}` меняется.'
+            )
+            assert response['ETag'] != etags[url]
+
+    def test_02_authenticated_without_cache(self, admin_client, admin,
+                                            user_client, user):
+        reviews, titles = create_reviews(admin_client, {admin: admin_client})
+        url = f'/api/v1/titles/{titles[0]["id"]}/reviews/'
+        response = user_client.get(url)
+        assert 'X-Cache' not in response
+        assert response.has_header('ETag'), (
+            'Проверьте, что ETag работает и с выключенным кешем ответов.'
+        )
+
+        with CaptureQueriesContext(connection) as context:
+            response = user_client.get(
+                url, HTTP_IF_NONE_MATCH=response['ETag']
+            )
+        assert response.status_code == HTTPStatus.NOT_MODIFIED
+        assert not response.content
+        assert not any(
+            'reviews_review' in query['sql']
+            for query in context.captured_queries
+        ), (
+            'Проверьте, что запрос с токеном получает 304 после '
+            'аутентификации, без выборки и сериализации.'
+        )
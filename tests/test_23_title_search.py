@@ -0,0 +1,97 @@
+from http import HTTPStatus
+
+import pytest
+
+
+def search(client, text):
+    response = client.get('/api/v1/titles/', {'search': text})
+    assert response.status_code == HTTPStatus.OK
+    return [title['name'] for title in response.json()['results']]
+
+
+@pytest.mark.django_db(transaction=True)
+class Test23TitleSearch:
+
+    def test_01_search(self, client):
+        from reviews.models import Title
+
+        Title.objects.bulk_create([
+            Title(name='Война и мир', year=1869,
+                  description='Роман-эпопея о войне 1812 года'),
+            Title(name='Мир', year=2000, description='Фильм о космосе'),
+            Title(name='Солярис', year=1972,
+                  description='Космос, океан и память'),
+        ])
+
+        assert search(client, 'солярис') == ['Солярис'], (
+            'Проверьте, что `?search=` ищет произведения по названию без '
+            'учёта регистра.'
+        )
+        assert set(search(client, 'косм')) == {'Мир', 'Солярис'}, (
+            'Проверьте, что `?search=` ищет по началу слова в описании.'
+        )
+        assert search(client, 'мир война') == ['Война и мир'], (
+            'Проверьте, что все слова запроса обязательны.'
+        )
+        assert search(client, 'мир')[0] == 'Мир', (
+            'Проверьте, что результаты поиска отсортированы по '
+            'релевантности.'
+        )
+        assert search(client, '" OR * NEAR(') == []
+        assert len(search(client, '')) == 3
+
+    def test_02_index_in_sync(self, client):
+        from reviews.models import Title
+
+        title = Title.objects.create(name='Сталкер', year=1979,
+                                     description='Зона')
+        assert search(client, 'сталкер') == ['Сталкер']
+
+        title.name = 'Пикник на обочине'
+        title.save()
+        assert search(client, 'сталкер') == []
+        assert search(client, 'пикник') == ['Пикник на обочине'], (
+            'Проверьте, что индекс поиска обновляется при изменении '
+            'произведения.'
+        )
+
+        title.delete()
+        assert search(client, 'пикник') == [], (
+            'Проверьте, что удалённое произведение не находится поиском.'
+        )
+
+    def test_03_triggers_checked(self):
+        from django.db import connection
+
+        from reviews.checks import check_title_fts
+
+        assert check_title_fts(databases=['default']) == [], (
+            'Проверьте, что миграции создают индекс FTS5 и его триггеры.'
+        )
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT sql FROM sqlite_master "
+                "WHERE name = 'reviews_title_fts_update'"
+            )
+            sql, = cursor.fetchone()
+            cursor.execute('DROP TRIGGER reviews_title_fts_update')
+            try:
+                errors = check_title_fts(databases=['default'])
+            finally:
+                cursor.execute(sql)
+        assert [error.id for error in errors] == ['reviews.E001'], (
+            'Проверьте, что проверка базы сообщает о пропавшем триггере.'
+        )
+        assert 'reviews_title_fts_update' in errors[0].msg
+
+    def test_04_cursor_pagination_rejected(self, client):
+        response = client.get(
+            '/api/v1/titles/', {'search': 'мир', 'pagination': 'cursor'}
+        )
+        assert response.status_code == HTTPStatus.BAD_REQUEST, (
+            'Проверьте, что поиск с курсорной пагинацией отклоняется: '
+            'курсор не сохраняет порядок по релевантности.'
+        )
+        assert 'search' in response.json()
+        response = client.get('/api/v1/titles/', {'pagination': 'cursor'})
+        assert response.status_code == HTTPStatus.OK
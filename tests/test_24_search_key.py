@@ -0,0 +1,84 @@
+from http import HTTPStatus
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.db import connection
+
+
+def found(client, url, text, field):
+    response = client.get(url, {'search': text})
+    assert response.status_code == HTTPStatus.OK
+    return [item[field] for item in response.json()['results']]
+
+
+@pytest.mark.django_db(transaction=True)
+class Test24SearchKey:
+
+    def test_01_cyrillic_case_and_yo(self, admin_client):
+        admin_client.post('/api/v1/genres/',
+                          data={'name': 'Ёлочные  Сказки', 'slug': 'tales'})
+        admin_client.post('/api/v1/categories/',
+                          data={'name': 'Фильм', 'slug': 'films'})
+
+        for text in ('ёлоч', 'ЕЛОЧНЫЕ сказ', '  елочные   сказки '):
+            assert found(admin_client, '/api/v1/genres/', text, 'slug') == [
+                'tales'
+            ], (
+                'Проверьте, что поиск жанров не учитывает регистр кириллицы, '
+                'различие ё/е и лишние пробелы.'
+            )
+        assert found(admin_client, '/api/v1/genres/', 'сказки', 'slug') == []
+        assert found(
+            admin_client, '/api/v1/categories/', 'фИЛ', 'slug'
+        ) == ['films']
+
+    def test_02_usernames(self, admin_client, admin, user):
+        assert found(
+            admin_client, '/api/v1/users/', 'TESTADM', 'username'
+        ) == [admin.username], (
+            'Проверьте, что поиск пользователей идёт по началу username '
+            'без учёта регистра.'
+        )
+        user.username = 'Пётр'
+        user.save(update_fields=['username'])
+        assert found(
+            admin_client, '/api/v1/users/', 'петр', 'username'
+        ) == ['Пётр']
+
+    def test_03_index_and_loader(self, admin_client):
+        from reviews.models import Genre
+        from users.search import prefix_filter
+
+        call_command('load_initial_data', stdout=StringIO())
+        assert found(admin_client, '/api/v1/genres/', 'драм', 'slug') == [
+            'drama'
+        ], 'Проверьте, что загрузчик заполняет ключ поиска.'
+
+        sql, params = Genre.objects.filter(
+            **prefix_filter('драм')
+        ).query.sql_with_params()
+        with connection.cursor() as cursor:
+            cursor.execute(f'EXPLAIN QUERY PLAN {sql}', params)
+            plan = ' '.join(row[-1] for row in cursor.fetchall())
+        assert 'search_key' in plan and 'INDEX' in plan, (
+            'Проверьте, что поиск по началу ключа использует индекс.'
+        )
+
+    @pytest.mark.parametrize('mode', ('upsert', 'diff'))
+    def test_04_upsert_keeps_search_key(self, client, mode):
+        from reviews.models import Genre
+        from users.models import User
+
+        call_command('load_initial_data', stdout=StringIO())
+        Genre.objects.filter(slug='drama').update(name='Старое название')
+        call_command('load_initial_data', stdout=StringIO(), **{mode: True})
+
+        assert found(client, '/api/v1/genres/', 'др', 'slug') == [
+            'drama'
+        ], (
+            'Проверьте, что `load_initial_data --upsert/--diff` '
+            'заполняет ключ поиска обновлённых строк.'
+        )
+        assert not Genre.objects.filter(search_key='').exists()
+        assert not User.objects.filter(search_key='').exists()
@@ -0,0 +1,98 @@
+from http import HTTPStatus
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from tests.utils import bump_version_elsewhere
+
+URL = '/api/v1/titles/suggest/'
+
+
+def suggest(client, q, **params):
+    response = client.get(URL, {'q': q, **params})
+    assert response.status_code == HTTPStatus.OK
+    return [(title['name'], title['rating']) for title in response.json()]
+
+
+@pytest.mark.django_db(transaction=True)
+class Test25TitleSuggest:
+
+    def test_01_ranked_prefix(self, client, admin, user):
+        from reviews.models import Review, Title
+
+        war, _, atom, _ = [
+            Title.objects.create(name=name, year=year, description='')
+            for name, year in (('Война и мир', 1869), ('Мир', 2000),
+                               ('Мирный атом', 1954), ('Солярис', 1972))
+        ]
+        for title, score in ((war, 9), (atom, 4)):
+            Review.objects.create(title=title, author=admin, text='Отзыв',
+                                  score=score)
+
+        assert suggest(client, 'МИР') == [
+            ('Война и мир', 9), ('Мирный атом', 4), ('Мир', None)
+        ], (
+            'Проверьте, что подсказки ищут по началу любого слова названия '
+            'и отсортированы по рейтингу.'
+        )
+        assert suggest(client, 'мирн') == [('Мирный атом', 4)]
+        assert suggest(client, 'мир', limit=1) == [('Война и мир', 9)]
+        assert suggest(client, '') == []
+
+        with CaptureQueriesContext(connection) as context:
+            suggest(client, 'сол')
+        assert len(context) == 0, (
+            'Проверьте, что подсказки отдаются из индекса в памяти.'
+        )
+
+        response = client.get(URL, {'q': 'мир', 'limit': 0})
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+
+    def test_02_incremental_updates(self, client, admin):
+        from reviews.models import Review, Title
+        from reviews.suggest import get_index
+
+        title = Title.objects.create(name='Сталкер', year=1979,
+                                     description='')
+        assert suggest(client, 'стал') == [('Сталкер', None)]
+        index = get_index()
+
+        Title.objects.create(name='Сталь', year=2000, description='')
+        Review.objects.create(title=title, author=admin, text='Отзыв',
+                              score=8)
+        title.name = 'Сталкер. Пикник'
+        title.save()
+        assert suggest(client, 'стал') == [
+            ('Сталкер. Пикник', 8), ('Сталь', None)
+        ], (
+            'Проверьте, что индекс подсказок обновляется при изменении '
+            'произведений и их рейтинга.'
+        )
+        assert suggest(client, 'пикник') == [('Сталкер. Пикник', 8)]
+
+        title.delete()
+        assert suggest(client, 'стал') == [('Сталь', None)]
+        assert get_index() is index, (
+            'Проверьте, что изменения этого процесса применяются к индексу '
+            'без полной перестройки.'
+        )
+
+    def test_03_version_shared_between_processes(self, settings, client):
+        from reviews.models import Title
+
+        Title.objects.create(name='Сталкер', year=1979, description='')
+        assert suggest(client, 'стал') == [('Сталкер', None)]
+        # Запись другого процесса: строка в базе без сигналов этого.
+        Title.objects.bulk_create([
+            Title(name='Сталь', year=2000, description='')
+        ])
+        assert suggest(client, 'стал') == [('Сталкер', None)]
+
+        bump_version_elsewhere(settings, 'suggest')
+        assert suggest(client, 'стал') == [
+            ('Сталкер', None), ('Сталь', None)
+        ], (
+            'Проверьте, что версия индекса подсказок общая для процессов: '
+            'увеличение её в другом процессе перестраивает индекс.'
+        )
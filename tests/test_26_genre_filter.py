@@ -0,0 +1,144 @@
+from http import HTTPStatus
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from tests.utils import bump_version_elsewhere
+
+URL = '/api/v1/titles/'
+
+
+def titles(client, **params):
+    response = client.get(URL, params)
+    assert response.status_code == HTTPStatus.OK
+    return sorted(title['name'] for title in response.json()['results'])
+
+
+@pytest.fixture
+def catalog_titles():
+    from reviews.models import Category, Genre, Title
+
+    drama, comedy, horror = [
+        Genre.objects.create(name=name, slug=slug)
+        for name, slug in (('Драма', 'drama'), ('Комедия', 'comedy'),
+                           ('Ужасы', 'horror'))
+    ]
+    movie = Category.objects.create(name='Фильм', slug='movie')
+    book = Category.objects.create(name='Книга', slug='book')
+    for name, year, category, genres in (
+        ('Дживс', 1923, book, (comedy,)),
+        ('Жизнь Брайана', 1979, movie, (comedy, drama)),
+        ('Сияние', 1980, movie, (horror, drama)),
+        ('Сияние', 1977, book, (horror,)),
+        ('Брат', 1997, movie, (drama,)),
+    ):
+        title = Title.objects.create(name=name, year=year, category=category,
+                                     description='')
+        title.genre.set(genres)
+    return drama, comedy, horror
+
+
+@pytest.mark.django_db(transaction=True)
+class Test26GenreFilter:
+
+    def test_01_all_and_any(self, client, catalog_titles):
+        assert titles(client, genre='drama') == [
+            'Брат', 'Жизнь Брайана', 'Сияние'
+        ]
+        assert titles(client, genre='drama,comedy') == ['Жизнь Брайана'], (
+            'Проверьте, что `genre` с несколькими slug по умолчанию '
+            'оставляет произведения со всеми жанрами.'
+        )
+        assert titles(client, genre=['drama', 'horror']) == ['Сияние']
+        assert titles(client, genre='comedy,horror', genre_mode='any') == [
+            'Дживс', 'Жизнь Брайана', 'Сияние', 'Сияние'
+        ], (
+            'Проверьте, что `genre_mode=any` оставляет произведения хотя '
+            'бы с одним из жанров.'
+        )
+        assert titles(client, genre='drama,unknown') == []
+        assert titles(client, genre='drama,unknown', genre_mode='any') == [
+            'Брат', 'Жизнь Брайана', 'Сияние'
+        ]
+        response = client.get(URL, {'genre': 'drama', 'genre_mode': 'some'})
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+
+    def test_02_combined_filters(self, client, catalog_titles):
+        assert titles(client, genre='horror', category='book') == ['Сияние']
+        assert titles(client, genre='drama,comedy,horror', genre_mode='any',
+                      category='movie', year=1980) == ['Сияние']
+        assert titles(client, genre='drama', year=1923) == []
+        assert titles(client, category='book') == ['Дживс', 'Сияние']
+        assert titles(client, genre='drama', category='unknown') == []
+
+        with CaptureQueriesContext(connection) as context:
+            titles(client, genre='drama,horror', category='movie')
+        # Жанры выдачи подгружает prefetch_related, его не учитываем.
+        sql = ' '.join(
+            query['sql'] for query in context.captured_queries
+            if '_prefetch_related_val' not in query['sql']
+        )
+        assert 'reviews_title_genre' not in sql, (
+            'Проверьте, что фильтр по жанрам не соединяет таблицу связей '
+            'произведений с жанрами.'
+        )
+
+    def test_03_bitmaps_in_sync(self, client, catalog_titles):
+        from reviews.bitmaps import get_index
+        from reviews.models import Category, Title
+
+        drama, comedy, _ = catalog_titles
+        assert titles(client, genre='drama,comedy') == ['Жизнь Брайана']
+        index = get_index()
+
+        brother = Title.objects.get(name='Брат')
+        brother.genre.add(comedy)
+        assert titles(client, genre='drama,comedy') == [
+            'Брат', 'Жизнь Брайана'
+        ], 'Проверьте, что карты жанров обновляются при изменении связей.'
+        comedy.genre.remove(brother)
+        drama.genre.clear()
+        assert titles(client, genre='drama', genre_mode='any') == []
+
+        jeeves = Title.objects.get(name='Дживс')
+        jeeves.category = Category.objects.get(slug='movie')
+        jeeves.save()
+        assert titles(client, genre='comedy', category='movie') == [
+            'Дживс', 'Жизнь Брайана'
+        ]
+        jeeves.delete()
+        assert titles(client, genre='comedy') == ['Жизнь Брайана']
+        assert get_index() is index, (
+            'Проверьте, что изменения этого процесса применяются к картам '
+            'без полной перестройки.'
+        )
+
+        comedy.delete()
+        assert titles(client, genre='comedy') == []
+        Category.objects.get(slug='movie').delete()
+        assert titles(client, genre='horror') == ['Сияние', 'Сияние']
+
+    def test_04_version_shared_between_processes(self, client,
+                                                 catalog_titles, settings):
+        from reviews.models import Title
+
+        comedy = catalog_titles[1]
+        assert titles(client, genre='comedy') == ['Дживс', 'Жизнь Брайана']
+        # Запись другого процесса: строки в базе без сигналов этого.
+        Title.objects.bulk_create([
+            Title(name='Кин-дза-дза!', year=1986, description='')
+        ])
+        title = Title.objects.get(name='Кин-дза-дза!')
+        Title.genre.through.objects.bulk_create([
+            Title.genre.through(title=title, genre=comedy)
+        ])
+        assert titles(client, genre='comedy') == ['Дживс', 'Жизнь Брайана']
+
+        bump_version_elsewhere(settings, 'bitmaps')
+        assert titles(client, genre='comedy') == [
+            'Дживс', 'Жизнь Брайана', 'Кин-дза-дза!'
+        ], (
+            'Проверьте, что версия битовых карт общая для процессов: '
+            'увеличение её в другом процессе перестраивает карты.'
+        )
@@ -0,0 +1,56 @@
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+
+
+def plan(queryset):
+    from api.query_plans import explain
+
+    sql, params = queryset.query.sql_with_params()
+    return '\n'.join(explain(sql, params))
+
+
+@pytest.mark.django_db(transaction=True)
+class Test27CompositeIndexes:
+
+    def test_01_hot_paths_use_indexes(self):
+        from reviews.models import Comment, Review, Title
+
+        reviews = plan(Review.objects.filter(title_id=1)[:10])
+        assert 'review_title_pub_date_idx' in reviews, reviews
+        assert 'TEMP B-TREE' not in reviews, (
+            'Проверьте, что отзывы произведения сортируются по индексу '
+            '(title_id, pub_date, id).'
+        )
+        comments = plan(Comment.objects.filter(review_id=1)[:10])
+        assert 'comment_review_pub_date_idx' in comments, comments
+        assert 'TEMP B-TREE' not in comments
+        by_author = plan(
+            Review.objects.filter(author_id=1).order_by('-pub_date')
+        )
+        assert 'review_author_pub_date_idx' in by_author, by_author
+        assert 'TEMP B-TREE' not in by_author
+        titles = plan(Title.objects.filter(category_id=1, year=2000))
+        assert 'title_category_year_idx' in titles, titles
+        assert 'TEMP B-TREE' not in titles
+
+    def test_02_benchmark_plans(self):
+        from benchmarks.plans import collect
+        from benchmarks.scenarios import build_scenarios, credentials
+        call_command('load_initial_data', stdout=StringIO())
+
+        scenarios = [
+            scenario for scenario in build_scenarios()
+            if scenario.name in ('review-list', 'comment-list')
+        ]
+        plans = collect(scenarios, credentials())
+
+        assert set(plans) == {'review-list', 'comment-list'}
+        for name, queries in plans.items():
+            assert queries, name
+            for query in queries:
+                assert query['plan'], (name, query['sql'])
+                assert not any(
+                    'TEMP B-TREE' in warning for warning in query['warnings']
+                ), (name, query['sql'], query['plan'])
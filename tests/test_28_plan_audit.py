@@ -0,0 +1,78 @@
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+
+ROUTES = (
+    'api-root', 'categories-detail', 'categories-list', 'comment-detail',
+    'comment-list', 'genres-detail', 'genres-list', 'get_token',
+    'review-detail', 'review-list', 'signup', 'titles-detail',
+    'titles-list', 'titles-suggest', 'users-detail', 'users-list',
+    'users-me',
+)
+
+
+@pytest.mark.django_db(transaction=True)
+class Test28PlanAudit:
+
+    def test_01_suggest_index(self):
+        from api.query_plans import suggest_index
+
+        sql = ('SELECT "reviews_comment"."id" FROM "reviews_comment" '
+               'WHERE ("reviews_comment"."author_id" = %s AND '
+               '"reviews_comment"."pub_date" > %s) LIMIT 21')
+        assert suggest_index(sql, 'SCAN reviews_comment') == (
+            'reviews_comment(author_id, pub_date)'
+        ), 'Проверьте, что индекс предлагается по колонкам условия.'
+
+        sql = ('SELECT "reviews_comment"."id" FROM "reviews_comment" '
+               'WHERE "reviews_comment"."author_id" = %s '
+               'ORDER BY "reviews_comment"."text" ASC LIMIT 10')
+        assert suggest_index(sql, 'USE TEMP B-TREE FOR ORDER BY') == (
+            'reviews_comment(author_id, text)'
+        ), 'Проверьте, что для сортировки предлагается индекс с ORDER BY.'
+
+        # Такой индекс уже есть; просмотр без условий индексом не убрать.
+        sql = ('SELECT "reviews_review"."id" FROM "reviews_review" '
+               'WHERE "reviews_review"."title_id" = %s '
+               'ORDER BY "reviews_review"."pub_date" ASC')
+        assert suggest_index(sql, 'USE TEMP B-TREE FOR ORDER BY') is None
+        assert suggest_index(
+            'SELECT "reviews_genre"."id" FROM "reviews_genre"',
+            'SCAN reviews_genre'
+        ) is None
+
+    def test_02_command(self, tmp_path):
+        from reviews.models import Genre, Review
+        call_command('load_initial_data', stdout=StringIO())
+        counts = Genre.objects.count(), Review.objects.count()
+
+        output = tmp_path / 'plans.txt'
+        stdout = StringIO()
+        call_command('audit_query_plans', output=output, stdout=stdout)
+        report = output.read_text()
+
+        statuses = dict(
+            line[3:].split() for line in report.splitlines()
+            if line.startswith('==')
+        )
+        assert sorted(statuses) == sorted(ROUTES), (
+            'Проверьте, что аудит выполняет запрос к каждому маршруту API.'
+        )
+        assert {
+            route: status for route, status in statuses.items()
+            if not all(code.startswith('2') for code in status.split(','))
+        } == {}, (
+            'Проверьте, что каждый маршрут в аудите отвечает 2xx.'
+        )
+        assert 'SEARCH reviews_review USING INDEX' in report
+        assert 'flagged steps' in stdout.getvalue()
+        assert (Genre.objects.count(), Review.objects.count()) == counts, (
+            'Проверьте, что изменяющие запросы аудита откатываются.'
+        )
+
+        call_command('audit_query_plans', output=output, stdout=StringIO())
+        assert output.read_text() == report, (
+            'Проверьте, что отчёт не зависит от времени выполнения и '
+            'пригоден для сравнения.'
+        )
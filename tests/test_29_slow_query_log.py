@@ -0,0 +1,134 @@
+import json
+import os
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+
+
+@pytest.fixture
+def slow_log(settings, tmp_path):
+    from api import slow_queries
+
+    settings.SLOW_QUERY_LOG = {
+        'PATH': tmp_path / 'slow.log', 'THRESHOLD_MS': 0,
+        'MAX_BYTES': 1024 * 1024, 'BACKUP_COUNT': 2,
+    }
+
+    def entries():
+        slow_queries.flush()
+        return list(slow_queries.read_entries(
+            settings.SLOW_QUERY_LOG['PATH'], 2
+        ))
+
+    yield entries
+    slow_queries.stop()
+
+
+@pytest.mark.django_db(transaction=True)
+class Test29SlowQueryLog:
+
+    def test_01_entries(self, client, admin_client, slow_log, settings):
+        from reviews.models import Title
+
+        titles = [
+            Title.objects.create(name=f'Фильм {year}', year=year,
+                                 description='')
+            for year in (1999, 2000, 2001)
+        ]
+        client.get('/api/v1/titles/')
+        entries = slow_log()
+
+        assert entries and all(
+            entry['view'] == 'titles-list' for entry in entries
+        ), 'Проверьте, что записи журнала содержат имя маршрута.'
+        select = next(
+            entry for entry in entries
+            if entry['sql'].startswith('SELECT "reviews_title"."id"')
+        )
+        assert select['rows'] == 3, (
+            'Проверьте, что для запроса с результатом пишется число '
+            'прочитанных строк.'
+        )
+        assert select['duration_ms'] >= 0
+
+        client.get(f'/api/v1/titles/{titles[0].pk}/')
+        detail = next(
+            entry for entry in slow_log()
+            if entry['view'] == 'titles-detail'
+            and entry['sql'].startswith('SELECT "reviews_title"."id"')
+        )
+        assert detail['sql'].endswith('WHERE "reviews_title"."id" = %s '
+                                      'LIMIT 21'), detail['sql']
+        assert detail['params'] == 'int', (
+            'Проверьте, что в журнал пишутся типы параметров без значений.'
+        )
+        assert detail['rows'] == 1
+
+        admin_client.post('/api/v1/genres/', {'name': 'Драма',
+                                              'slug': 'drama'})
+        insert = next(
+            entry for entry in slow_log()
+            if entry['sql'].startswith('INSERT INTO "reviews_genre"')
+        )
+        assert insert['view'] == 'genres-list'
+        assert insert['params'] == 'str*3'
+        assert insert['rows'] == 1
+
+        settings.SLOW_QUERY_LOG = {
+            **settings.SLOW_QUERY_LOG, 'THRESHOLD_MS': 60 * 1000
+        }
+        count = len(slow_log())
+        client.get('/api/v1/titles/')
+        assert len(slow_log()) == count, (
+            'Проверьте, что запросы быстрее порога не записываются.'
+        )
+
+    def test_02_param_shape(self):
+        from api.slow_queries import param_shape
+
+        assert param_shape((1, 2, 'a', None)) == 'int*2, str, NoneType'
+        assert param_shape([(1, 'a'), (2, 'b')], many=True) == '2x(int, str)'
+        assert param_shape(None) == ''
+
+    def test_03_rotation_and_report(self, client, slow_log, settings):
+        settings.SLOW_QUERY_LOG = {
+            **settings.SLOW_QUERY_LOG, 'MAX_BYTES': 2048
+        }
+        for _ in range(10):
+            client.get('/api/v1/titles/')
+            client.get('/api/v1/genres/?search=др')
+        entries = slow_log()
+        path = settings.SLOW_QUERY_LOG['PATH']
+        assert not path.exists()
+        assert path.with_name(f'slow.{os.getpid()}.log.1').exists(), (
+            'Проверьте, что процесс пишет журнал в свой файл и файл '
+            'ротируется.'
+        )
+        assert len(entries) > 10
+
+        stdout = StringIO()
+        call_command('slow_query_report', top=2, by='count', stdout=stdout)
+        report = stdout.getvalue()
+        assert 'slow queries' in report
+        assert 'titles-list' in report or 'genres-list' in report
+
+    def test_04_process_files(self, settings, tmp_path):
+        from api.slow_queries import read_entries
+
+        assert not settings.SLOW_QUERY_LOG['PATH'], (
+            'Проверьте, что журнал медленных запросов по умолчанию выключен.'
+        )
+        path = tmp_path / 'slow.log'
+        for name, view in (('slow.101.log', 'titles-list'),
+                           ('slow.101.log.1', 'genres-list'),
+                           ('slow.202.log', 'users-list'),
+                           ('other.303.log', 'users-me')):
+            (tmp_path / name).write_text(
+                json.dumps({'view': view}) + '\n', encoding='utf-8'
+            )
+        views = sorted(entry['view'] for entry in read_entries(path, 1))
+        assert views == ['genres-list', 'titles-list', 'users-list'], (
+            'Проверьте, что сводка читает файлы журнала всех процессов '
+            'и их ротированные копии.'
+        )
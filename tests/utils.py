@@ -1,3 +1,5 @@
+import subprocess
+import sys
 from http import HTTPStatus
 
 
@@ -305,3 +307,14 @@ def check_fields(obj_type, url_pattern, obj, expected_data, detail=False):
         f'данные {obj_types[obj_type]}{results_in_msg}. Поле `id` не '
         'найдено или не является целым числом.'
     )
+
+
+def bump_version_elsewhere(settings, name):
+    """Увеличивает общую версию `name` из отдельного процесса."""
+    subprocess.run(
+        [sys.executable, '-c',
+         'import sys; from reviews.versions import VersionStore; '
+         'VersionStore(sys.argv[1]).bump(sys.argv[2])',
+         str(settings.SHARED_VERSIONS['PATH']), name],
+        cwd=settings.BASE_DIR, check=True,
+    )